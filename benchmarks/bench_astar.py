@@ -0,0 +1,123 @@
+"""A* benchmark: port of the page's former ``astarPath()`` vs heap A* on arrays.
+
+Three implementations answer the same queries:
+
+* ``port+scan``  - :func:`campus_connect.routing.astar_path` with coordinates
+  looked up by a linear scan over ``nodes`` like ``getNodeCoordinates()``,
+  i.e. the page's algorithm as written (O(V^2)).
+* ``port``       - the same port with a dict for coordinates.
+* ``heap``       - :func:`campus_connect.routing.astar` on a
+  :class:`~campus_connect.routing.CompactGraph`.
+
+Routes are checked to be identical. Slow implementations are skipped above
+``--scan-limit`` / ``--port-limit`` nodes.
+
+    python benchmarks/bench_astar.py --sizes 10000 100000 --queries 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from loadgen import ROOT, format_table
+from synthetic import random_queries, synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS  # noqa: E402
+from campus_connect.routing import CompactGraph, astar, astar_path  # noqa: E402
+from campus_connect.routing.astar import coordinate_table  # noqa: E402
+from campus_connect.transform import load_display_nodes  # noqa: E402
+
+
+class ScanCoords(Mapping):
+    """Coordinate lookup by linear scan, like ``getNodeCoordinates()``."""
+
+    def __init__(self, nodes: List[Dict[str, Any]]) -> None:
+        self.nodes = nodes
+
+    def get(self, key, default=None) -> Optional[Tuple[float, float]]:
+        for node in self.nodes:
+            if node["id"] == key:
+                return node["x"], node["y"]
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return (node["id"] for node in self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+def time_queries(run, queries) -> Tuple[float, list]:
+    samples, results = [], []
+    for start, end in queries:
+        began = time.perf_counter()
+        results.append(run(start, end))
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples), results
+
+
+def bench(name: str, nodes, graph, queries, scan_limit: int, port_limit: int):
+    compact = CompactGraph.from_json(nodes, graph)
+    ids = compact.ids
+
+    def heap_run(start, end):
+        path = astar(compact, compact.index[start], compact.index[end])
+        return None if path is None else [ids[node] for node in path]
+
+    heap_time, expected = time_queries(heap_run, queries)
+    row = [name, len(nodes), compact.edge_count]
+    for label, limit, coords in (
+        ("port", port_limit, coordinate_table(nodes)),
+        ("scan", scan_limit, ScanCoords(nodes)),
+    ):
+        if len(nodes) > limit:
+            row.append("skipped")
+            continue
+        port_time, results = time_queries(
+            lambda s, e, c=coords: astar_path(graph, c, s, e), queries
+        )
+        if results != expected:
+            raise AssertionError(f"{name}: {label} and heap routes differ")
+        row.append(f"{port_time * 1e6:.0f}")
+    row.append(f"{heap_time * 1e6:.0f}")
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--scan-limit", type=int, default=10_000)
+    parser.add_argument("--port-limit", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = []
+    for floor in FLOORS:
+        nodes, graph = load_display_nodes(ROOT, floor)
+        pairs = [(a["id"], b["id"]) for a in nodes for b in nodes if a["id"] != b["id"]]
+        rows.append(bench(floor.id, nodes, graph, pairs, args.scan_limit, args.port_limit))
+    for size in args.sizes:
+        nodes, graph = synthetic_floor(size)
+        queries = random_queries(nodes, args.queries)
+        rows.append(
+            bench(f"synthetic {size}", nodes, graph, queries, args.scan_limit, args.port_limit)
+        )
+
+    print("median µs per query; routes identical across implementations\n")
+    print(format_table(rows, ("graph", "nodes", "edges", "port", "port+scan", "heap")))
+
+
+if __name__ == "__main__":
+    main()
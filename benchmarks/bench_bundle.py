@@ -0,0 +1,131 @@
+"""Time-to-ready per floor: three sequential fetches vs one floor bundle.
+
+The legacy path mirrors ``loadApplication()``: fetch the SVG, then the node
+JSON, then the zone JSON. The bundle path fetches ``/api/floor/<id>/bundle``
+and, like the page, the floor's binary pack alongside it. Both decompress
+and parse what they receive. ``--rtt`` adds a simulated
+network round trip to every request (congested campus Wi-Fi).
+
+    python benchmarks/bench_bundle.py --rtt 0.08 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Sequence
+
+from loadgen import ROOT, Connection, Reply, format_table, free_port, start_campus_server
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+FLOORS = ("first", "second", "third")
+ACCEPT = {"Accept-Encoding": "gzip, br" if brotli else "gzip"}
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.pack import FloorPack  # noqa: E402
+
+_DECODERS: Dict[str, Callable[[bytes], bytes]] = {"gzip": gzip.decompress}
+if brotli is not None:
+    _DECODERS["br"] = brotli.decompress
+
+
+def decode(reply: Reply) -> bytes:
+    encoding = reply.headers.get("content-encoding")
+    return _DECODERS[encoding](reply.body) if encoding else reply.body
+
+
+async def fetch(conn: Connection, path: str, rtt: float) -> Reply:
+    await asyncio.sleep(rtt)
+    reply = await conn.request(path, ACCEPT)
+    if reply.status != 200:
+        raise RuntimeError(f"{path}: HTTP {reply.status}")
+    return reply
+
+
+async def legacy_load(conns: Sequence[Connection], floor: str, rtt: float) -> int:
+    conn = conns[0]
+    svg = await fetch(conn, f"/floors/{floor}-floor.svg", rtt)
+    decode(svg).decode("utf-8")
+    nodes = await fetch(conn, f"/data/{floor}_floor_nodes.json?v={time.time_ns()}", rtt)
+    json.loads(decode(nodes))
+    zones = await fetch(conn, f"/data/{floor}_floor_zones.json?v={time.time_ns()}", rtt)
+    json.loads(decode(zones))
+    return len(svg.body) + len(nodes.body) + len(zones.body)
+
+
+async def bundle_load(conns: Sequence[Connection], floor: str, rtt: float) -> int:
+    """The bundle and, on a second connection at the same time, the floor's pack."""
+    reply, pack = await asyncio.gather(
+        fetch(conns[0], f"/api/floor/{floor}/bundle", rtt),
+        fetch(conns[1], f"/api/floor/{floor}/pack", rtt),
+    )
+    if "pack" in json.loads(decode(reply)):
+        floor_pack = FloorPack(decode(pack))
+        floor_pack.nodes(), floor_pack.graph(), floor_pack.zones()
+        return len(reply.body) + len(pack.body)
+    return len(reply.body)
+
+
+async def measure(port: int, rtt: float, repeat: int):
+    rows = []
+    for floor in FLOORS:
+        timings = {}
+        sizes = {}
+        for name, load in (("legacy", legacy_load), ("bundle", bundle_load)):
+            conns = [Connection("127.0.0.1", port) for _ in range(2)]
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                sizes[name] = await load(conns, floor, rtt)
+                samples.append(time.perf_counter() - started)
+            for conn in conns:
+                await conn.close()
+            timings[name] = statistics.median(samples)
+        rows.append(
+            (
+                floor,
+                f"{timings['legacy'] * 1000:.1f}",
+                f"{timings['bundle'] * 1000:.1f}",
+                f"{timings['legacy'] / timings['bundle']:.2f}x",
+                sizes["legacy"],
+                sizes["bundle"],
+            )
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt", type=float, default=0.05, help="simulated round trip (s)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_campus_server(port)
+    try:
+        rows = asyncio.run(measure(port, args.rtt, args.repeat))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(f"median of {args.repeat} loads, simulated RTT {args.rtt * 1000:.0f} ms\n")
+    print(
+        format_table(
+            rows,
+            ("floor", "3 fetches ms", "bundle ms", "speedup", "3 fetches bytes", "bundle bytes"),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Route queries on the full graph vs its core with degree-2 chains contracted.
+
+Every graph is contracted with :func:`campus_connect.routing.contract`,
+keeping searchable nodes, and the same room-to-room queries are answered by
+binary-heap A* on the full graph and by A* on the core with the route
+expanded back to every node. Route lengths are checked to be equal. Graphs
+are the floors' hand-made data, the graphs the ``graphs`` build stage
+generated from the plans (when built), and synthetic floors whose corridors
+are split by ``--corridor-points`` waypoints.
+
+    python benchmarks/bench_contract.py --sizes 10000 100000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+from loadgen import ROOT, format_table
+from synthetic import random_queries, synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS, load_json  # noqa: E402
+from campus_connect.navgraph import output_path  # noqa: E402
+from campus_connect.routing import CompactGraph, astar, contract  # noqa: E402
+from campus_connect.transform import load_display_nodes  # noqa: E402
+
+
+def time_queries(
+    run: Callable[[int, int], Optional[List[int]]], queries: List[Tuple[int, int]]
+) -> Tuple[float, list]:
+    samples, results = [], []
+    for start, end in queries:
+        began = time.perf_counter()
+        results.append(run(start, end))
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples), results
+
+
+def bench(name: str, nodes, graph, queries: int) -> list:
+    compact = CompactGraph.from_json(nodes, graph)
+    began = time.perf_counter()
+    contracted = contract(
+        compact, [compact.index[node["id"]] for node in nodes if node.get("searchable")]
+    )
+    built = time.perf_counter() - began
+    pairs = [
+        (compact.index[start], compact.index[end])
+        for start, end in random_queries(nodes, queries)
+        if start != end
+    ]
+    full_time, expected = time_queries(lambda s, e: astar(compact, s, e), pairs)
+    core_time, results = time_queries(contracted.route, pairs)
+    for want, got in zip(expected, results):
+        if (want is None) != (got is None) or (
+            want is not None and abs(contracted.walk(want) - contracted.walk(got)) > 1e-6
+        ):
+            raise AssertionError(f"{name}: core and full routes differ in length")
+    core = contracted.core
+    return [
+        name,
+        compact.node_count,
+        core.node_count,
+        f"{1 - core.node_count / compact.node_count:.0%}",
+        compact.edge_count,
+        core.edge_count,
+        f"{built * 1000:.1f}",
+        f"{full_time * 1e6:.0f}",
+        f"{core_time * 1e6:.0f}",
+        f"{full_time / core_time:.2f}x",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--corridor-points", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for floor in FLOORS:
+        rows.append(bench(floor.id, *load_display_nodes(ROOT, floor), args.queries))
+    for floor in FLOORS:
+        path = output_path(ROOT, floor)
+        if path.is_file():
+            data = load_json(ROOT, path.relative_to(ROOT).as_posix())
+            rows.append(bench(f"{floor.id} generated", data["nodes"], data["graph"], args.queries))
+    for size in args.sizes:
+        nodes, graph = synthetic_floor(size, corridor_points=args.corridor_points)
+        rows.append(bench(f"synthetic {size}", nodes, graph, args.queries))
+
+    print(
+        f"median µs per query over {args.queries} room pairs; synthetic corridors "
+        f"split by {args.corridor_points} waypoints; route lengths equal\n"
+    )
+    print(
+        format_table(
+            rows,
+            (
+                "graph",
+                "nodes",
+                "core nodes",
+                "removed",
+                "edges",
+                "core edges",
+                "contract ms",
+                "full µs",
+                "core µs",
+                "speedup",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Typo-tolerant search: edit-distance scan vs the deletion dictionary.
+
+Times :class:`campus_connect.search.FuzzyIndex` on synthetic label corpora
+(with a random popularity prior) for queries made by one or two random
+edits (deletion, insertion, substitution, transposition) of real labels.
+Recall is the share of queries whose original label is among the top ``k``.
+
+For corpora up to ``--scan-limit`` labels, every query is also answered by
+scanning all labels with the same distance and ranking, and the answers are
+checked to be identical.
+
+    python benchmarks/bench_fuzzy.py --sizes 1000 10000 100000 --queries 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import sys
+import time
+
+from bench_search import timings
+from loadgen import ROOT, format_table
+from synthetic import synthetic_labels
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.search import Document, FuzzyIndex, LabelIndex  # noqa: E402
+from campus_connect.search.fuzzy import edit_distance, max_edits  # noqa: E402
+from campus_connect.search.index import words  # noqa: E402
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """``word`` with one random edit."""
+    at = rng.randrange(len(word))
+    letter = rng.choice(string.ascii_lowercase)
+    edit = rng.choice(("delete", "insert", "substitute", "transpose"))
+    if edit == "delete":
+        return word[:at] + word[at + 1 :]
+    if edit == "insert":
+        return word[:at] + letter + word[at:]
+    if edit == "substitute":
+        return word[:at] + letter + word[at + 1 :]
+    at = min(at, len(word) - 2)
+    return word[:at] + word[at + 1] + word[at] + word[at + 2 :]
+
+
+def typos(labels, count: int, seed: int = 4):
+    """``(query, original label)`` pairs; words long enough to correct get edits."""
+    rng = random.Random(seed)
+    pairs = []
+    for label in rng.sample(labels, count):
+        tokens = words(label)
+        fixable = [i for i, token in enumerate(tokens) if max_edits(token)]
+        for _ in range(rng.choice((1, 1, 2))):
+            i = rng.choice(fixable)
+            if len(tokens[i]) > 3:
+                tokens[i] = misspell(tokens[i], rng)
+        pairs.append((" ".join(tokens), label.lower()))
+    return pairs
+
+
+def scan(index: LabelIndex, query: str, k: int):
+    """Every label's distance to ``query``, ranked like :class:`FuzzyIndex`."""
+    tokens = words(query)
+    scored = []
+    for doc, label in enumerate(index.labels):
+        total = 0
+        for token in tokens:
+            found = [edit_distance(token, word, max_edits(token)) for word in words(label)]
+            found = [distance for distance in found if distance is not None]
+            if not found:
+                break
+            total += min(found)
+        else:
+            scored.append((total, -index.documents[doc].popularity, doc))
+    return [(doc, total) for total, _, doc in sorted(scored)[:k]]
+
+
+def bench(size: int, queries: int, k: int, scan_limit: int):
+    labels = synthetic_labels(size)
+    rng = random.Random(5)
+    index = LabelIndex(
+        Document("campus", str(i), label, popularity=rng.random())
+        for i, label in enumerate(labels)
+    )
+    began = time.perf_counter()
+    fuzzy = FuzzyIndex(index)
+    build = time.perf_counter() - began
+    pairs = typos(labels, queries)
+
+    hits = sum(
+        any(index.labels[doc] == original for doc, _ in fuzzy.search(query, k))
+        for query, original in pairs
+    )
+    scan_p50 = "-"
+    if size <= scan_limit:
+        for query, _ in pairs:
+            assert fuzzy.search(query, k) == scan(index, query, k), query
+        scan_p50 = f"{timings(lambda query: scan(index, query, k), [q for q, _ in pairs])[0]:.0f}"
+    p50, p99 = timings(lambda query: fuzzy.search(query, k), [query for query, _ in pairs])
+    return [
+        size,
+        len(fuzzy.vocabulary),
+        len(fuzzy.deletes),
+        f"{build * 1e3:.0f}",
+        scan_p50,
+        f"{p50:.0f}",
+        f"{p99:.0f}",
+        f"{hits / len(pairs):.1%}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=15)
+    parser.add_argument("--scan-limit", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rows = [bench(size, args.queries, args.k, args.scan_limit) for size in args.sizes]
+    print(f"µs per query, top {args.k}; scanned sizes checked against the index\n")
+    print(
+        format_table(
+            rows,
+            (
+                "labels",
+                "words",
+                "deletes",
+                "build ms",
+                "scan p50",
+                "index p50",
+                "index p99",
+                f"recall@{args.k}",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
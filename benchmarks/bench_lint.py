@@ -0,0 +1,110 @@
+"""Graph lint time on synthetic floors with injected faults.
+
+Builds synthetic floors (about 2.5 directed edges per node, so 400k nodes
+make a million edges), breaks ``--faults`` rooms of each kind (a one-way
+edge, a weight off its length, an edge to a node that does not exist, a
+room cut off) and times :mod:`campus_connect.lint`: building the edge
+arrays from the JSON structures, checking them and fixing the graph. The
+issues found are compared with the ones injected plus those of the intact
+floor: from about 100k nodes the dropped corridors leave a few junctions
+with their rooms cut off.
+
+    python benchmarks/bench_lint.py --sizes 10000 100000 400000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict
+
+from loadgen import ROOT, format_table
+from synthetic import synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect import lint  # noqa: E402
+
+
+def inject(nodes, graph, faults: int, seed: int = 0) -> Dict[str, int]:
+    """Break ``faults`` distinct rooms per kind in place; returns the issues expected."""
+    rng = random.Random(seed)
+    rooms = [node["id"] for node in nodes if node["searchable"] and graph[node["id"]]]
+    picked = rng.sample(rooms, 4 * faults)
+    one_way, drift, dangling, cut = (picked[k::4] for k in range(4))
+    for room in one_way:
+        del graph[next(iter(graph[room]))][room]
+    for room in drift:
+        junction = next(iter(graph[room]))
+        graph[room][junction] = graph[junction][room] = graph[room][junction] * 2 + 10
+    for number, room in enumerate(dangling):
+        graph[room][f"ghost_{number}"] = 50.0
+        graph[f"ghost_{number}"] = {room: 50.0}
+    for room in cut:
+        for other in graph[room]:
+            del graph[other][room]
+        graph[room] = {}
+    return {"asymmetric": faults, "drift": faults, "dangling": faults, "unreachable": faults}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 100000, 400000])
+    parser.add_argument("--faults", type=int, default=25)
+    args = parser.parse_args()
+    if not lint.available():
+        sys.exit("numpy is not installed")
+
+    rows = []
+    for size in args.sizes:
+        nodes, graph = synthetic_floor(size)
+        expected = Counter(issue.kind for issue in lint.check_graph("synthetic", nodes, graph))
+        expected.update(inject(nodes, graph, args.faults))
+        began = time.perf_counter()
+        edges = lint.Edges.build(nodes, graph)
+        built = time.perf_counter()
+        issues = lint.check_graph("synthetic", nodes, graph, edges)
+        checked = time.perf_counter()
+        _, changed = lint.fix_graph(nodes, graph, edges)
+        done = time.perf_counter()
+        found = Counter(issue.kind for issue in issues)
+        rows.append(
+            [
+                size,
+                len(nodes),
+                len(edges.sources),
+                f"{built - began:.2f}",
+                f"{checked - built:.2f}",
+                f"{done - checked:.2f}",
+                f"{done - began:.2f}",
+                len(issues),
+                changed,
+                "yes" if found == expected else f"no: {dict(found)}",
+            ]
+        )
+    print(f"{args.faults} faults of each kind: one-way, drift, dangling, unreachable")
+    print()
+    print(
+        format_table(
+            rows,
+            (
+                "size",
+                "nodes",
+                "edges",
+                "arrays s",
+                "check s",
+                "fix s",
+                "total s",
+                "issues",
+                "fixed",
+                "as injected",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
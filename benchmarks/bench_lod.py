@@ -0,0 +1,99 @@
+"""Zone polygon levels of detail: vertices, deviation and point-in-polygon time.
+
+For each floor with zone polygons, simplifies them at every tolerance of
+:data:`campus_connect.lod.TOLERANCES` and reports the vertices kept, the
+farthest an original vertex lies from its simplified ring, and the time of
+an even-odd point-in-polygon test of random points against every zone.
+Points on which a level disagrees with the full polygons are counted; they
+can only lie within that level's deviation of a zone boundary.
+
+    python benchmarks/bench_lod.py --points 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from loadgen import ROOT, format_table
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS, load_zones  # noqa: E402
+from campus_connect.geometry import point_in_polygon  # noqa: E402
+from campus_connect.lod import TOLERANCES, ring, simplify_zones  # noqa: E402
+
+
+def pip_time(rings, points, repeat: int = 3):
+    """Best µs per point to test it against every ring, and the answers."""
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        answers = [
+            tuple(name for name, polygon in rings.items() if point_in_polygon(x, y, polygon))
+            for x, y in points
+        ]
+        best = min(best, time.perf_counter() - began)
+    return best / len(points) * 1e6, answers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--tolerances", type=float, nargs="*", default=list(TOLERANCES))
+    args = parser.parse_args()
+
+    rows = []
+    for floor in FLOORS:
+        zones = [zone for zone in load_zones(ROOT, floor) if zone.get("points")]
+        if not zones:
+            continue
+        full = {zone["id"]: ring(zone["points"]) for zone in zones}
+        began = time.perf_counter()
+        levels = simplify_zones(zones, args.tolerances)
+        print(f"{floor.id}: levels built in {(time.perf_counter() - began) * 1e3:.0f} ms")
+
+        xs = [x for polygon in full.values() for x, _ in polygon]
+        ys = [y for polygon in full.values() for _, y in polygon]
+        rng = random.Random(3)
+        points = [
+            (rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys)))
+            for _ in range(args.points)
+        ]
+        vertices = sum(len(polygon) for polygon in full.values())
+        base, expected = pip_time(full, points)
+        rows.append([floor.id, "full", vertices, "-", "0.00", f"{base:.1f}", "-"])
+        for level in levels:
+            took, answers = pip_time(level.rings, points)
+            rows.append(
+                [
+                    floor.id,
+                    f"{level.tolerance:g}",
+                    level.vertices(),
+                    f"{100.0 * (vertices - level.vertices()) / vertices:.0f}%",
+                    f"{max(level.deviation.values()):.2f}",
+                    f"{took:.1f}",
+                    sum(a != b for a, b in zip(answers, expected)),
+                ]
+            )
+    print(f"\n{args.points} random points per floor\n")
+    print(
+        format_table(
+            rows,
+            (
+                "floor",
+                "tolerance",
+                "vertices",
+                "reduction",
+                "max deviation",
+                "pip µs",
+                "differ",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Navigation graph generation time and size per raster resolution.
+
+Generates each floor's graph (:mod:`campus_connect.navgraph`) with rasters
+of increasing size and reports the time spent rasterizing the plan, thinning
+the corridors and in the whole generation, with the nodes and edges made.
+Sizes in pixels grow with the resolution, so the nodes stay as far apart
+in map units.
+
+    python benchmarks/bench_navgraph.py --resolutions 1100 2200 4400 8830
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from loadgen import ROOT, format_table
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect import navgraph  # noqa: E402
+from campus_connect.floors import FLOORS, get_floor, load_zones  # noqa: E402
+from campus_connect.walls import graph_edges  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", type=int, nargs="*", default=[1100, 2200, 4400])
+    parser.add_argument("--floors", nargs="*", default=[floor.id for floor in FLOORS])
+    args = parser.parse_args()
+    if not navgraph.available():
+        sys.exit("numpy is not installed")
+
+    rows = []
+    for floor_id in args.floors:
+        floor = get_floor(floor_id)
+        text = (ROOT / floor.svg).read_text(encoding="utf-8")
+        zones = load_zones(ROOT, floor)
+        for resolution in args.resolutions:
+            began = time.perf_counter()
+            raster = navgraph.Raster.build(text, zones, resolution)
+            rasterized = time.perf_counter()
+            navgraph.thin(raster.corridors)
+            thinned = time.perf_counter()
+            generated = navgraph.generate(text, zones, resolution)
+            total = time.perf_counter() - thinned
+            height, width = raster.walkable.shape
+            rows.append(
+                [
+                    floor.id,
+                    f"{width}x{height}",
+                    f"{raster.cell:.2f}",
+                    f"{rasterized - began:.2f}",
+                    f"{thinned - rasterized:.2f}",
+                    f"{total:.2f}",
+                    len(generated.nodes),
+                    len(graph_edges(generated.graph)),
+                    len(generated.unseen),
+                ]
+            )
+    print(
+        format_table(
+            rows,
+            (
+                "floor",
+                "raster",
+                "units/px",
+                "raster s",
+                "thin s",
+                "generate s",
+                "nodes",
+                "edges",
+                "unseen",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
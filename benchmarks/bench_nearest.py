@@ -0,0 +1,108 @@
+"""Nearest-node queries: linear scan (``findNearestNode()``) vs KD-tree.
+
+Times the scan the page does per zone click against
+:class:`campus_connect.spatial.FloorNodes` on synthetic floors, for the
+nearest node, the 5 nearest, the nearest of one type, and a radius query.
+Answers are checked against the scan.
+
+    python benchmarks/bench_nearest.py --sizes 1000 100000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+
+from loadgen import ROOT, format_table
+from synthetic import synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import get_floor  # noqa: E402
+from campus_connect.spatial import FloorNodes  # noqa: E402
+
+
+def scan_nearest(nodes, x, y, types=None):
+    """``findNearestNode()``: first searchable node at the smallest distance."""
+    nearest, best = None, math.inf
+    for node in nodes:
+        if node["searchable"] and (types is None or node["type"] in types):
+            distance = math.sqrt((node["x"] - x) ** 2 + (node["y"] - y) ** 2)
+            if distance < best:
+                best, nearest = distance, node
+    return nearest
+
+
+def scan_within(nodes, x, y, radius):
+    return sorted(
+        (math.sqrt((node["x"] - x) ** 2 + (node["y"] - y) ** 2), node["id"])
+        for node in nodes
+        if node["searchable"] and (node["x"] - x) ** 2 + (node["y"] - y) ** 2 <= radius * radius
+    )
+
+
+def median_us(run, points) -> float:
+    samples = []
+    for x, y in points:
+        began = time.perf_counter()
+        run(x, y)
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples) * 1e6
+
+
+def bench(size: int, queries: int, radius: float):
+    nodes, _ = synthetic_floor(size)
+    # Label a tenth of the rooms as labs for the type-filtered query.
+    for node in nodes[::10]:
+        if node["searchable"]:
+            node["type"] = "lab"
+
+    began = time.perf_counter()
+    floor = FloorNodes.build(get_floor("second"), nodes)
+    build = time.perf_counter() - began
+
+    xs = [node["x"] for node in nodes]
+    ys = [node["y"] for node in nodes]
+    rng = random.Random(2)
+    points = [
+        (rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys))) for _ in range(queries)
+    ]
+    for x, y in points:
+        assert floor.nearest(x, y)[0][1] is scan_nearest(nodes, x, y)
+        assert floor.nearest(x, y, types=["lab"])[0][1] is scan_nearest(nodes, x, y, {"lab"})
+        found = floor.nearest(x, y, len(nodes), radius=radius)
+        assert [(d, n["id"]) for d, n in found] == scan_within(nodes, x, y, radius)
+
+    return [
+        len(nodes),
+        f"{build * 1e3:.0f}",
+        f"{median_us(lambda x, y: scan_nearest(nodes, x, y), points):.0f}",
+        f"{median_us(lambda x, y: floor.nearest(x, y), points):.1f}",
+        f"{median_us(lambda x, y: floor.nearest(x, y, 5), points):.1f}",
+        f"{median_us(lambda x, y: floor.nearest(x, y, types=['lab']), points):.1f}",
+        f"{median_us(lambda x, y: floor.tree.within(x, y, radius), points):.1f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=300.0)
+    args = parser.parse_args()
+
+    rows = [bench(size, args.queries, args.radius) for size in args.sizes]
+    print(f"median µs per query; radius {args.radius:g}; answers checked against the scan\n")
+    print(
+        format_table(
+            rows, ("nodes", "build ms", "scan µs", "k=1 µs", "k=5 µs", "lab µs", "radius µs")
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
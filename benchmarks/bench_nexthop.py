@@ -0,0 +1,102 @@
+"""All-pairs next-hop tables: build time, memory and lookup vs heap A*.
+
+For each floor the vectorised Floyd–Warshall of
+:mod:`campus_connect.routing.nexthop` is timed, and the table's in-memory
+size (``float64`` distances plus ``uint8``/``uint16`` next hops) and its
+shipped size in the bundle (base64 JSON, then gzip) are reported. Route
+lookup by following next hops is timed against
+:func:`campus_connect.routing.astar` on the same queries.
+
+    python benchmarks/bench_nexthop.py --sizes 500 1000 2000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+
+from loadgen import ROOT, format_table
+from synthetic import random_queries, synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS, load_nodes  # noqa: E402
+from campus_connect.routing import CompactGraph, astar, floyd_warshall  # noqa: E402
+
+
+def median_us(run, queries) -> float:
+    samples = []
+    for start, end in queries:
+        began = time.perf_counter()
+        run(start, end)
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples) * 1e6
+
+
+def kib(size: int) -> str:
+    return f"{size / 1024:,.0f}"
+
+
+def bench(name: str, nodes, graph, queries):
+    compact = CompactGraph.from_json(nodes, graph)
+    began = time.perf_counter()
+    table = floyd_warshall(compact)
+    build = time.perf_counter() - began
+
+    shipped = json.dumps(table.to_json()).encode("utf-8")
+    pairs = [(compact.index[start], compact.index[end]) for start, end in queries]
+    return [
+        name,
+        compact.node_count,
+        table.next.dtype.name,
+        f"{build:.3f}",
+        kib(table.next.nbytes),
+        kib(table.nbytes),
+        kib(len(shipped)),
+        kib(len(gzip.compress(shipped, mtime=0))),
+        f"{median_us(lambda s, e: astar(compact, s, e), pairs):.1f}",
+        f"{median_us(table.path, pairs):.1f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    for floor in FLOORS:
+        nodes, graph = load_nodes(ROOT, floor)
+        pairs = [(a["id"], b["id"]) for a in nodes for b in nodes if a["id"] != b["id"]]
+        rows.append(bench(floor.id, nodes, graph, pairs))
+    for size in args.sizes:
+        nodes, graph = synthetic_floor(size)
+        rows.append(bench(f"synthetic {size}", nodes, graph, random_queries(nodes, args.queries)))
+
+    print("sizes in KiB; query times are median µs per route\n")
+    print(
+        format_table(
+            rows,
+            (
+                "graph",
+                "nodes",
+                "next",
+                "build s",
+                "next KiB",
+                "memory KiB",
+                "json KiB",
+                "gzip KiB",
+                "A* µs",
+                "table µs",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
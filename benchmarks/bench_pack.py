@@ -0,0 +1,205 @@
+"""Floor data as JSON vs binary floor packs: bytes and time to load.
+
+For the real floors and synthetic floors with a zone around every room,
+compares the compact JSON of the nodes/graph and zones files with their
+pack (:mod:`campus_connect.pack`), raw and gzipped. Load times are the
+median of ``--repeat`` runs of ``json.loads`` of both documents, of
+opening the pack from a memory-mapped file (the arrays are then usable in
+place) and of decoding the whole pack back to the JSON structures.
+
+With ``node`` on the ``PATH``, the page's own decoder
+(``decodeFloorPack()``) is timed against ``JSON.parse`` as well.
+
+    python benchmarks/bench_pack.py --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loadgen import ROOT, format_table
+from synthetic import synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS, load_nodes, load_zones  # noqa: E402
+from campus_connect.pack import FloorPack, encode_floor  # noqa: E402
+from campus_connect.zones import zone_record  # noqa: E402
+
+PAGE = ROOT / "campus-connect-merged.html"
+
+
+def room_zones(nodes: List[Dict[str, Any]], radius: float = 30.0) -> List[Dict[str, Any]]:
+    """An octagonal classroom zone around every searchable node."""
+    zones = []
+    for node in nodes:
+        if not node["searchable"]:
+            continue
+        x, y = node["x"], node["y"]
+        angles = [k * math.pi / 4 for k in range(8)]
+        ring = [(x + radius * math.cos(a), y + radius * math.sin(a)) for a in angles]
+        zones.append({"id": f"zone_{node['id']}", **zone_record("classroom", "#FFD6D4", ring)})
+    return zones
+
+
+#: Times the page's decoder against ``JSON.parse``, collecting garbage before
+#: every run so neither pays for the other's; argv: repeat, pack, JSON files.
+NODE_HARNESS = """
+const fs = require('fs');
+const [repeat, pack, ...documents] = process.argv.slice(2);
+const texts = documents.map(path => fs.readFileSync(path, 'utf8'));
+const bytes = fs.readFileSync(pack);
+const buffer = bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length);
+function median(run) {
+    const samples = [];
+    for (let i = 0; i < Number(repeat); i++) {
+        global.gc();
+        const began = process.hrtime.bigint();
+        run();
+        samples.push(Number(process.hrtime.bigint() - began) / 1e6);
+    }
+    return samples.sort((a, b) => a - b)[samples.length >> 1];
+}
+console.log(JSON.stringify([
+    median(() => texts.map(text => JSON.parse(text))),
+    median(() => decodeFloorPack(buffer))
+]));
+"""
+
+
+def page_decoder() -> Optional[str]:
+    """Source of ``decodeFloorPack()`` from the page, if ``node`` can run it."""
+    if shutil.which("node") is None:
+        return None
+    page = PAGE.read_text(encoding="utf-8")
+    found = re.search(r"\n( *)function decodeFloorPack\(.*?\n\1\}\n", page, re.S)
+    return found.group(0) if found else None
+
+
+def page_ms(decoder: str, pack: Path, documents: List[Path], repeat: int) -> Tuple[float, float]:
+    script = pack.with_suffix(".js")
+    script.write_text(decoder + NODE_HARNESS, encoding="utf-8")
+    output = subprocess.run(
+        ["node", "--expose-gc", str(script), str(repeat), str(pack), *map(str, documents)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    parsed, decoded = json.loads(output)
+    return parsed, decoded
+
+
+def median_ms(run: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples) * 1e3
+
+
+def measure(
+    name: str, nodes, graph, zones, repeat: int, directory: Path, decoder: Optional[str]
+) -> List[object]:
+    documents = [
+        json.dumps(data, separators=(",", ":")).encode("utf-8")
+        for data in ({"nodes": nodes, "graph": graph}, zones)
+    ]
+    body = encode_floor(nodes, graph, zones)
+    path = directory / f"{name.replace(' ', '_')}.ccfp"
+    path.write_bytes(body)
+
+    def parse_json() -> None:
+        for document in documents:
+            json.loads(document)
+
+    def open_pack() -> None:
+        FloorPack.open(path).close()
+
+    def decode_pack() -> None:
+        pack = FloorPack.open(path)
+        pack.nodes(), pack.graph(), pack.zones()
+        pack.close()
+
+    parsed = median_ms(parse_json, repeat)
+    decoded = median_ms(decode_pack, repeat)
+    text = sum(len(document) for document in documents)
+    page = []
+    if decoder is not None:
+        files = [path.with_suffix(f".{n}.json") for n in range(len(documents))]
+        for file, document in zip(files, documents):
+            file.write_bytes(document)
+        page = [f"{ms:.2f}" for ms in page_ms(decoder, path, files, repeat)]
+    return [
+        name,
+        len(nodes),
+        sum(len(edges) for edges in graph.values()),
+        len(zones),
+        text,
+        len(body),
+        f"{text / len(body):.1f}x",
+        sum(len(gzip.compress(document)) for document in documents),
+        len(gzip.compress(body)),
+        f"{parsed:.2f}",
+        f"{median_ms(open_pack, repeat):.3f}",
+        f"{decoded:.2f}",
+        *page,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    decoder = page_decoder()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for floor in FLOORS:
+            nodes, graph = load_nodes(ROOT, floor)
+            zones = load_zones(ROOT, floor)
+            rows.append(measure(floor.id, nodes, graph, zones, args.repeat, directory, decoder))
+        for size in args.sizes:
+            nodes, graph = synthetic_floor(size)
+            zones = room_zones(nodes)
+            name = f"synthetic {size}"
+            rows.append(measure(name, nodes, graph, zones, args.repeat, directory, decoder))
+    print(f"median of {args.repeat} loads; json is compact JSON of the nodes and zones files")
+    if decoder is None:
+        print("node not found; the page's decoder is not timed")
+    print()
+    header = (
+        "floor",
+        "nodes",
+        "edges",
+        "zones",
+        "json bytes",
+        "pack bytes",
+        "smaller",
+        "json gzip",
+        "pack gzip",
+        "json ms",
+        "open ms",
+        "decode ms",
+    )
+    if decoder is not None:
+        header += ("page json ms", "page pack ms")
+    print(format_table(rows, header))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Floor switch time with and without prefetching the adjacent floors.
+
+A user walks the building: first, second, third, second, first. Every
+switch fetches the new floor's bundle and pack by their hashed URLs on two
+connections, like ``loadApplication()``, and decodes them. The cold run
+does only that. The warm run does what the page does once a floor is up:
+ask ``/api/floor/<id>/prefetch`` which files to warm and fetch them in the
+background on two more connections while the user looks at the plan
+(``--think``); a switch then takes its files from there, waiting for any
+still in flight. Each floor's bundle must name the same files in its
+``Link`` header. ``--rtt`` adds a simulated round trip to every request.
+
+    python benchmarks/bench_prefetch.py --rtt 0.08 --think 0.5 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Sequence
+
+from bench_bundle import decode, fetch
+from loadgen import ROOT, Connection, Reply, format_table, free_port, start_campus_server
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.bundle import bundle_url  # noqa: E402
+from campus_connect.pack import FloorPack, pack_url  # noqa: E402
+from campus_connect.prefetch import link_header, prefetch_url  # noqa: E402
+
+WALK = ("first", "second", "third", "second", "first")
+
+
+class Client:
+    """The page's connections, asset manifest and prefetched files."""
+
+    def __init__(self, port: int, manifest: Dict[str, str]) -> None:
+        self.manifest = manifest
+        self.conns = [Connection("127.0.0.1", port) for _ in range(2)]
+        self.background = [Connection("127.0.0.1", port) for _ in range(2)]
+        self.prefetched: Dict[str, "asyncio.Future[Reply]"] = {}
+        self.prefetched_bytes = 0
+        self.used_bytes = 0
+
+    async def take(self, conn: Connection, url: str, rtt: float) -> Reply:
+        pending = self.prefetched.pop(url, None)
+        if pending is not None:
+            reply = await pending
+            self.used_bytes += len(reply.body)
+            return reply
+        return await fetch(conn, "/" + url, rtt)
+
+    async def switch(self, floor: str, rtt: float) -> None:
+        bundle, pack = await asyncio.gather(
+            self.take(self.conns[0], self.manifest[bundle_url(floor)], rtt),
+            self.take(self.conns[1], self.manifest[pack_url(floor)], rtt),
+        )
+        json.loads(decode(bundle))
+        floor_pack = FloorPack(decode(pack))
+        floor_pack.nodes(), floor_pack.graph(), floor_pack.zones()
+
+    async def prefetch(self, floor: str, rtt: float) -> List[str]:
+        reply = await fetch(self.conns[0], "/" + prefetch_url(floor), rtt)
+        urls = json.loads(decode(reply))["urls"]
+        for url in list(self.prefetched):
+            if url not in urls:
+                del self.prefetched[url]
+        loop = asyncio.get_running_loop()
+        fresh = [url for url in urls if url not in self.prefetched]
+        for url in fresh:
+            self.prefetched[url] = loop.create_future()
+        for conn, share in zip(self.background, (fresh[0::2], fresh[1::2])):
+            asyncio.create_task(self._warm(conn, share, rtt))
+        return urls
+
+    async def _warm(self, conn: Connection, urls: Sequence[str], rtt: float) -> None:
+        for url in urls:
+            reply = await fetch(conn, "/" + url, rtt)
+            self.prefetched_bytes += len(reply.body)
+            future = self.prefetched.get(url)
+            if future is not None and not future.done():
+                future.set_result(reply)
+
+    async def close(self) -> None:
+        for conn in self.conns + self.background:
+            await conn.close()
+
+
+async def check_hints(port: int, manifest: Dict[str, str]) -> None:
+    conn = Connection("127.0.0.1", port)
+    for floor in dict.fromkeys(WALK):
+        urls = json.loads(decode(await fetch(conn, "/" + prefetch_url(floor), 0)))["urls"]
+        bundle = await fetch(conn, "/" + manifest[bundle_url(floor)], 0)
+        if bundle.headers.get("link", "") != link_header(urls):
+            raise RuntimeError(f"{floor}: Link header does not match the prefetch list")
+    await conn.close()
+
+
+async def walk(port: int, manifest: Dict[str, str], warm: bool, rtt: float, think: float):
+    client = Client(port, manifest)
+    samples = []
+    for step, floor in enumerate(WALK):
+        started = time.perf_counter()
+        await client.switch(floor, rtt)
+        if step:
+            samples.append(time.perf_counter() - started)
+        if warm:
+            await client.prefetch(floor, rtt)
+        await asyncio.sleep(think)
+    await client.close()
+    return samples, client.prefetched_bytes, client.prefetched_bytes - client.used_bytes
+
+
+async def measure(port: int, rtt: float, think: float, repeat: int):
+    conn = Connection("127.0.0.1", port)
+    manifest = json.loads(decode(await fetch(conn, "/asset-manifest.json", 0)))
+    await conn.close()
+    await check_hints(port, manifest)
+    results = {}
+    for name, warm in (("cold", False), ("prefetch", True)):
+        samples: List[float] = []
+        for _ in range(repeat):
+            switches, prefetched, unused = await walk(port, manifest, warm, rtt, think)
+            samples += switches
+        results[name] = statistics.median(samples), max(samples), prefetched, unused
+    cold = results["cold"][0]
+    return [
+        (
+            name,
+            f"{median * 1000:.1f}",
+            f"{worst * 1000:.1f}",
+            f"{cold / median:.2f}x",
+            prefetched,
+            unused,
+        )
+        for name, (median, worst, prefetched, unused) in results.items()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt", type=float, default=0.05, help="simulated round trip (s)")
+    parser.add_argument("--think", type=float, default=0.3, help="time on each floor (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_campus_server(port)
+    try:
+        rows = asyncio.run(measure(port, args.rtt, args.think, args.repeat))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(
+        f"{len(WALK) - 1} switches ({' > '.join(WALK)}) x {args.repeat}, "
+        f"simulated RTT {args.rtt * 1000:.0f} ms, {args.think * 1000:.0f} ms on each floor\n"
+    )
+    print(
+        format_table(
+            rows,
+            ("mode", "switch ms", "worst ms", "speedup", "prefetched bytes", "unused bytes"),
+        )
+    )
+    print("\nbytes are per walk; Link headers match the prefetch lists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Load benchmark for ``/api/route``: many phones asking for routes at once.
+
+Every ordered pair of connected searchable nodes on every floor is
+requested round-robin from ``--concurrency`` keep-alive clients.
+
+    python benchmarks/bench_route.py --concurrency 1000 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from urllib.parse import urlencode
+
+from loadgen import ROOT, format_table, free_port, run_load, start_campus_server
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS, load_nodes  # noqa: E402
+from campus_connect.routing import RoutingEngine  # noqa: E402
+
+
+def route_paths():
+    engine = RoutingEngine.load(ROOT)
+    paths = []
+    for floor in FLOORS:
+        nodes, _ = load_nodes(ROOT, floor)
+        ids = [node["id"] for node in nodes if node.get("searchable")]
+        for a in ids:
+            for b in ids:
+                if a != b and engine.route(floor.id, a, b) is not None:
+                    paths.append("/api/route?" + urlencode({"floor": floor.id, "from": a, "to": b}))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    paths = route_paths()
+    port = free_port()
+    proc = start_campus_server(port, "--max-connections", str(args.concurrency * 2))
+    try:
+        result = asyncio.run(
+            run_load("127.0.0.1", port, paths, concurrency=args.concurrency, duration=args.duration)
+        )
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(f"{len(paths)} distinct route queries, {args.concurrency} concurrent clients\n")
+    print(
+        format_table(
+            [
+                (
+                    result.requests,
+                    result.errors,
+                    f"{result.rps:.0f}",
+                    f"{result.percentile(50) * 1000:.1f}",
+                    f"{result.percentile(99) * 1000:.1f}",
+                )
+            ],
+            ("requests", "errors", "req/s", "p50 ms", "p99 ms"),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
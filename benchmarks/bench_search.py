@@ -0,0 +1,140 @@
+"""Label search: ``includes()`` filter vs the trigram + prefix index.
+
+Times :class:`campus_connect.search.LabelIndex` against the page's filter
+(``label.toLowerCase().includes(query)`` over every label, first 15 kept) on
+synthetic label corpora, with queries typed one character at a time.
+
+A second table grows a campus to dozens of floors (``--floors``, each with
+``--per-floor`` places) and compares one campus-wide index against
+searching every floor's index in turn.
+
+    python benchmarks/bench_search.py --sizes 1000 10000 100000 --floors 3 30 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from loadgen import ROOT, format_table
+from synthetic import synthetic_labels
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.search import Document, LabelIndex  # noqa: E402
+
+
+def keystrokes(labels, count: int, seed: int = 3):
+    """Prefixes of random labels, as typed: ``"l"``, ``"la"``, ``"lab"``, ..."""
+    rng = random.Random(seed)
+    typed = []
+    for label in rng.sample(labels, count):
+        typed.extend(label.lower()[:length] for length in range(1, len(label) + 1))
+    return typed
+
+
+def timings(run, queries):
+    samples = []
+    for query in queries:
+        began = time.perf_counter()
+        run(query)
+        samples.append(time.perf_counter() - began)
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def bench(size: int, words: int, k: int):
+    labels = synthetic_labels(size)
+    began = time.perf_counter()
+    index = LabelIndex(Document("campus", str(i), label) for i, label in enumerate(labels))
+    build = time.perf_counter() - began
+    lowered = [label.lower() for label in labels]
+    queries = keystrokes(labels, words)
+
+    def scan(query):
+        return [label for label in lowered if query in label][:k]
+
+    scan_p50, scan_p99 = timings(scan, queries)
+    index_p50, index_p99 = timings(lambda query: index.search_numbers(query, k), queries)
+    return [
+        size,
+        f"{build:.2f}",
+        len(queries),
+        f"{scan_p50:.0f}",
+        f"{scan_p99:.0f}",
+        f"{index_p50:.1f}",
+        f"{index_p99:.1f}",
+    ]
+
+
+def bench_floors(floors: int, per_floor: int, words: int, k: int):
+    labels = synthetic_labels(floors * per_floor)
+    documents = [
+        Document(f"floor_{i // per_floor}", str(i), label) for i, label in enumerate(labels)
+    ]
+    began = time.perf_counter()
+    campus = LabelIndex(documents)
+    build = time.perf_counter() - began
+    per_floor_indexes = [
+        LabelIndex(documents[start : start + per_floor])
+        for start in range(0, len(documents), per_floor)
+    ]
+    queries = keystrokes(labels, words)
+
+    def each_floor(query):
+        return [index.search_numbers(query, k) for index in per_floor_indexes]
+
+    loop_p50, loop_p99 = timings(each_floor, queries)
+    campus_p50, campus_p99 = timings(lambda query: campus.search_numbers(query, k), queries)
+    return [
+        floors,
+        len(documents),
+        f"{build:.2f}",
+        f"{loop_p50:.0f}",
+        f"{loop_p99:.0f}",
+        f"{campus_p50:.1f}",
+        f"{campus_p99:.1f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--words", type=int, default=50, help="labels typed out per corpus")
+    parser.add_argument("-k", type=int, default=15)
+    parser.add_argument("--floors", type=int, nargs="*", default=[3, 30, 100])
+    parser.add_argument("--per-floor", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = [bench(size, args.words, args.k) for size in args.sizes]
+    print(f"µs per keystroke, top {args.k}\n")
+    print(
+        format_table(
+            rows,
+            ("labels", "build s", "queries", "scan p50", "scan p99", "index p50", "index p99"),
+        )
+    )
+
+    rows = [bench_floors(floors, args.per_floor, args.words, args.k) for floors in args.floors]
+    print(f"\ncampus-wide search, {args.per_floor} places per floor, µs per keystroke\n")
+    print(
+        format_table(
+            rows,
+            (
+                "floors",
+                "places",
+                "build s",
+                "per-floor p50",
+                "per-floor p99",
+                "campus p50",
+                "campus p99",
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
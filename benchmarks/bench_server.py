@@ -0,0 +1,78 @@
+"""Load benchmark: ``campus_connect`` server vs ``python -m http.server``.
+
+Both servers are started as subprocesses serving the repository root and are
+hit with the same mix of requests a floor load makes (page, floor SVG, node
+and zone JSON, an icon). Reports requests/sec and latency percentiles.
+
+    python benchmarks/bench_server.py --concurrency 50 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from loadgen import (
+    format_table,
+    free_port,
+    run_load,
+    start_campus_server,
+    start_stdlib_server,
+)
+
+PATHS = (
+    "/campus-connect-merged.html",
+    "/floors/second-floor.svg",
+    "/data/second_floor_nodes.json",
+    "/data/second_floor_zones.json",
+    "/assets/back.svg",
+    "/floors/third-floor.svg",
+    "/data/third_floor_nodes.json",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rows = []
+    for name, start in (("http.server", start_stdlib_server), ("campus_connect", start_campus_server)):
+        port = free_port()
+        proc = start(port)
+        try:
+            result = asyncio.run(
+                run_load(
+                    "127.0.0.1",
+                    port,
+                    PATHS,
+                    concurrency=args.concurrency,
+                    duration=args.duration,
+                )
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+        rows.append(
+            (
+                name,
+                result.requests,
+                result.errors,
+                result.connects,
+                f"{result.rps:.0f}",
+                f"{result.percentile(50) * 1000:.1f}",
+                f"{result.percentile(99) * 1000:.1f}",
+            )
+        )
+
+    print(f"{args.concurrency} concurrent clients, {args.duration:.0f}s per server\n")
+    print(
+        format_table(
+            rows, ("server", "requests", "errors", "connections", "req/s", "p50 ms", "p99 ms")
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
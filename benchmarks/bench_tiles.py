@@ -0,0 +1,148 @@
+"""Bytes a phone downloads per pan/zoom session: whole plan vs vector tiles.
+
+Replays scripted sessions on a phone-sized map view against each floor's
+tile pyramid (:mod:`campus_connect.tiles`), choosing the level and the
+visible tiles the way the page does, and sums the compressed bytes of the
+distinct tiles fetched. The baseline is the whole (optimized, if built)
+plan, fetched once per session.
+
+Tiles written by ``python -m campus_connect build`` are read from disk;
+otherwise they are rendered and compressed here.
+
+    python benchmarks/bench_tiles.py --sessions 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+from typing import Dict, List, Set, Tuple
+
+from loadgen import ROOT, format_table
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.compress import available_encoders  # noqa: E402
+from campus_connect.floors import FLOORS  # noqa: E402
+from campus_connect.static import load_variants  # noqa: E402
+from campus_connect.svgopt import floor_svg  # noqa: E402
+from campus_connect.tiles import TILE_PIXELS, Pyramid, built_version, tile_path  # noqa: E402
+
+#: Map area of a phone in portrait, in CSS pixels.
+VIEWPORT = (390, 664)
+
+Tile = Tuple[int, int, int]
+
+#: Session scripts: (zoom relative to fitting the plan, pan steps at that zoom).
+SESSIONS = {
+    "glance": [(1, 0)],
+    "find room": [(1, 0), (4, 0), (8, 2)],
+    "browse": [(1, 0), (2, 6), (4, 4)],
+    "deep": [(1, 0), (16, 5)],
+}
+
+
+class TileSizes:
+    """Compressed size of every tile, from the build or rendered on demand."""
+
+    def __init__(self, pyramid: Pyramid, encoding: str) -> None:
+        self.pyramid = pyramid
+        self.encoding = encoding
+        self.built = built_version(ROOT, pyramid.floor) == pyramid.version
+        self.encode = available_encoders()[encoding]
+        self.sizes: Dict[Tile, int] = {}
+
+    def __getitem__(self, tile: Tile) -> int:
+        if tile not in self.sizes:
+            if self.built:
+                path = tile_path(ROOT, self.pyramid.floor, *tile)
+                body = load_variants(path).get(self.encoding) or path.read_bytes()
+            else:
+                body = self.encode(self.pyramid.render(*tile).encode("utf-8"))
+            self.sizes[tile] = len(body)
+        return self.sizes[tile]
+
+
+def visible_tiles(pyramid: Pyramid, center: Tuple[float, float], scale: float) -> List[Tile]:
+    """Tiles the page loads for a view ``scale`` pixels per unit around ``center``."""
+    z = max(0, min(pyramid.max_zoom, math.ceil(math.log2(pyramid.extent * scale / TILE_PIXELS))))
+    half_w, half_h = VIEWPORT[0] / 2 / scale, VIEWPORT[1] / 2 / scale
+    side = pyramid.side(z)
+    columns, rows = pyramid.columns(z)
+    left, top = pyramid.view[0], pyramid.view[1]
+
+    def cell(value: float, origin: float, count: int) -> int:
+        return max(0, min(count - 1, math.floor((value - origin) / side)))
+
+    xs = range(cell(center[0] - half_w, left, columns), cell(center[0] + half_w, left, columns) + 1)
+    ys = range(cell(center[1] - half_h, top, rows), cell(center[1] + half_h, top, rows) + 1)
+    return [(z, x, y) for x in xs for y in ys]
+
+
+def replay(pyramid: Pyramid, script, rng: random.Random) -> Set[Tile]:
+    width, height = pyramid.view[2] - pyramid.view[0], pyramid.view[3] - pyramid.view[1]
+    fit = min(VIEWPORT[0] / width, VIEWPORT[1] / height)
+    fetched: Set[Tile] = set()
+    middle = center = (pyramid.view[0] + width / 2, pyramid.view[1] + height / 2)
+    for zoom, pans in script:
+        scale = fit * zoom
+        if zoom > 1 and scale > fit * 1.01 and center == middle:
+            center = (
+                pyramid.view[0] + rng.uniform(0.2, 0.8) * width,
+                pyramid.view[1] + rng.uniform(0.2, 0.8) * height,
+            )
+        fetched.update(visible_tiles(pyramid, center, scale))
+        for _ in range(pans):
+            # Drag by half a screen in a random direction.
+            angle = rng.uniform(0, 2 * math.pi)
+            center = (
+                center[0] + math.cos(angle) * VIEWPORT[0] / 2 / scale,
+                center[1] + math.sin(angle) * VIEWPORT[1] / 2 / scale,
+            )
+            fetched.update(visible_tiles(pyramid, center, scale))
+    return fetched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="sessions per script and floor")
+    parser.add_argument("--encoding", choices=sorted(available_encoders()), default="br")
+    args = parser.parse_args()
+    encode = available_encoders()[args.encoding]
+
+    rows = []
+    for floor in FLOORS:
+        text = floor_svg(ROOT, floor)
+        plan = len(encode(text.encode("utf-8")))
+        pyramid = Pyramid.build(floor, text)
+        sizes = TileSizes(pyramid, args.encoding)
+        rng = random.Random(7)
+        for name, script in SESSIONS.items():
+            sessions = [replay(pyramid, script, rng) for _ in range(args.sessions)]
+            tiles = sum(len(fetched) for fetched in sessions) / len(sessions)
+            tiled = sum(sizes[tile] for fetched in sessions for tile in fetched) / len(sessions)
+            rows.append(
+                [
+                    floor.id,
+                    name,
+                    f"{tiles:.1f}",
+                    f"{plan / 1024:.1f}",
+                    f"{tiled / 1024:.1f}",
+                    f"{100.0 * (plan - tiled) / plan:.0f}%",
+                ]
+            )
+    print(
+        f"{args.encoding} KiB per session, {VIEWPORT[0]}x{VIEWPORT[1]} view,"
+        f" mean of {args.sessions}\n"
+    )
+    print(
+        format_table(
+            rows, ("floor", "session", "tiles", "whole plan", "tiled", "saved")
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Wall-crossing check: every edge against every wall vs the segment grid.
+
+Checks the graph edges of synthetic floors against random short wall
+segments spread over the same area, with :class:`SegmentIndex` and by
+testing each edge against every segment. The scan is timed on a sample of
+the edges and scaled up; the crossings it finds there are compared with
+the index's. The real floors are checked with the index too.
+
+    python benchmarks/bench_walls.py --walls 100000 --nodes 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from loadgen import ROOT, format_table
+from synthetic import synthetic_floor
+
+sys.path.insert(0, str(ROOT))
+
+from campus_connect.floors import FLOORS  # noqa: E402
+from campus_connect.lod import crosses  # noqa: E402
+from campus_connect.walls import SegmentIndex, check_edges, check_floor, graph_edges  # noqa: E402
+
+
+def random_walls(count: int, extent, seed: int = 5):
+    """``count`` wall pieces 5 to 40 units long, axis-aligned like most walls."""
+    rng = random.Random(seed)
+    walls = []
+    for _ in range(count):
+        x, y = rng.uniform(extent[0], extent[2]), rng.uniform(extent[1], extent[3])
+        length = rng.uniform(5, 40)
+        if rng.random() < 0.5:
+            walls.append(((x, y), (x + length, y)))
+        else:
+            walls.append(((x, y), (x, y + length)))
+    return walls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--walls", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--nodes", type=int, default=8_000)
+    parser.add_argument("--sample", type=int, default=200, help="edges timed by the scan")
+    args = parser.parse_args()
+
+    nodes, graph = synthetic_floor(args.nodes)
+    positions = {node["id"]: (node["x"], node["y"]) for node in nodes}
+    edges = graph_edges(graph)
+    xs = [x for x, _ in positions.values()]
+    ys = [y for _, y in positions.values()]
+    extent = (min(xs), min(ys), max(xs), max(ys))
+    sample = random.Random(9).sample(edges, min(args.sample, len(edges)))
+
+    rows = []
+    for count in args.walls:
+        walls = random_walls(count, extent)
+        began = time.perf_counter()
+        index = SegmentIndex.build(walls)
+        built = time.perf_counter() - began
+        began = time.perf_counter()
+        found = check_edges("synthetic", index, positions, edges)
+        checked = time.perf_counter() - began
+
+        began = time.perf_counter()
+        scanned = {
+            (a, b)
+            for a, b in sample
+            if any(crosses(positions[a], positions[b], p, q) for p, q in walls)
+        }
+        scan = (time.perf_counter() - began) / len(sample) * len(edges)
+        indexed = {crossing.edge for crossing in found}
+        differ = len(scanned ^ (indexed & set(sample)))
+        rows.append(
+            [
+                count,
+                len(edges),
+                f"{built * 1e3:.0f}",
+                f"{checked * 1e3:.0f}",
+                f"{scan * 1e3:.0f}",
+                f"{scan / checked:.0f}x",
+                len(found),
+                differ,
+            ]
+        )
+    print(f"synthetic floor of {len(nodes)} nodes, scan timed on {len(sample)} edges\n")
+    print(
+        format_table(
+            rows,
+            (
+                "walls",
+                "edges",
+                "index ms",
+                "check ms",
+                "scan ms",
+                "speedup",
+                "crossings",
+                "differ",
+            ),
+        )
+    )
+
+    rows = []
+    for floor in FLOORS:
+        began = time.perf_counter()
+        walls, count, crossings = check_floor(ROOT, floor)
+        took = time.perf_counter() - began
+        rows.append([floor.id, walls, count, len(crossings), f"{took * 1e3:.0f}"])
+    print()
+    print(format_table(rows, ("floor", "wall segments", "edges", "crossings", "ms with parse")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Small asyncio HTTP load generator shared by the benchmark scripts.
+
+It speaks just enough HTTP/1.x to reuse connections when the server allows
+it and to reconnect when it does not (``python -m http.server`` closes after
+every response), so both servers are measured with the same client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Reply:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class Connection:
+    """One client connection that transparently reconnects when closed."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connects = 0
+
+    async def request(
+        self, path: str, headers: Optional[Dict[str, str]] = None, method: str = "GET"
+    ) -> Reply:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.connects += 1
+        assert self.reader is not None
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        version, status = status_line.split(" ")[:2]
+        reply_headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                reply_headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in ("204", "304"):
+            body = b""
+        elif "content-length" in reply_headers:
+            body = await self.reader.readexactly(int(reply_headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            reply_headers["connection"] = "close"
+
+        connection = reply_headers.get("connection", "").lower()
+        if connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive"):
+            await self.close()
+        return Reply(int(status), reply_headers, body)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    bytes: int = 0
+    connects: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+async def run_load(
+    host: str,
+    port: int,
+    paths: Sequence[str],
+    *,
+    concurrency: int,
+    duration: float,
+    headers: Optional[Dict[str, str]] = None,
+) -> LoadResult:
+    """Hit ``paths`` round-robin from ``concurrency`` clients for ``duration`` seconds."""
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+
+    async def client(offset: int) -> None:
+        conn = Connection(host, port)
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                reply = await conn.request(path, headers)
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                result.errors += 1
+                await conn.close()
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.requests += 1
+            result.bytes += len(reply.body)
+            if reply.status >= 400:
+                result.errors += 1
+        result.connects += conn.connects
+        await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def start_process(args: Sequence[str], port: int) -> subprocess.Popen:
+    """Start ``args`` (a server command) from the repo root and wait for ``port``."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.Popen(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+    except RuntimeError:
+        proc.kill()
+        raise
+    return proc
+
+
+def start_campus_server(port: int, *extra: str) -> subprocess.Popen:
+    return start_process(
+        ["-m", "campus_connect", "serve", "--host", "127.0.0.1", "--port", str(port), *extra],
+        port,
+    )
+
+
+def start_stdlib_server(port: int) -> subprocess.Popen:
+    return start_process(["-m", "http.server", str(port), "--bind", "127.0.0.1"], port)
+
+
+def format_table(rows: Sequence[Sequence[object]], header: Tuple[str, ...]) -> str:
+    cells = [tuple(str(c) for c in header)] + [tuple(str(c) for c in row) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(row, widths)) for row in cells]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
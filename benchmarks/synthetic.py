@@ -0,0 +1,150 @@
+"""Synthetic campus floors for scaling benchmarks.
+
+A floor is a jittered grid of corridor intersections with rooms hanging off
+them, written in the same ``nodes``/``graph`` schema as
+``data/*_floor_nodes.json`` with Euclidean edge weights.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Dict, List, Tuple
+
+Floor = Tuple[List[Dict[str, Any]], Dict[str, Dict[str, float]]]
+
+
+def synthetic_floor(
+    node_count: int,
+    *,
+    rooms_per_junction: int = 2,
+    spacing: float = 120.0,
+    drop_edges: float = 0.1,
+    corridor_points: int = 0,
+    seed: int = 0,
+) -> Floor:
+    """Build a connected floor with roughly ``node_count`` nodes.
+
+    ``corridor_points`` splits every corridor between two junctions with
+    that many ``invisible`` waypoints, on top of ``node_count``.
+    """
+    rng = random.Random(seed)
+    junctions = max(4, node_count // (rooms_per_junction + 1))
+    cols = max(2, int(math.sqrt(junctions)))
+    rows = max(2, junctions // cols)
+
+    nodes: List[Dict[str, Any]] = []
+    graph: Dict[str, Dict[str, float]] = {}
+    coords: Dict[str, Tuple[float, float]] = {}
+
+    def add(node_id: str, x: float, y: float, label: str, node_type: str, searchable: bool):
+        nodes.append(
+            {
+                "id": node_id,
+                "x": round(x, 2),
+                "y": round(y, 2),
+                "label": label,
+                "type": node_type,
+                "searchable": searchable,
+                "cluster_size": 1,
+            }
+        )
+        coords[node_id] = (round(x, 2), round(y, 2))
+        graph[node_id] = {}
+
+    def link(a: str, b: str) -> None:
+        (ax, ay), (bx, by) = coords[a], coords[b]
+        weight = math.hypot(bx - ax, by - ay)
+        graph[a][b] = weight
+        graph[b][a] = weight
+
+    corridors: List[Tuple[str, str]] = []
+
+    def corridor(a: str, b: str) -> None:
+        link(a, b)
+        corridors.append((a, b))
+
+    for r in range(rows):
+        for c in range(cols):
+            jitter = spacing * 0.2
+            add(
+                f"junction_{r}_{c}",
+                c * spacing + rng.uniform(-jitter, jitter),
+                r * spacing + rng.uniform(-jitter, jitter),
+                f"Junction {r}-{c}",
+                "intersection",
+                False,
+            )
+
+    for r in range(rows):
+        for c in range(cols):
+            here = f"junction_{r}_{c}"
+            # Keep the first row and column intact so the floor stays connected.
+            if c + 1 < cols and (r == 0 or rng.random() >= drop_edges):
+                corridor(here, f"junction_{r}_{c + 1}")
+            if r + 1 < rows and (c == 0 or rng.random() >= drop_edges):
+                corridor(here, f"junction_{r + 1}_{c}")
+
+    room = 0
+    for r in range(rows):
+        for c in range(cols):
+            jx, jy = coords[f"junction_{r}_{c}"]
+            for _ in range(rooms_per_junction):
+                if len(nodes) >= node_count:
+                    break
+                room += 1
+                angle = rng.uniform(0, 2 * math.pi)
+                add(
+                    f"class_{room}",
+                    jx + math.cos(angle) * spacing * 0.3,
+                    jy + math.sin(angle) * spacing * 0.3,
+                    f"Classroom {room}",
+                    "class",
+                    True,
+                )
+                link(f"class_{room}", f"junction_{r}_{c}")
+
+    waypoint = 0
+    for a, b in corridors if corridor_points else ():
+        del graph[a][b], graph[b][a]
+        (ax, ay), (bx, by) = coords[a], coords[b]
+        previous = a
+        for step in range(1, corridor_points + 1):
+            waypoint += 1
+            t = step / (corridor_points + 1)
+            name = f"invisible_{waypoint}"
+            add(name, ax + (bx - ax) * t, ay + (by - ay) * t, "", "invisible", False)
+            link(previous, name)
+            previous = name
+        link(previous, b)
+    return nodes, graph
+
+
+def random_queries(nodes: List[Dict[str, Any]], count: int, seed: int = 1) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    rooms = [node["id"] for node in nodes if node["searchable"]] or [n["id"] for n in nodes]
+    return [(rng.choice(rooms), rng.choice(rooms)) for _ in range(count)]
+
+
+ROOM_KINDS = (
+    "Classroom",
+    "Lab",
+    "Lecture Hall",
+    "Staff Room",
+    "Seminar Room",
+    "Store Room",
+    "Health Centre",
+    "Library",
+    "Washroom",
+    "Office",
+)
+
+
+def synthetic_labels(count: int, seed: int = 0) -> List[str]:
+    """Room labels like ``"Lab B203"`` for a campus of ``count`` places."""
+    rng = random.Random(seed)
+    labels = []
+    for _ in range(count):
+        block = rng.choice("ABCDEFGH")
+        labels.append(f"{rng.choice(ROOM_KINDS)} {block}{rng.randint(1, 9)}{rng.randint(0, 99):02d}")
+    return labels
@@ -0,0 +1,15 @@
+"""Campus Connect server and build tooling.
+
+The browser application lives in ``campus-connect-merged.html``; this package
+serves it together with the floor plans in ``floors/`` and the navigation data
+in ``data/``.
+"""
+
+from pathlib import Path
+
+__version__ = "0.1.0"
+
+#: Repository root holding the HTML page, ``floors/``, ``data/`` and ``assets/``.
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent
+
+__all__ = ["DEFAULT_ROOT", "__version__"]
@@ -0,0 +1,111 @@
+"""Command line entry point: ``python -m campus_connect <command>``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from . import DEFAULT_ROOT
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from .server import create_server
+
+    server = create_server(
+        args.root,
+        host=args.host,
+        port=args.port,
+        max_connections=args.max_connections,
+        keepalive_timeout=args.keepalive_timeout,
+        vertical_cost=args.stair_cost,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _build(args: argparse.Namespace) -> int:
+    from . import build
+
+    for name, report in build.run(args.root, args.stage).items():
+        print(f"== {name} ==")
+        print(report)
+        print()
+    return 0
+
+
+def _lint(args: argparse.Namespace) -> int:
+    from . import lint
+
+    if not lint.available():
+        print("linting graphs needs numpy")
+        return 1
+    try:
+        print(lint.format_report(lint.lint_floors(args.root, fix=args.fix)))
+    except lint.LintError as error:
+        print(error)
+        return 1
+    return 0
+
+
+def _check_svg(args: argparse.Namespace) -> int:
+    from . import svgopt
+
+    try:
+        print(svgopt.format_report(svgopt.check_floors(args.root), written=False))
+    except svgopt.VerificationError as error:
+        print(error)
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m campus_connect")
+    parser.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="repository root")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the HTTP server")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--max-connections", type=int, default=1024)
+    serve.add_argument("--keepalive-timeout", type=float, default=15.0)
+    serve.add_argument(
+        "--stair-cost", type=float, help="cost of one floor change in cross-floor routes"
+    )
+    serve.set_defaults(func=_serve)
+
+    build = commands.add_parser("build", help="run the build pipeline")
+    build.add_argument("--stage", action="append", help="run only this stage (repeatable)")
+    build.set_defaults(func=_build)
+
+    check = commands.add_parser("lint", help="check the navigation graphs")
+    check.add_argument(
+        "--fix", action="store_true", help="recompute weights and add missing reverse edges"
+    )
+    check.set_defaults(func=_lint)
+
+    svg = commands.add_parser(
+        "check-svg", help="check that optimized floor plans draw the same as the originals"
+    )
+    svg.set_defaults(func=_check_svg)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
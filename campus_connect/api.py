@@ -0,0 +1,192 @@
+"""JSON API routes of the campus server."""
+
+from __future__ import annotations
+
+import math
+from http import HTTPStatus
+from typing import Any, Optional
+
+from .assets import content_hash
+from .prefetch import link_header, warm_urls
+from .protocol import Request, Response
+from .routing import RoutingEngine, RoutingError
+from .search import SearchService
+from .spatial import SpatialService
+from .static import etag_matches
+
+#: API answers depend only on the deployed data, so shared caches may keep
+#: them briefly; revalidation afterwards is a cheap ETag comparison.
+API_CACHE_CONTROL = "public, max-age=300"
+
+
+def cacheable_json(request: Request, payload: Any) -> Response:
+    """200 JSON response with a strong ETag, or 304 if the client has it."""
+    response = Response.json(200, payload, {"Cache-Control": API_CACHE_CONTROL})
+    etag = f'"{content_hash(response.body)}"'
+    response.headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        response.status = HTTPStatus.NOT_MODIFIED.value
+        response.body = b""
+    return response
+
+
+def api_error(status: HTTPStatus, message: str) -> Response:
+    return Response.json(status.value, {"error": message})
+
+
+def resolve_floor(routing: RoutingEngine, node_id: str, preferred: Optional[str]) -> str:
+    """Floor of ``node_id``: ``preferred`` if given, else the only floor that has it."""
+    if preferred:
+        return preferred
+    floors = routing.locate(node_id)
+    if len(floors) == 1:
+        return floors[0]
+    if not floors:
+        raise RoutingError(f"unknown node {node_id!r}")
+    raise ValueError(f"{node_id!r} exists on floors {', '.join(floors)}; pass a floor")
+
+
+#: Upper bound on ``k`` for ``/api/nearest``.
+MAX_NEAREST = 100
+
+#: Default and upper bound of ``k`` for ``/api/search``.
+SEARCH_RESULTS = 15
+MAX_SEARCH_RESULTS = 100
+
+#: Values of the ``fuzzy`` parameter of ``/api/search``.
+FUZZY_MODES = ("0", "1", "auto")
+
+
+def register(
+    server, routing: RoutingEngine, spatial: SpatialService, search: SearchService
+) -> None:
+    """Register the API routes on ``server``."""
+
+    @server.route("GET", "/api/route")
+    async def route(request: Request) -> Response:
+        """Route between two nodes.
+
+        ``floor`` is the floor of ``from``; ``to_floor`` that of ``to`` and
+        defaults to ``floor`` when ``to`` exists there. Either may be omitted
+        when the node id is unique on campus. Same-floor answers match the
+        floor's next-hop table; cross-floor answers list per-floor ``legs``.
+        """
+        query = request.query
+        missing = [name for name in ("from", "to") if not query.get(name)]
+        if missing:
+            return api_error(HTTPStatus.BAD_REQUEST, f"missing {', '.join(missing)}")
+        start, end = query["from"], query["to"]
+        try:
+            from_floor = resolve_floor(routing, start, query.get("floor"))
+            to_floor = query.get("to_floor")
+            if not to_floor and from_floor in routing.locate(end):
+                to_floor = from_floor
+            to_floor = resolve_floor(routing, end, to_floor)
+            if from_floor == to_floor:
+                result = routing.route(from_floor, start, end)
+            else:
+                result = routing.route_between(from_floor, start, to_floor, end)
+        except ValueError as exc:
+            return api_error(HTTPStatus.BAD_REQUEST, str(exc))
+        except RoutingError as exc:
+            return api_error(HTTPStatus.NOT_FOUND, str(exc))
+        if result is None:
+            return api_error(HTTPStatus.NOT_FOUND, "no path found")
+        return cacheable_json(request, result.to_json())
+
+    @server.route("GET", r"/api/floor/(?P<floor>[^/]+)/prefetch")
+    async def prefetch(request: Request) -> Response:
+        """Hashed URLs of the files of the floors next to ``floor``, to fetch at low priority.
+
+        The ``Link`` hints sent with the floor's bundle name the same URLs.
+        """
+        floor_id = request.params["floor"]
+        try:
+            urls = warm_urls(server.static, floor_id)
+        except KeyError:
+            return api_error(HTTPStatus.NOT_FOUND, f"unknown floor {floor_id!r}")
+        response = cacheable_json(request, {"floor": floor_id, "urls": urls})
+        if urls:
+            response.headers["Link"] = link_header(urls)
+        return response
+
+    @server.route("GET", "/api/nearest")
+    async def nearest(request: Request) -> Response:
+        """Searchable nodes nearest to ``(x, y)`` on ``floor``, in SVG coordinates.
+
+        ``k`` (default 1, at most :data:`MAX_NEAREST`) caps the count,
+        ``radius`` the distance; ``type`` is a comma-separated list of node
+        types to keep.
+        """
+        query = request.query
+        missing = [name for name in ("floor", "x", "y") if not query.get(name)]
+        if missing:
+            return api_error(HTTPStatus.BAD_REQUEST, f"missing {', '.join(missing)}")
+        floor = spatial.floor(query["floor"])
+        if floor is None:
+            return api_error(HTTPStatus.NOT_FOUND, f"unknown floor {query['floor']!r}")
+        try:
+            x, y = float(query["x"]), float(query["y"])
+            k = int(query.get("k", 1))
+            radius = float(query.get("radius", "inf"))
+        except ValueError:
+            return api_error(HTTPStatus.BAD_REQUEST, "x, y, radius must be numbers, k an integer")
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return api_error(HTTPStatus.BAD_REQUEST, "x and y must be finite")
+        if not 1 <= k <= MAX_NEAREST or not radius >= 0:
+            return api_error(HTTPStatus.BAD_REQUEST, f"k must be 1..{MAX_NEAREST}, radius >= 0")
+        types = query["type"].split(",") if query.get("type") else None
+
+        found = floor.nearest(x, y, k, radius=radius, types=types)
+        return cacheable_json(
+            request,
+            {
+                "floor": floor.floor.id,
+                "x": x,
+                "y": y,
+                "nodes": [
+                    {
+                        "id": node["id"],
+                        "label": node.get("label"),
+                        "type": node.get("type"),
+                        "x": node["x"],
+                        "y": node["y"],
+                        "distance": distance,
+                    }
+                    for distance, node in found
+                ],
+            },
+        )
+
+    @server.route("GET", "/api/search")
+    async def search_labels(request: Request) -> Response:
+        """Best ``k`` places whose label matches ``q``, on ``floor`` or campus-wide.
+
+        ``fuzzy=1`` tolerates typos, ranking by edit distance; ``fuzzy=0``
+        never does. By default, typos are tolerated only when nothing
+        matches exactly. Fuzzy results carry their ``distance``.
+        """
+        query = request.query
+        if not query.get("q"):
+            return api_error(HTTPStatus.BAD_REQUEST, "missing q")
+        try:
+            k = int(query.get("k", SEARCH_RESULTS))
+        except ValueError:
+            return api_error(HTTPStatus.BAD_REQUEST, "k must be an integer")
+        if not 1 <= k <= MAX_SEARCH_RESULTS:
+            return api_error(HTTPStatus.BAD_REQUEST, f"k must be 1..{MAX_SEARCH_RESULTS}")
+        mode = query.get("fuzzy", "auto")
+        if mode not in FUZZY_MODES:
+            return api_error(HTTPStatus.BAD_REQUEST, "fuzzy must be 0, 1 or auto")
+        index = search.index(query.get("floor"))
+        if index is None:
+            return api_error(HTTPStatus.NOT_FOUND, f"unknown floor {query['floor']!r}")
+        results = []
+        if mode != "1":
+            results = [document.to_json() for document in index.search(query["q"], k)]
+        if mode == "1" or (mode == "auto" and not results):
+            results = [
+                {**document.to_json(), "distance": distance}
+                for document, distance in search.fuzzy_search(query["q"], k, query.get("floor"))
+            ]
+        return cacheable_json(request, {"q": query["q"], "results": results})
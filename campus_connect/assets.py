@@ -0,0 +1,122 @@
+"""Content-hashed asset URLs.
+
+Floor plans and data files are published under names that embed a hash of
+their content (``data/second_floor_nodes.3f2a9c1b0d4e.json``). Such a URL
+can never change meaning, so it is served with ``Cache-Control: immutable``
+and a browser revisiting an unchanged floor downloads nothing. The page
+resolves logical paths through ``asset-manifest.json``.
+
+:class:`HashCache` keeps the hashes between builds, keyed by each file's
+size and modification time, so a build hashes only the files that changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+#: Files published under fingerprinted names, relative to the root.
+FINGERPRINT_PATTERNS = ("floors/*.svg", "data/*.json")
+
+#: Manifest mapping logical paths to fingerprinted ones. The server
+#: publishes it at ``/asset-manifest.json``; the build writes a copy to
+#: ``build/`` for deploy tooling.
+MANIFEST_FILE = "asset-manifest.json"
+
+#: Directory, relative to the root, receiving build artifacts.
+BUILD_DIR = "build"
+
+#: Hashes of the files the last build saw, under :data:`BUILD_DIR`.
+HASH_CACHE_FILE = "hash-cache.json"
+
+#: Header sent with fingerprinted URLs.
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+DIGEST_LENGTH = 12
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+
+
+class HashCache:
+    """Content hashes of files under ``root``, kept in :data:`HASH_CACHE_FILE`.
+
+    A file is hashed again only when its size or ``st_mtime_ns`` differs
+    from when it was last hashed.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.path = root / BUILD_DIR / HASH_CACHE_FILE
+        self.entries: Dict[str, Dict[str, object]] = {}
+        if self.path.is_file():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+        #: Files looked up, and of those the ones hashed, since loading.
+        self.seen = 0
+        self.hashed = 0
+
+    def digest(self, path: Path) -> Tuple[str, int]:
+        """``(hash, size)`` of ``path``."""
+        stat = path.stat()
+        key = path.relative_to(self.root).as_posix()
+        entry = self.entries.get(key)
+        self.seen += 1
+        if entry is None or (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            self.hashed += 1
+            entry = {
+                "hash": content_hash(path.read_bytes()),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+            }
+            self.entries[key] = entry
+        return str(entry["hash"]), stat.st_size
+
+    def save(self) -> None:
+        if self.hashed:
+            self.path.parent.mkdir(exist_ok=True)
+            self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True) + "\n")
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """``data/a.json`` + ``abc`` -> ``data/a.abc.json``."""
+    stem, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def iter_fingerprinted(root: Path) -> Iterator[Path]:
+    for pattern in FINGERPRINT_PATTERNS:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                yield path
+
+
+def build_manifest(root: Path, cache: Optional[HashCache] = None) -> Dict[str, str]:
+    """Map each fingerprinted file's logical path to its content-hashed path."""
+    cache = cache or HashCache(root)
+    manifest = {}
+    for path in iter_fingerprinted(root):
+        logical = path.relative_to(root).as_posix()
+        manifest[logical] = hashed_name(logical, cache.digest(path)[0])
+    return manifest
+
+
+def encode_manifest(manifest: Dict[str, str]) -> bytes:
+    return json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8") + b"\n"
+
+
+def write_manifest(root: Path, cache: Optional[HashCache] = None) -> Dict[str, str]:
+    cache = cache or HashCache(root)
+    manifest = build_manifest(root, cache)
+    target = root / BUILD_DIR / MANIFEST_FILE
+    target.parent.mkdir(exist_ok=True)
+    target.write_bytes(encode_manifest(manifest))
+    cache.save()
+    return manifest
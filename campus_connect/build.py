@@ -0,0 +1,98 @@
+"""Build pipeline run by ``python -m campus_connect build``.
+
+Each stage takes the repository root and returns a printable report.
+Stages run in the order of :data:`STAGES`; zones are extracted first so the
+manifest and compression see the zone files they write, the graph lint and
+wall check gate the rest of the build, nodes are mapped into the plans'
+frame before anything is built from them, tiles are cut from the optimized
+plans, the floor manifest follows the files it describes, and compression
+comes last so that it also covers files written by earlier stages.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from . import (
+    assets, catalog, compress, lint, navgraph, pack, svgopt, tiles, transform, walls, zones
+)
+
+Stage = Callable[[Path], str]
+
+
+def zones_stage(root: Path) -> str:
+    return zones.format_report(zones.extract_floors(root))
+
+
+def lint_stage(root: Path) -> str:
+    if not lint.available():
+        return "skipped: linting graphs needs numpy"
+    return lint.format_report(lint.lint_floors(root))
+
+
+def transform_stage(root: Path) -> str:
+    return transform.format_report(transform.transform_floors(root))
+
+
+def walls_stage(root: Path) -> str:
+    return walls.format_report(walls.check_floors(root))
+
+
+def graphs_stage(root: Path) -> str:
+    if not navgraph.available():
+        return "skipped: generating graphs needs numpy"
+    return navgraph.format_report(navgraph.generate_floors(root))
+
+
+def svg_stage(root: Path) -> str:
+    return svgopt.format_report(svgopt.optimize_floors(root))
+
+
+def tiles_stage(root: Path) -> str:
+    return tiles.format_report(root, tiles.write_floor_tiles(root))
+
+
+def packs_stage(root: Path) -> str:
+    return pack.format_report(pack.write_floor_packs(root))
+
+
+def floors_stage(root: Path) -> str:
+    return catalog.format_report(*catalog.write_floor_manifest(root))
+
+
+def manifest_stage(root: Path) -> str:
+    cache = assets.HashCache(root)
+    manifest = assets.write_manifest(root, cache)
+    lines = [f"{logical} -> {hashed}" for logical, hashed in sorted(manifest.items())]
+    lines.append(f"hashed {cache.hashed} of {cache.seen} files; the rest are unchanged")
+    lines.append(f"wrote {assets.BUILD_DIR}/{assets.MANIFEST_FILE} ({len(manifest)} files)")
+    return "\n".join(lines)
+
+
+def compress_stage(root: Path) -> str:
+    return compress.format_report(compress.precompress_root(root), root)
+
+
+STAGES: Dict[str, Stage] = {
+    "zones": zones_stage,
+    "lint": lint_stage,
+    "transform": transform_stage,
+    "walls": walls_stage,
+    "graphs": graphs_stage,
+    "svg": svg_stage,
+    "tiles": tiles_stage,
+    "packs": packs_stage,
+    "floors": floors_stage,
+    "manifest": manifest_stage,
+    "compress": compress_stage,
+}
+
+
+def run(root: Path, only: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Run the selected stages (all of them by default) and collect their reports."""
+    selected = set(only) if only else set(STAGES)
+    unknown = selected - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown build stage(s): {', '.join(sorted(unknown))}")
+    return {name: stage(root) for name, stage in STAGES.items() if name in selected}
@@ -0,0 +1,121 @@
+"""Single-request floor bundles.
+
+``loadApplication()`` needs a floor's SVG, its node list and graph, and its
+zones; fetched separately that is three sequential round trips. A bundle is
+one JSON document holding all of them, built and compressed once at server
+start-up and published at ``/api/floor/<id>/bundle`` (plus a content-hashed
+alias listed in the asset manifest).
+
+With ``numpy`` installed a bundle also carries the floor's all-pairs
+next-hop tables (:mod:`.routing.nexthop`) under ``routes``, so the page
+reads any route off a table instead of searching.
+
+``node_zones`` maps each node to the zone polygon containing it
+(:mod:`.geometry`), so the page never runs point-in-polygon tests, and
+``zone_entries`` maps each zone to the searchable node nearest its centroid
+(:mod:`.spatial`), the node ``setZoneAsDestination()`` routes to.
+``zone_lod`` holds coarser versions of the zone polygons (:mod:`.lod`) for
+the page to draw when zoomed out. ``search`` is the floor's label index
+(:mod:`.search`) for suggestions as the user types.
+
+The nodes, graph and zones themselves travel in the floor's binary pack
+(:mod:`.pack`), published next to the bundle and named by its ``pack``
+field; the page fetches both at once and reads the pack with typed arrays
+instead of parsing them as JSON. Without a pack the bundle carries them as
+``nodes``, ``graph`` and ``zones``.
+
+``svg`` is a shell of the floor's plan with an empty tile layer and
+``tiles`` tells the page where its vector tiles (:mod:`.tiles`) are; the
+page loads only those in view. Tiles are cut from the optimized plan from
+``python -m campus_connect build`` (:mod:`.svgopt`) when one is up to date,
+else from the original.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .compress import available_encoders
+from .floors import FLOORS, Floor, load_zones
+from .geometry import node_zones
+from .lod import simplify_zones, zone_lod
+from .pack import install_packs
+from .routing import CompactGraph, nexthop
+from .search import LabelIndex, node_documents
+from .spatial import FloorNodes
+from .svgopt import floor_svg
+from .static import StaticFiles
+from .tiles import Pyramid, install_tiles
+from .transform import install_nodes, load_display_nodes
+
+logger = logging.getLogger(__name__)
+
+#: Largest floor whose route tables are shipped; beyond this the O(V^2)
+#: tables outweigh the rest of the bundle by megabytes.
+ROUTE_TABLE_LIMIT = 1000
+
+
+def bundle_url(floor_id: str) -> str:
+    """Logical path (without leading slash) of a floor's bundle."""
+    return f"api/floor/{floor_id}/bundle"
+
+
+def build_bundle(
+    root: Path, floor: Floor, pyramid: Optional[Pyramid] = None, pack: Optional[str] = None
+) -> Dict[str, Any]:
+    """The floor's bundle; with ``pyramid`` it carries a tiled plan instead of the whole one.
+
+    With ``pack``, the URL of the floor's pack, the nodes, graph and zones
+    are left to the pack.
+    """
+    nodes, graph = load_display_nodes(root, floor)
+    zones = load_zones(root, floor)
+    bundle = {
+        "floor": floor.id,
+        "svg": pyramid.shell() if pyramid is not None else floor_svg(root, floor),
+        "node_zones": node_zones(nodes, zones),
+        "zone_entries": FloorNodes.build(floor, nodes).zone_entries(zones),
+        "search": LabelIndex(node_documents(floor.id, nodes)).to_json(),
+    }
+    if pack is not None:
+        bundle["pack"] = pack
+    else:
+        bundle.update(nodes=nodes, graph=graph, zones=zones)
+    levels = simplify_zones(zones)
+    if any(level.rings for level in levels):
+        bundle["zone_lod"] = zone_lod(levels)
+    if pyramid is not None:
+        bundle["tiles"] = pyramid.metadata()
+    compact = CompactGraph.from_json(nodes, graph)
+    if nexthop.available() and compact.node_count <= ROUTE_TABLE_LIMIT:
+        bundle["routes"] = nexthop.floyd_warshall(compact).to_json()
+    return bundle
+
+
+def encode_bundle(bundle: Dict[str, Any]) -> bytes:
+    return json.dumps(bundle, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def install_bundles(static: StaticFiles, root: Path) -> None:
+    """Build, compress and publish the nodes, bundle, pack and tiles of every floor."""
+    encoders = available_encoders()
+    if not nexthop.available():
+        logger.info("numpy not installed; bundles ship without route tables")
+    install_nodes(static, root)
+    packs = install_packs(static, root)
+    for floor in FLOORS:
+        pyramid = Pyramid.build(floor, floor_svg(root, floor))
+        count = install_tiles(static, root, pyramid)
+        logger.info("tiles %s: %d in %d levels", floor.id, count, pyramid.max_zoom + 1)
+        body = encode_bundle(build_bundle(root, floor, pyramid, packs.get(floor.id)))
+        variants = {encoding: encode(body) for encoding, encode in encoders.items()}
+        static.add(bundle_url(floor.id), body, "application/json", variants, fingerprint=True)
+        logger.info(
+            "bundle %s: %d bytes (%s)",
+            floor.id,
+            len(body),
+            ", ".join(f"{enc} {len(data)}" for enc, data in variants.items()),
+        )
@@ -0,0 +1,169 @@
+"""Floor manifest: the buildings and floors the page can load.
+
+The page used to name every floor in its own code: the paths of each
+floor's files, which floor the next and previous buttons lead to, the
+floor it opens on. It now reads them from ``manifest.json``, built from
+:data:`~campus_connect.floors.BUILDINGS` and
+:data:`~campus_connect.floors.FLOORS`::
+
+    {"version": 1, "default": "second",
+     "buildings": [{"id": "main", "name": "Main Building",
+                    "floors": ["first", "second", "third"]}],
+     "floors": {"second": {"building": "main", "level": 2, "name": "Floor 2",
+                           "view_box": [0, 0, 8830, 6238],
+                           "below": "first", "above": "third",
+                           "files": {"svg": {"path": "floors/second-floor.svg",
+                                             "hash": "...", "size": 431060},
+                                     "nodes": {...}, "zones": {...}}}}}
+
+Floors of a building are listed bottom to top, and ``below``/``above``
+name the adjacent floors of the same building. File hashes and sizes are
+of the bodies served at ``path``. The server publishes the manifest at
+``/manifest.json``, describing the files it serves under their logical
+paths; the ``floors`` build stage writes it to ``build/`` for plain static
+servers, listing the files it hashed (``build/nodes/`` once ``transform``
+has run), with hashes kept in a :class:`~campus_connect.assets.HashCache`
+so only files modified since the last build are read.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .assets import BUILD_DIR, HashCache
+from .floors import BUILDINGS, DEFAULT_FLOOR, FLOORS, Floor
+from .report import table
+from .static import StaticFiles
+from .transform import built_nodes, plan_box
+
+VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+
+#: ``(path, hash, size)`` of the body served at a logical path, stored at a
+#: file: the path the page fetches it from, and that body's hash and size.
+Describe = Callable[[str, Path], Tuple[str, str, int]]
+
+
+def floor_name(floor: Floor) -> str:
+    return f"Floor {floor.level}"
+
+
+def served_files(root: Path, floor: Floor) -> Dict[str, Tuple[str, Path]]:
+    """Kind to the logical path of each of ``floor``'s files and the file served there."""
+    nodes = built_nodes(root, floor) or root / floor.nodes
+    return {
+        "svg": (floor.svg, root / floor.svg),
+        "nodes": (floor.nodes, nodes),
+        "zones": (floor.zones, root / floor.zones),
+    }
+
+
+def building_floors(floors: Optional[Sequence[Floor]] = None) -> Dict[str, List[str]]:
+    """Building id to the ids of its floors, bottom to top."""
+    floors = sorted(floors or FLOORS, key=lambda floor: floor.level)
+    return {
+        building.id: [floor.id for floor in floors if floor.building == building.id]
+        for building in BUILDINGS
+    }
+
+
+def adjacent_floors(
+    floors: Optional[Sequence[Floor]] = None,
+) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Floor id to the ids of the floors below and above it in its building."""
+    adjacent = {}
+    for ids in building_floors(floors).values():
+        for position, floor_id in enumerate(ids):
+            below = ids[position - 1] if position > 0 else None
+            above = ids[position + 1] if position + 1 < len(ids) else None
+            adjacent[floor_id] = below, above
+    return adjacent
+
+
+def build_floor_manifest(
+    root: Path, describe: Describe, floors: Optional[Sequence[Floor]] = None
+) -> Dict[str, Any]:
+    floors = sorted(floors or FLOORS, key=lambda floor: floor.level)
+    buildings = [
+        {"id": building.id, "name": building.name, "floors": ids}
+        for building, ids in zip(BUILDINGS, building_floors(floors).values())
+    ]
+    adjacent = adjacent_floors(floors)
+    entries = {}
+    for floor in floors:
+        files = {}
+        for kind, (logical, path) in served_files(root, floor).items():
+            listed, digest, size = describe(logical, path)
+            files[kind] = {"path": listed, "hash": digest, "size": size}
+        below, above = adjacent[floor.id]
+        entries[floor.id] = {
+            "building": floor.building,
+            "level": floor.level,
+            "name": floor_name(floor),
+            "view_box": [_number(value) for value in plan_box(root, floor)],
+            "below": below,
+            "above": above,
+            "files": files,
+        }
+    default = DEFAULT_FLOOR if DEFAULT_FLOOR in entries else next(iter(entries), None)
+    return {"version": VERSION, "default": default, "buildings": buildings, "floors": entries}
+
+
+def _number(value: float) -> float:
+    return int(value) if value == int(value) else value
+
+
+def encode_floor_manifest(manifest: Dict[str, Any]) -> bytes:
+    return json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def write_floor_manifest(root: Path) -> Tuple[Dict[str, Any], HashCache]:
+    """Write ``build/manifest.json``; returns it and the hash cache used."""
+    cache = HashCache(root)
+    def describe(logical: str, path: Path) -> Tuple[str, str, int]:
+        return (path.relative_to(root).as_posix(), *cache.digest(path))
+
+    manifest = build_floor_manifest(root, describe)
+    target = root / BUILD_DIR / MANIFEST_FILE
+    target.parent.mkdir(exist_ok=True)
+    target.write_bytes(encode_floor_manifest(manifest))
+    cache.save()
+    return manifest, cache
+
+
+def format_report(manifest: Dict[str, Any], cache: HashCache) -> str:
+    header = ["floor", "building", "level", "viewBox", "below", "above", "bytes"]
+    rows = []
+    for floor_id, floor in manifest["floors"].items():
+        rows.append(
+            [
+                floor_id,
+                floor["building"],
+                str(floor["level"]),
+                " ".join(str(value) for value in floor["view_box"]),
+                floor["below"] or "-",
+                floor["above"] or "-",
+                str(sum(file["size"] for file in floor["files"].values())),
+            ]
+        )
+    lines = table(header, rows)
+    lines.append(f"hashed {cache.hashed} of {cache.seen} files; the rest are unchanged")
+    lines.append(f"wrote {BUILD_DIR}/{MANIFEST_FILE}")
+    return "\n".join(lines)
+
+
+def install_floor_manifest(static: StaticFiles, root: Path) -> List[str]:
+    """Publish ``/manifest.json`` for the files ``static`` serves; returns the floor ids."""
+
+    def describe(logical: str, path: Path) -> Tuple[str, str, int]:
+        entry = static.lookup("/" + logical)
+        if entry is None:
+            raise LookupError(f"{logical} is not served")
+        return logical, entry.digest, len(entry.body)
+
+    manifest = build_floor_manifest(root, describe)
+    static.add(MANIFEST_FILE, encode_floor_manifest(manifest), "application/json")
+    return list(manifest["floors"])
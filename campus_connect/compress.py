@@ -0,0 +1,110 @@
+"""Build step writing precompressed ``.gz`` and ``.br`` siblings of static files.
+
+The server picks a sibling from ``Accept-Encoding`` at request time, so no
+compression happens per request. Brotli output needs the optional
+``brotli`` package; without it only gzip variants are written.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from .report import table
+from .static import COMPRESSED_SUFFIXES, iter_static_paths
+
+logger = logging.getLogger(__name__)
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-for-byte reproducible between builds.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    encoders = {"gzip": _gzip}
+    if brotli is not None:
+        encoders["br"] = _brotli
+    return encoders
+
+
+@dataclass
+class CompressionResult:
+    path: Path
+    original: int
+    sizes: Dict[str, int] = field(default_factory=dict)
+
+    def saved(self, encoding: str) -> int:
+        return self.original - self.sizes[encoding]
+
+
+def sibling(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + COMPRESSED_SUFFIXES[encoding])
+
+
+def precompress_file(path: Path) -> CompressionResult:
+    """Write compressed siblings of ``path``, skipping encodings that do not shrink it.
+
+    Siblings that are up to date (not older than ``path``) are reused.
+    """
+    data = path.read_bytes()
+    result = CompressionResult(path, len(data))
+    mtime = path.stat().st_mtime
+    for encoding, encode in available_encoders().items():
+        target = sibling(path, encoding)
+        if target.exists() and target.stat().st_mtime >= mtime:
+            compressed = target.read_bytes()
+        else:
+            compressed = encode(data)
+        if len(compressed) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+        if not target.exists() or target.read_bytes() != compressed:
+            target.write_bytes(compressed)
+        result.sizes[encoding] = len(compressed)
+    return result
+
+
+def precompress(paths: Iterable[Path]) -> List[CompressionResult]:
+    if brotli is None:
+        logger.warning("brotli is not installed; writing gzip variants only")
+    return [precompress_file(path) for path in paths]
+
+
+def precompress_root(root: Path) -> List[CompressionResult]:
+    """Precompress every file the server publishes from ``root``."""
+    return precompress(iter_static_paths(root))
+
+
+def format_report(results: List[CompressionResult], root: Path) -> str:
+    encodings = [enc for enc in COMPRESSED_SUFFIXES if any(enc in r.sizes for r in results)]
+    header = ["file", "original"] + [f"{enc} (saved)" for enc in encodings]
+    rows = []
+    totals = {enc: 0 for enc in encodings}
+    for result in results:
+        row = [result.path.relative_to(root).as_posix(), str(result.original)]
+        for enc in encodings:
+            if enc in result.sizes:
+                saved = result.saved(enc)
+                totals[enc] += saved
+                row.append(f"{result.sizes[enc]} ({100.0 * saved / result.original:.0f}%)")
+            else:
+                row.append("-")
+        rows.append(row)
+    original = sum(r.original for r in results)
+    rows.append(["total saved", str(original)] + [str(totals[enc]) for enc in encodings])
+
+    lines = table(header, rows)
+    return "\n".join(lines)
@@ -0,0 +1,75 @@
+"""Catalogue of the campus buildings and floors, and loaders for their data files."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+Graph = Dict[str, Dict[str, float]]
+
+
+@dataclass(frozen=True)
+class Building:
+    id: str
+    name: str
+
+
+BUILDINGS: Tuple[Building, ...] = (Building("main", "Main Building"),)
+
+
+@dataclass(frozen=True)
+class Floor:
+    id: str
+    level: int
+    svg: str
+    nodes: str
+    zones: str
+    building: str = "main"
+    #: Degrees the plan is turned from the nodes file's coordinates, about
+    #: the centre of its ``viewBox`` (see :mod:`campus_connect.transform`).
+    rotation: float = 0.0
+
+
+#: The page's ``BUILTIN_FLOOR_MANIFEST`` mirrors these floors for hosts
+#: serving no floor manifest; keep the two in step.
+FLOORS: Tuple[Floor, ...] = tuple(
+    Floor(
+        name,
+        level,
+        svg=f"floors/{name}-floor.svg",
+        nodes=f"data/{name}_floor_nodes.json",
+        zones=f"data/{name}_floor_zones.json",
+    )
+    for level, name in enumerate(("first", "second", "third"), start=1)
+)
+
+#: Floor the page opens on.
+DEFAULT_FLOOR = "second"
+
+_BY_ID = {floor.id: floor for floor in FLOORS}
+
+
+def get_floor(floor_id: str) -> Floor:
+    """Return the floor called ``floor_id``; raises ``KeyError`` if unknown."""
+    return _BY_ID[floor_id]
+
+
+def load_json(root: Path, relative: str) -> Any:
+    with open(root / relative, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_nodes(root: Path, floor: Floor) -> Tuple[List[Dict[str, Any]], Graph]:
+    """Return the ``nodes`` list and adjacency ``graph`` of ``floor``.
+
+    Mirrors ``loadApplication()``, which accepts either ``graph`` or ``edges``.
+    """
+    data = load_json(root, floor.nodes)
+    return data.get("nodes") or [], data.get("graph") or data.get("edges") or {}
+
+
+def load_zones(root: Path, floor: Floor) -> List[Dict[str, Any]]:
+    return load_json(root, floor.zones)
+
@@ -0,0 +1,131 @@
+"""Point-in-zone queries over a floor's zone polygons.
+
+The page finds the zone under a node with ``zoneData.find(...)`` and a
+ray-casting test over every vertex of every zone. :class:`ZoneIndex` buckets
+zone bounding boxes (the ``bbox_*`` fields of ``*_zones.json``) into a
+uniform grid instead, so a query tests only the few polygons whose boxes
+cover the point's cell. Answers are the same as the page's: the first zone
+in file order whose polygon contains the point.
+
+Zones without a ``points`` polygon (the first floor lists member nodes
+instead) are not indexed.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+BBox = Tuple[float, float, float, float]
+
+
+def point_in_polygon(x: float, y: float, points: Sequence[Sequence[float]]) -> bool:
+    """Even-odd ray casting, the same test as ``isPointInPolygonPoints()``."""
+    inside = False
+    j = len(points) - 1
+    for i in range(len(points)):
+        xi, yi = points[i][0], points[i][1]
+        xj, yj = points[j][0], points[j][1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def zone_bbox(zone: Mapping[str, Any]) -> BBox:
+    """``(min_x, min_y, max_x, max_y)`` from the ``bbox_*`` fields or the polygon."""
+    try:
+        return (
+            float(zone["bbox_min_x"]),
+            float(zone["bbox_min_y"]),
+            float(zone["bbox_max_x"]),
+            float(zone["bbox_max_y"]),
+        )
+    except KeyError:
+        xs = [point[0] for point in zone["points"]]
+        ys = [point[1] for point in zone["points"]]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+@dataclass
+class ZoneIndex:
+    """Uniform grid over zone bounding boxes.
+
+    ``cells`` maps a grid cell to the positions (in file order) of the zones
+    whose boxes overlap it.
+    """
+
+    zones: List[Mapping[str, Any]]
+    boxes: List[BBox]
+    origin: Point
+    cell_size: float
+    cells: Dict[Tuple[int, int], List[int]]
+
+    @classmethod
+    def build(
+        cls, zones: Iterable[Mapping[str, Any]], cell_size: Optional[float] = None
+    ) -> "ZoneIndex":
+        """Index ``zones``; the default cell is the median zone box side."""
+        polygons = [zone for zone in zones if zone.get("points")]
+        boxes = [zone_bbox(zone) for zone in polygons]
+        if not boxes:
+            return cls([], [], (0.0, 0.0), 1.0, {})
+        if cell_size is None:
+            sides = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes)
+            cell_size = sides[len(sides) // 2] or 1.0
+        origin = (min(b[0] for b in boxes), min(b[1] for b in boxes))
+        index = cls(polygons, boxes, origin, float(cell_size), {})
+        for position, box in enumerate(boxes):
+            (cx0, cy0), (cx1, cy1) = index.cell(box[0], box[1]), index.cell(box[2], box[3])
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    index.cells.setdefault((cx, cy), []).append(position)
+        return index
+
+    def cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (
+            math.floor((x - self.origin[0]) / self.cell_size),
+            math.floor((y - self.origin[1]) / self.cell_size),
+        )
+
+    def candidates(self, x: float, y: float) -> List[int]:
+        """Positions of the zones whose boxes contain ``(x, y)``, in file order."""
+        boxes = self.boxes
+        return [
+            position
+            for position in self.cells.get(self.cell(x, y), ())
+            if boxes[position][0] <= x <= boxes[position][2]
+            and boxes[position][1] <= y <= boxes[position][3]
+        ]
+
+    def locate(self, x: float, y: float) -> Optional[Mapping[str, Any]]:
+        """The first zone containing ``(x, y)``, or ``None``."""
+        for position in self.candidates(x, y):
+            zone = self.zones[position]
+            if point_in_polygon(x, y, zone["points"]):
+                return zone
+        return None
+
+
+def node_zones(
+    nodes: Iterable[Mapping[str, Any]], zones: Iterable[Mapping[str, Any]]
+) -> Dict[str, str]:
+    """Map node id to the id of the zone containing it, for nodes inside one.
+
+    ``nodes`` must be in the zones' (SVG) frame, see
+    :func:`campus_connect.transform.display_nodes`. The first node with an id
+    wins, like ``getNodeCoordinates()``.
+    """
+    index = ZoneIndex.build(zones)
+    mapping: Dict[str, str] = {}
+    seen = set()
+    for node in nodes:
+        if node["id"] in seen:
+            continue
+        seen.add(node["id"])
+        zone = index.locate(float(node["x"]), float(node["y"]))
+        if zone is not None:
+            mapping[node["id"]] = zone["id"]
+    return mapping
@@ -0,0 +1,312 @@
+"""Consistency checks of the navigation graphs.
+
+Routes are only as good as ``*_floor_nodes.json``, which is edited by
+hand. :func:`check_graph` finds, with array operations over every edge at
+once:
+
+- ``duplicate``: node ids listed more than once; the page uses the first;
+- ``dangling``: ids the ``graph`` refers to that no node has;
+- ``asymmetric``: edges whose reverse is missing, or weighs differently,
+  so a route one way does not exist or cost the same the other way;
+- ``unreachable``: searchable nodes outside the connected part of the
+  graph holding most searchable nodes, so routes to them fail;
+- ``drift``: weights that are not the Euclidean length of their edge,
+  within :data:`ABS_TOLERANCE` map units or :data:`REL_TOLERANCE` of it.
+
+Weights are recomputed from the nodes' ``x``/``y``; :func:`fix_graph`
+writes them into drifting edges and adds missing reverse edges, the
+problems with only one right answer.
+
+The ``lint`` build stage checks every floor and fails on issues not
+listed in :data:`KNOWN_FILE`, the reviewed ones the data already had;
+``python -m campus_connect lint --fix`` rewrites the nodes files. The
+checks need the optional ``numpy`` package; :func:`available` reports
+whether it is installed.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .floors import FLOORS, Floor, Graph, load_json, load_nodes
+from .report import table
+from .routing import CompactGraph
+
+#: Weight drift allowed, in map units and as a fraction of the edge length;
+#: the larger of the two applies.
+ABS_TOLERANCE = 1.0
+REL_TOLERANCE = 0.01
+
+#: Issues accepted as they are: ``{"floor": {"kind": [subject, ...]}}``,
+#: a subject being a node id or a ``[node, node]`` edge.
+KNOWN_FILE = "checks/known_lint_issues.json"
+
+KINDS = ("duplicate", "dangling", "asymmetric", "unreachable", "drift")
+
+
+def available() -> bool:
+    return np is not None
+
+
+@dataclass(frozen=True)
+class Issue:
+    floor: str
+    kind: str
+    #: The node id, or the edge's two ids.
+    subject: Tuple[str, ...]
+    detail: str = ""
+
+    def describe(self) -> str:
+        detail = f": {self.detail}" if self.detail else ""
+        return f"{self.floor}: {self.kind} {' - '.join(self.subject)}{detail}"
+
+
+@dataclass
+class Edges:
+    """Every edge of a floor's graph as arrays over :class:`CompactGraph` vertices."""
+
+    graph: CompactGraph
+    sources: Any
+    targets: Any
+    weights: Any
+    #: Euclidean length of each edge, NaN where an end has no coordinates.
+    lengths: Any
+    #: Position of each edge's reverse, -1 where there is none.
+    reverse: Any
+
+    @classmethod
+    def build(cls, nodes: Sequence[Mapping[str, Any]], graph: Mapping[str, Any]) -> "Edges":
+        compact = CompactGraph.from_json(nodes, graph)
+        count = compact.node_count
+        offsets = np.frombuffer(compact.offsets, dtype=np.dtype(compact.offsets.typecode))
+        sources = np.repeat(np.arange(count), np.diff(offsets))
+        targets = np.frombuffer(compact.targets, dtype=np.dtype(compact.targets.typecode))
+        weights = np.frombuffer(compact.weights, dtype=np.float64)
+        xs = np.frombuffer(compact.xs, dtype=np.float64)
+        ys = np.frombuffer(compact.ys, dtype=np.float64)
+        lengths = np.hypot(xs[targets] - xs[sources], ys[targets] - ys[sources])
+        # An edge's reverse is the edge keyed (target, source) in the sorted keys.
+        keys = sources.astype(np.int64) * count + targets
+        order = np.argsort(keys, kind="stable")
+        wanted = targets.astype(np.int64) * count + sources
+        found = np.searchsorted(keys[order], wanted).clip(max=max(len(keys) - 1, 0))
+        reverse = np.full(len(keys), -1, dtype=np.int64)
+        if len(keys):
+            hit = keys[order][found] == wanted
+            reverse[hit] = order[found[hit]]
+        return cls(compact, sources, targets, weights, lengths, reverse)
+
+    def drifting(self):
+        """Mask of the edges whose weight is off their length."""
+        allowed = np.maximum(ABS_TOLERANCE, REL_TOLERANCE * self.lengths)
+        with np.errstate(invalid="ignore"):
+            return np.abs(self.weights - self.lengths) > allowed
+
+    def mismatched(self):
+        """Mask of the edges whose reverse exists and weighs differently."""
+        has = self.reverse >= 0
+        other = np.where(has, self.weights[self.reverse], self.weights)
+        allowed = np.maximum(ABS_TOLERANCE, REL_TOLERANCE * np.abs(self.weights))
+        return has & (np.abs(self.weights - other) > allowed)
+
+
+def components(count: int, sources, targets):
+    """Connected-component label of each of ``count`` vertices, edges taken both ways.
+
+    Labels are the smallest vertex of each component: every round hooks the
+    larger of an edge's two labels onto the smaller, then jumps every
+    vertex to its root.
+    """
+    labels = np.arange(count)
+    while len(sources):
+        a, b = labels[sources], labels[targets]
+        low = np.minimum(a, b)
+        hooked = labels.copy()
+        np.minimum.at(hooked, a, low)
+        np.minimum.at(hooked, b, low)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            break
+        labels = hooked
+    return labels
+
+
+def check_graph(
+    floor: str,
+    nodes: Sequence[Mapping[str, Any]],
+    graph: Mapping[str, Any],
+    edges: Optional[Edges] = None,
+) -> List[Issue]:
+    """Every issue of the ``nodes`` list and adjacency ``graph`` of ``floor``."""
+    edges = edges or Edges.build(nodes, graph)
+    compact = edges.graph
+    ids = compact.ids
+    issues = [
+        Issue(floor, "duplicate", (node_id,), f"listed {n} times")
+        for node_id, n in Counter(node["id"] for node in nodes).items()
+        if n > 1
+    ]
+
+    listed = len({node["id"] for node in nodes})
+    uses = np.bincount(
+        np.concatenate([edges.sources, edges.targets]), minlength=compact.node_count
+    )
+    issues += [
+        Issue(floor, "dangling", (ids[vertex],), f"in {uses[vertex]} edge ends, not a node")
+        for vertex in range(listed, compact.node_count)
+    ]
+
+    def edge(position: int) -> Tuple[str, str]:
+        return ids[edges.sources[position]], ids[edges.targets[position]]
+
+    for position in np.flatnonzero(edges.reverse < 0):
+        issues.append(Issue(floor, "asymmetric", edge(position), "no reverse edge"))
+    mismatched = edges.mismatched()
+    for position in np.flatnonzero(mismatched & (edges.sources < edges.targets)):
+        back = edges.weights[edges.reverse[position]]
+        detail = f"weighs {edges.weights[position]:g}, back {back:g}"
+        issues.append(Issue(floor, "asymmetric", edge(position), detail))
+
+    labels = components(compact.node_count, edges.sources, edges.targets)
+    searchable = sorted({compact.index[node["id"]] for node in nodes if node.get("searchable")})
+    if searchable:
+        main = Counter(labels[searchable].tolist()).most_common(1)[0][0]
+        issues += [
+            Issue(floor, "unreachable", (ids[vertex],), "not connected to the other rooms")
+            for vertex in searchable
+            if labels[vertex] != main
+        ]
+
+    # Each edge once: the one listed from the smaller vertex if both ways drift.
+    drifting = edges.drifting()
+    reverse_drifts = np.where(edges.reverse >= 0, drifting[edges.reverse], False)
+    once = drifting & ((edges.sources < edges.targets) | ~reverse_drifts)
+    for position in np.flatnonzero(once):
+        detail = f"weight {edges.weights[position]:g}, length {edges.lengths[position]:.2f}"
+        issues.append(Issue(floor, "drift", edge(position), detail))
+    return issues
+
+
+def fix_graph(
+    nodes: Sequence[Mapping[str, Any]], graph: Mapping[str, Any], edges: Optional[Edges] = None
+) -> Tuple[Graph, int]:
+    """``graph`` with drifting weights recomputed and missing reverse edges added.
+
+    Returns the graph and the number of edges changed or added. New weights
+    are lengths rounded to 0.01, as :mod:`~campus_connect.navgraph` writes
+    them; both edges of a mismatched pair get the length, an added edge the
+    weight of the one it reverses, and edges with an end that has no
+    coordinates are kept as they are.
+    """
+    edges = edges or Edges.build(nodes, graph)
+    ids = edges.graph.ids
+    known = ~np.isnan(edges.lengths)
+    wrong = known & (edges.drifting() | edges.mismatched())
+    fixed: Graph = {source: dict(targets or {}) for source, targets in graph.items()}
+    for position in np.flatnonzero(wrong):
+        source, target = ids[edges.sources[position]], ids[edges.targets[position]]
+        fixed[source][target] = round(float(edges.lengths[position]), 2)
+    added = np.flatnonzero(known & (edges.reverse < 0))
+    for position in added:
+        source, target = ids[edges.sources[position]], ids[edges.targets[position]]
+        fixed.setdefault(target, {})[source] = fixed[source][target]
+    return fixed, int(wrong.sum()) + len(added)
+
+
+def known_issues(root: Path) -> Set[Tuple[str, str, Tuple[str, ...]]]:
+    if not (root / KNOWN_FILE).exists():
+        return set()
+    return {
+        (floor, kind, tuple(subject) if isinstance(subject, list) else (subject,))
+        for floor, kinds in load_json(root, KNOWN_FILE).items()
+        for kind, subjects in kinds.items()
+        for subject in subjects
+    }
+
+
+class LintError(RuntimeError):
+    """Floor graphs have issues not accepted in :data:`KNOWN_FILE`."""
+
+
+@dataclass
+class Result:
+    floor: str
+    nodes: int
+    edges: int
+    issues: List[Issue]
+    known: int
+    #: Edges changed or added by a fix, 0 when not fixing.
+    fixed: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.counts = dict(Counter(issue.kind for issue in self.issues))
+
+
+def _write_nodes(path: Path, data: Dict[str, Any]) -> None:
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    ending = "\n" if path.read_text(encoding="utf-8").endswith("\n") else ""
+    path.write_text(text + ending, encoding="utf-8")
+
+
+def lint_floors(
+    root: Path, floors: Optional[Sequence[Floor]] = None, fix: bool = False
+) -> List[Result]:
+    """Check every floor; raises :class:`LintError` on issues not known.
+
+    With ``fix`` the drift and missing reverse edges are corrected in the
+    nodes files first, and what is left is checked.
+    """
+    known = known_issues(root)
+    results, new = [], []
+    for floor in floors or FLOORS:
+        data = load_json(root, floor.nodes)
+        nodes, graph = load_nodes(root, floor)
+        edges = Edges.build(nodes, graph)
+        fixed = 0
+        if fix:
+            graph, fixed = fix_graph(nodes, graph, edges)
+            if fixed:
+                data["graph" if "graph" in data or "edges" not in data else "edges"] = graph
+                _write_nodes(root / floor.nodes, data)
+                edges = Edges.build(nodes, graph)
+        issues = check_graph(floor.id, nodes, graph, edges)
+        accepted = [(floor.id, i.kind, i.subject) in known for i in issues]
+        new += [issue for issue, ok in zip(issues, accepted) if not ok]
+        results.append(
+            Result(floor.id, len(nodes), len(edges.sources), issues, sum(accepted), fixed)
+        )
+    if new:
+        raise LintError(
+            f"{len(new)} graph issue(s):\n" + "\n".join(issue.describe() for issue in new)
+        )
+    return results
+
+
+def format_report(results: Sequence[Result]) -> str:
+    header = ["floor", "nodes", "edges", *KINDS, "known"]
+    if any(result.fixed for result in results):
+        header.append("fixed")
+    rows = []
+    for result in results:
+        counts = [result.nodes, result.edges, *(result.counts.get(k, 0) for k in KINDS)]
+        counts += [result.known, result.fixed][: len(header) - len(counts) - 1]
+        rows.append([result.floor] + [str(n) for n in counts])
+    lines = table(header, rows)
+    for result in results:
+        lines += [f"known: {issue.describe()}" for issue in result.issues]
+    lines.append(f"no new graph issues (accepted ones are listed in {KNOWN_FILE})")
+    return "\n".join(lines)
@@ -0,0 +1,242 @@
+"""Level-of-detail zone polygons.
+
+``addZoneToMap()`` draws every zone with all of its vertices, dozens on the
+curved door swings of the second floor, at every zoom. :func:`simplify_zones`
+derives coarser versions of all of a floor's zone rings, one level per
+tolerance in :data:`TOLERANCES`, and the floor bundle carries them so the
+page can draw the coarsest level that is still exact to a pixel, like the
+map tiles (:mod:`.tiles`).
+
+Vertices are removed Visvalingam-Whyatt style, smallest triangle first, but
+only while every original vertex stays within the level's tolerance of the
+simplified ring (the Douglas-Peucker bound). Removals are also rejected when
+they would change the topology: a new edge may not cross any edge of the
+floor's rings, and no vertex may end up on the other side of an edge, so
+rings stay simple, disjoint zones stay disjoint and a zone inside another
+stays inside. Levels are built from each other, so every level is a subset
+of the finer one's vertices.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from .geometry import BBox, Point
+
+#: Tolerances in map units of the levels after the full-detail one.
+TOLERANCES = (1.0, 4.0, 16.0)
+
+#: Fewest vertices a ring keeps.
+MIN_VERTICES = 3
+
+
+def _cross(o: Point, a: Point, b: Point) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def segment_distance(p: Point, a: Point, b: Point) -> float:
+    """Distance from ``p`` to the segment ``a``-``b``."""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length = dx * dx + dy * dy
+    t = 0.0 if not length else ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length
+    t = min(1.0, max(0.0, t))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def crosses(a: Point, b: Point, c: Point, d: Point) -> bool:
+    """Whether segments ``a``-``b`` and ``c``-``d`` cross at an interior point of both."""
+    d1, d2 = _cross(a, b, c), _cross(a, b, d)
+    d3, d4 = _cross(c, d, a), _cross(c, d, b)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def in_triangle(p: Point, a: Point, b: Point, c: Point) -> bool:
+    """Whether ``p`` lies inside or on the triangle, other than at a corner."""
+    if p == a or p == b or p == c:
+        return False
+    d1, d2, d3 = _cross(a, b, p), _cross(b, c, p), _cross(c, a, p)
+    negative = d1 < 0 or d2 < 0 or d3 < 0
+    positive = d1 > 0 or d2 > 0 or d3 > 0
+    return not (negative and positive)
+
+
+def ring(points: Sequence[Sequence[float]]) -> List[Point]:
+    """``points`` without repeated vertices or a repeated closing vertex."""
+    found: List[Point] = []
+    for point in points:
+        vertex = (float(point[0]), float(point[1]))
+        if not found or vertex != found[-1]:
+            found.append(vertex)
+    while len(found) > 1 and found[-1] == found[0]:
+        found.pop()
+    return found
+
+
+def _box(points: Iterable[Point]) -> BBox:
+    xs, ys = zip(*points)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _overlaps(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+@dataclass
+class _Ring:
+    """A ring being simplified: a circular linked list over the original vertices."""
+
+    original: List[Point]
+    alive: List[bool]
+    next: List[int]
+    prev: List[int]
+    count: int
+    #: Box of the original ring; simplified rings stay within tolerance of it.
+    box: BBox
+
+    @classmethod
+    def of(cls, points: List[Point]) -> "_Ring":
+        n = len(points)
+        return cls(
+            points,
+            [True] * n,
+            [(i + 1) % n for i in range(n)],
+            [(i - 1) % n for i in range(n)],
+            n,
+            _box(points),
+        )
+
+    def vertices(self) -> List[Point]:
+        return [point for point, alive in zip(self.original, self.alive) if alive]
+
+    def edges(self) -> Iterable[Tuple[int, int]]:
+        for i, alive in enumerate(self.alive):
+            if alive:
+                yield i, self.next[i]
+
+    def chain(self, start: int, end: int) -> Iterable[int]:
+        """Original vertex numbers strictly between ``start`` and ``end``."""
+        i = (start + 1) % len(self.original)
+        while i != end:
+            yield i
+            i = (i + 1) % len(self.original)
+
+
+@dataclass
+class Level:
+    """One level of detail of a floor's zones."""
+
+    tolerance: float
+    #: Zone id to its simplified ring.
+    rings: Dict[str, List[Point]] = field(default_factory=dict)
+    #: Zone id to the farthest distance of an original vertex from the ring.
+    deviation: Dict[str, float] = field(default_factory=dict)
+
+    def vertices(self) -> int:
+        return sum(len(points) for points in self.rings.values())
+
+
+class _Simplifier:
+    def __init__(self, rings: Dict[str, _Ring]) -> None:
+        self.rings = rings
+
+    def deviation(self, ring: _Ring, start: int, end: int) -> float:
+        a, b = ring.original[start], ring.original[end]
+        return max(
+            (segment_distance(ring.original[i], a, b) for i in ring.chain(start, end)),
+            default=0.0,
+        )
+
+    def allowed(self, name: str, vertex: int) -> bool:
+        """Whether dropping ``vertex`` keeps every ring simple and in place."""
+        ring = self.rings[name]
+        before, after = ring.prev[vertex], ring.next[vertex]
+        a, b, c = ring.original[before], ring.original[vertex], ring.original[after]
+        box = _box((a, b, c))
+        for other_name, other in self.rings.items():
+            if not _overlaps(box, other.box):
+                continue
+            for start, end in other.edges():
+                p, q = other.original[start], other.original[end]
+                if other_name == name and vertex in (start, end):
+                    continue
+                if crosses(a, c, p, q):
+                    return False
+                own = other_name == name and start in (before, after)
+                if not own and in_triangle(p, a, b, c):
+                    return False
+        return True
+
+    def run(self, tolerance: float) -> None:
+        heap: List[Tuple[float, str, int, int]] = []
+        version: Dict[Tuple[str, int], int] = {}
+
+        def push(name: str, vertex: int) -> None:
+            ring = self.rings[name]
+            key = (name, vertex)
+            version[key] = version.get(key, 0) + 1
+            if ring.count <= MIN_VERTICES:
+                return
+            before, after = ring.prev[vertex], ring.next[vertex]
+            if self.deviation(ring, before, after) > tolerance:
+                return
+            area = abs(_cross(ring.original[before], ring.original[vertex], ring.original[after]))
+            heapq.heappush(heap, (area, name, vertex, version[key]))
+
+        for name, ring in self.rings.items():
+            for vertex, alive in enumerate(ring.alive):
+                if alive:
+                    push(name, vertex)
+        while heap:
+            _, name, vertex, stamp = heapq.heappop(heap)
+            ring = self.rings[name]
+            if stamp != version[(name, vertex)] or ring.count <= MIN_VERTICES:
+                continue
+            if not self.allowed(name, vertex):
+                continue
+            before, after = ring.prev[vertex], ring.next[vertex]
+            ring.alive[vertex] = False
+            ring.next[before], ring.prev[after] = after, before
+            ring.count -= 1
+            push(name, before)
+            push(name, after)
+
+
+def simplify_zones(
+    zones: Iterable[Mapping[str, Any]], tolerances: Sequence[float] = TOLERANCES
+) -> List[Level]:
+    """Levels of detail of the zones with a ``points`` polygon, finest first."""
+    rings = {}
+    for zone in zones:
+        points = ring(zone.get("points") or [])
+        if len(points) >= MIN_VERTICES:
+            rings[zone["id"]] = _Ring.of(points)
+    simplifier = _Simplifier(rings)
+    levels = []
+    for tolerance in sorted(tolerances):
+        simplifier.run(tolerance)
+        level = Level(tolerance)
+        for name, current in rings.items():
+            level.rings[name] = current.vertices()
+            level.deviation[name] = max(
+                (simplifier.deviation(current, start, end) for start, end in current.edges()),
+                default=0.0,
+            )
+        levels.append(level)
+    return levels
+
+
+def zone_lod(levels: Sequence[Level]) -> Dict[str, Any]:
+    """The bundle's ``zone_lod``: tolerances and, per level, each zone's ring."""
+    return {
+        "tolerances": [level.tolerance for level in levels],
+        "levels": [
+            {
+                name: [[round(x, 2), round(y, 2)] for x, y in points]
+                for name, points in level.rings.items()
+            }
+            for level in levels
+        ],
+    }
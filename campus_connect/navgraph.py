@@ -0,0 +1,610 @@
+"""Navigation graphs generated from the floor plans.
+
+Every node of ``*_floor_nodes.json`` is placed by hand, so a floor without
+that work (the first floor's nodes are placeholders) cannot be routed.
+:func:`generate` derives a routable graph from a plan instead, with array
+operations over a raster of the plan :data:`RESOLUTION` pixels across:
+
+1. the walls (:func:`.walls.wall_segments`) are drawn into the raster;
+2. the building is what is left after removing the free space connected
+   to the raster's border, with the walls first grown by
+   :data:`OUTLINE_GAP` so doors and windows in the outer wall do not let
+   the outside in; walkable space is the building minus the walls, grown
+   by one pixel of clearance, and only its largest connected part is kept;
+3. corridors are the walkable space outside every zone polygon of
+   ``*_zones.json``; their skeleton (Zhang-Suen thinning) runs along the
+   middle of every corridor and out through the doors;
+4. the skeleton is sampled, one node per :data:`SPACING` square, at
+   junctions first, then dead ends, then the pixel closest to the middle;
+   nodes in neighbouring squares are joined when the straight line between
+   them stays in walkable space, and a join is dropped when a path through
+   a common neighbour is at most :data:`DETOUR` times longer;
+5. each zone becomes a room node at its door, the zone's pixel next to a
+   corridor closest to the zone's middle, joined to the nearest corridor
+   node it can see; a room that sees none is left out, as any edge to it
+   would cross a wall.
+
+Edges are weighted by their Euclidean length. The result uses the schema
+of ``*_floor_nodes.json``: corridor nodes are ``intersection`` nodes where
+corridors meet and ``invisible`` waypoints elsewhere, room nodes are
+searchable ``class`` nodes named after their zone. Stairways are not drawn
+in a way the plans tell apart, so they are left to the hand-made data.
+
+The ``graphs`` build stage writes a graph per floor to ``build/graphs/``
+for review; a floor adopts one by copying it over its nodes file. It needs
+the optional ``numpy`` package; :func:`available` reports whether it is
+installed.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .assets import BUILD_DIR
+from .floors import FLOORS, Floor, Graph, load_zones
+from .report import table
+from .svgopt import Document
+from .transform import raw_nodes
+from .walls import SegmentIndex, check_edges, graph_edges, wall_segments
+
+#: Pixels along the longer side of the plan. The plans are drawn at
+#: different scales, so the sizes below are pixels at this resolution and
+#: grow with it.
+RESOLUTION = 1100
+
+#: Widest opening closed in the outer wall when finding the building.
+OUTLINE_GAP = 19
+
+#: Side of the square sampled for one corridor node.
+SPACING = 6
+
+#: A join is redundant when going through a common neighbour is at most this much longer.
+DETOUR = 1.05
+
+OUTPUT_DIR = f"{BUILD_DIR}/graphs"
+
+
+def _scaled(size: int, resolution: int) -> int:
+    return max(1, round(size * resolution / RESOLUTION))
+
+
+def available() -> bool:
+    return np is not None
+
+
+def rasterize(segments, cell: float, origin: Tuple[float, float], shape: Tuple[int, int]):
+    """Mask of the pixels ``segments`` (an ``(n, 2, 2)`` array) pass through.
+
+    Every segment is sampled at half-pixel steps, all of them at once.
+    """
+    mask = np.zeros(shape, dtype=bool)
+    if not len(segments):
+        return mask
+    ends = (np.asarray(segments, dtype=float) - origin) / cell
+    a, b = ends[:, 0], ends[:, 1]
+    steps = np.maximum(1, np.ceil(np.abs(b - a).max(axis=1) * 2)).astype(np.int64)
+    owner = np.repeat(np.arange(len(ends)), steps + 1)
+    first = np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+    t = (np.arange(owner.size) - first) / steps[owner]
+    points = a[owner] + (b[owner] - a[owner]) * t[:, None]
+    xs = np.clip(np.floor(points[:, 0]).astype(np.int64), 0, shape[1] - 1)
+    ys = np.clip(np.floor(points[:, 1]).astype(np.int64), 0, shape[0] - 1)
+    mask[ys, xs] = True
+    return mask
+
+
+def dilate(mask, radius: int):
+    """``mask`` grown by a square of ``radius`` pixels, one running sum per axis."""
+    if radius <= 0:
+        return mask
+    grown = mask
+    for axis in (0, 1):
+        length = grown.shape[axis]
+        sums = np.cumsum(grown, axis=axis, dtype=np.int32)
+        before = [(0, 0), (0, 0)]
+        before[axis] = (radius + 1, 0)
+        sums = np.pad(sums, before)
+        after = [(0, 0), (0, 0)]
+        after[axis] = (0, radius)
+        sums = np.pad(sums, after, mode="edge")
+        high = sums.take(np.arange(2 * radius + 1, 2 * radius + 1 + length), axis=axis)
+        low = sums.take(np.arange(length), axis=axis)
+        grown = high > low
+    return grown
+
+
+def label(mask):
+    """4-connected components of ``mask``: an array of labels (0 outside) and their count.
+
+    Components are found over runs of set pixels in each row: runs in
+    neighbouring rows that overlap are joined by repeated minimum-label
+    propagation with pointer jumping.
+    """
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    change = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(change == 1)
+    _, ends = np.nonzero(change == -1)
+    count = len(rows)
+    labels = np.zeros(height * width, dtype=np.int64)
+    if not count:
+        return labels.reshape(height, width), 0
+    # Runs are in row-major order, so keys of starts and ends are sorted.
+    stride = width + 1
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    low = np.searchsorted(end_keys, (rows - 1) * stride + starts, side="right")
+    high = np.searchsorted(start_keys, (rows - 1) * stride + ends, side="left")
+    overlaps = np.maximum(high - low, 0)
+    below = np.repeat(np.arange(count), overlaps)
+    offsets = np.arange(overlaps.sum()) - np.repeat(np.cumsum(overlaps) - overlaps, overlaps)
+    above = np.repeat(low, overlaps) + offsets
+    run_labels = np.arange(count)
+    while True:
+        smallest = np.minimum(run_labels[above], run_labels[below])
+        joined = run_labels.copy()
+        np.minimum.at(joined, above, smallest)
+        np.minimum.at(joined, below, smallest)
+        joined = joined[joined]
+        if np.array_equal(joined, run_labels):
+            break
+        run_labels = joined
+    _, run_labels = np.unique(run_labels, return_inverse=True)
+    lengths = ends - starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    pixels = np.repeat(rows * width + starts, lengths) + offsets
+    labels[pixels] = np.repeat(run_labels + 1, lengths)
+    return labels.reshape(height, width), int(run_labels.max()) + 1
+
+
+def largest(mask):
+    """The largest 4-connected component of ``mask``."""
+    labels, count = label(mask)
+    if not count:
+        return mask
+    sizes = np.bincount(labels.ravel())
+    sizes[0] = 0
+    return labels == sizes.argmax()
+
+
+def fill_polygon(
+    target, points: Sequence[Sequence[float]], cell: float, origin, value: Any = True
+) -> None:
+    """Set to ``value`` the pixels of ``target`` whose centres are inside the polygon.
+
+    Inside is by the even-odd rule, found for all rows at once.
+    """
+    height, width = target.shape
+    corners = (np.asarray(points, dtype=float) - origin) / cell
+    if len(corners) < 3:
+        return
+    nxt = np.roll(corners, -1, axis=0)
+    top = max(0, int(np.floor(corners[:, 1].min())))
+    bottom = min(height, int(np.ceil(corners[:, 1].max())) + 1)
+    if top >= bottom:
+        return
+    ys = np.arange(top, bottom) + 0.5
+    y0, y1 = corners[None, :, 1], nxt[None, :, 1]
+    spans = (y0 > ys[:, None]) != (y1 > ys[:, None])
+    row, edge = np.nonzero(spans)
+    x0, x1 = corners[edge, 0], nxt[edge, 0]
+    xs = x0 + (ys[row] - corners[edge, 1]) * (x1 - x0) / (nxt[edge, 1] - corners[edge, 1])
+    columns = np.clip(np.ceil(xs - 0.5).astype(np.int64), 0, width)
+    toggles = np.zeros((len(ys), width + 1), dtype=np.int32)
+    np.add.at(toggles, (row, columns), 1)
+    target[top:bottom][(np.cumsum(toggles, axis=1)[:, :width] % 2) == 1] = value
+
+
+def _neighbours(mask):
+    """``mask``'s eight neighbours of every pixel, clockwise from north."""
+    p = np.pad(mask, 1)
+    return [
+        p[:-2, 1:-1],
+        p[:-2, 2:],
+        p[1:-1, 2:],
+        p[2:, 2:],
+        p[2:, 1:-1],
+        p[2:, :-2],
+        p[1:-1, :-2],
+        p[:-2, :-2],
+    ]
+
+
+def _thinning_tables():
+    """Per Zhang-Suen sub-step, whether a pixel with each neighbourhood code goes.
+
+    Bit ``k`` of a code is the ``k``-th neighbour clockwise from north.
+    """
+    bits = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(bool)
+    north, east, south, west = bits[:, 0], bits[:, 2], bits[:, 4], bits[:, 6]
+    count = bits.sum(axis=1)
+    transitions = (~bits & np.roll(bits, -1, axis=1)).sum(axis=1)
+    removable = (count >= 2) & (count <= 6) & (transitions == 1)
+    return (
+        removable & ~((north & east & south) | (east & south & west)),
+        removable & ~((north & east & west) | (north & south & west)),
+    )
+
+
+def thin(mask):
+    """Zhang-Suen skeleton of ``mask``: a one-pixel-wide, 8-connected centre line.
+
+    Only pixels next to ones removed in the last two sub-steps can change,
+    so each sub-step looks at those alone; the work grows with the area
+    instead of the area times the corridor width.
+    """
+    height, width = mask.shape
+    stride = width + 2
+    pixels = np.pad(mask, 1).astype(np.uint8).ravel()
+    around = np.array(
+        [-stride, -stride + 1, 1, stride + 1, stride, stride - 1, -1, -stride - 1]
+    )
+    tables = _thinning_tables()
+    everything = np.flatnonzero(pixels)
+    # Neighbours of the pixels removed two sub-steps ago and one sub-step ago.
+    touched = [everything, everything]
+    step = 0
+    while len(touched[0]) or len(touched[1]):
+        current = np.union1d(touched[0], touched[1])
+        current = current[pixels[current] == 1]
+        codes = np.zeros(len(current), dtype=np.uint8)
+        for bit, offset in enumerate(around):
+            codes |= pixels[current + offset] << bit
+        dropped = current[tables[step][codes]]
+        pixels[dropped] = 0
+        touched = [touched[1], np.unique((dropped[:, None] + around).ravel())]
+        step = 1 - step
+    return pixels.reshape(height + 2, stride)[1:-1, 1:-1].astype(bool)
+
+
+def line_of_sight(mask, starts, ends):
+    """Whether each line from ``starts[i]`` to ``ends[i]`` (in pixels) stays in ``mask``."""
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    if not len(starts):
+        return np.zeros(0, dtype=bool)
+    steps = np.maximum(1, np.ceil(np.abs(ends - starts).max(axis=1) * 2)).astype(np.int64)
+    owner = np.repeat(np.arange(len(starts)), steps + 1)
+    first = np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+    t = (np.arange(owner.size) - first) / steps[owner]
+    points = starts[owner] + (ends[owner] - starts[owner]) * t[:, None]
+    xs = np.clip(np.floor(points[:, 0]).astype(np.int64), 0, mask.shape[1] - 1)
+    ys = np.clip(np.floor(points[:, 1]).astype(np.int64), 0, mask.shape[0] - 1)
+    blocked = np.zeros(len(starts), dtype=bool)
+    np.logical_or.at(blocked, owner, ~mask[ys, xs])
+    return ~blocked
+
+
+@dataclass
+class Raster:
+    """A plan drawn at ``cell`` map units per pixel from ``origin``."""
+
+    cell: float
+    origin: Tuple[float, float]
+    walls: Any
+    #: Largest connected part of the building's free space.
+    walkable: Any
+    #: Walkable space outside every zone.
+    corridors: Any
+    #: Position plus one, in the zones given, of the zone of each pixel; 0 outside zones.
+    rooms: Any
+
+    @classmethod
+    def build(
+        cls, text: str, zones: Sequence[Mapping[str, Any]], resolution: int = RESOLUTION
+    ) -> "Raster":
+        document = Document(text)
+        segments = np.asarray(wall_segments(text), dtype=float).reshape(-1, 2, 2)
+        view = document.viewport()
+        if view is None:
+            view = (
+                segments[..., 0].min(),
+                segments[..., 1].min(),
+                segments[..., 0].max(),
+                segments[..., 1].max(),
+            )
+        origin = (view[0], view[1])
+        cell = max(view[2] - view[0], view[3] - view[1]) / resolution
+        shape = (
+            max(1, math.ceil((view[3] - view[1]) / cell)),
+            max(1, math.ceil((view[2] - view[0]) / cell)),
+        )
+        walls = rasterize(segments, cell, origin, shape)
+        gap = _scaled(OUTLINE_GAP, resolution)
+        labels, _ = label(~dilate(walls, gap))
+        border = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+        outside = dilate(np.isin(labels, border[border > 0]), gap)
+        walkable = largest(~outside & ~dilate(walls, 1))
+        rooms = np.zeros(shape, dtype=np.int32)
+        for position, zone in enumerate(zones):
+            if zone.get("points"):
+                fill_polygon(rooms, zone["points"], cell, origin, position + 1)
+        return cls(cell, origin, walls, walkable, largest(walkable & (rooms == 0)), rooms)
+
+    def doors(self):
+        """Pixel position ``(n, 2)`` of the door of each zone, ``nan`` for closed zones.
+
+        A zone's door is its walkable pixel next to a corridor that is closest
+        to the zone's centre of pixels.
+        """
+        count = int(self.rooms.max())
+        doors = np.full((count, 2), np.nan)
+        if not count:
+            return doors
+        ys, xs = np.nonzero(self.rooms)
+        zone = self.rooms[ys, xs] - 1
+        weights = np.bincount(zone, minlength=count)
+        centre_x = np.bincount(zone, xs, minlength=count) / np.maximum(weights, 1)
+        centre_y = np.bincount(zone, ys, minlength=count) / np.maximum(weights, 1)
+        n = _neighbours(self.corridors)
+        touching = (n[0] | n[2] | n[4] | n[6]) & self.walkable & (self.rooms > 0)
+        ys, xs = np.nonzero(touching)
+        zone = self.rooms[ys, xs] - 1
+        offset = np.hypot(xs - centre_x[zone], ys - centre_y[zone])
+        order = np.lexsort((offset, zone))
+        first = order[np.r_[True, zone[order][1:] != zone[order][:-1]]] if len(order) else order
+        doors[zone[first]] = np.stack([xs[first] + 0.5, ys[first] + 0.5], axis=1)
+        return doors
+
+    def pixel(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        return (point[0] - self.origin[0]) / self.cell, (point[1] - self.origin[1]) / self.cell
+
+    def point(self, x: float, y: float) -> Tuple[float, float]:
+        """Map coordinates of the pixel position ``x``, ``y``."""
+        return self.origin[0] + x * self.cell, self.origin[1] + y * self.cell
+
+
+def corridor_nodes(skeleton, spacing: int):
+    """Pixel positions ``(n, 2)`` of the sampled skeleton and which are junctions.
+
+    One pixel per ``spacing``-pixel square: junctions (3 or more skeleton
+    neighbours) first, then dead ends, then the pixel closest to the centre.
+    """
+    count = sum(side.astype(np.uint8) for side in _neighbours(skeleton))
+    ys, xs = np.nonzero(skeleton)
+    if not len(xs):
+        return np.zeros((0, 2)), np.zeros(0, dtype=bool), np.zeros((0, 2), dtype=np.int64)
+    degree = count[ys, xs]
+    rank = np.where(degree >= 3, 0, np.where(degree <= 1, 1, 2))
+    block_x, block_y = xs // spacing, ys // spacing
+    centre = (spacing - 1) / 2
+    offset = (xs - block_x * spacing - centre) ** 2 + (ys - block_y * spacing - centre) ** 2
+    block = block_y * (xs.max() // spacing + 1) + block_x
+    order = np.lexsort((offset, rank, block))
+    chosen = order[np.r_[True, block[order][1:] != block[order][:-1]]]
+    positions = np.stack([xs[chosen] + 0.5, ys[chosen] + 0.5], axis=1)
+    return positions, degree[chosen] >= 3, np.stack([block_x[chosen], block_y[chosen]], axis=1)
+
+
+def _joins(walkable, positions, blocks):
+    """Pairs of nodes in neighbouring squares that see each other."""
+    lookup = {tuple(block): i for i, block in enumerate(blocks.tolist())}
+    pairs = [
+        (i, lookup[(bx + dx, by + dy)])
+        for i, (bx, by) in enumerate(blocks.tolist())
+        for dx, dy in ((1, -1), (1, 0), (1, 1), (0, 1))
+        if (bx + dx, by + dy) in lookup
+    ]
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    seen = line_of_sight(walkable, positions[pairs[:, 0]], positions[pairs[:, 1]])
+    return pairs[seen]
+
+
+def _prune(edges: Dict[int, Dict[int, float]]) -> None:
+    """Drop joins that a path through a common neighbour nearly matches."""
+    for a in list(edges):
+        for c in list(edges[a]):
+            if c < a or c not in edges[a]:
+                continue
+            direct = edges[a][c]
+            through = (
+                edges[a][b] + edges[b][c] for b in edges[a].keys() & edges[c].keys()
+            )
+            if any(length <= direct * DETOUR for length in through):
+                del edges[a][c]
+                del edges[c][a]
+
+
+def _room_label(zone: Mapping[str, Any]) -> str:
+    if zone.get("name"):
+        return str(zone["name"])
+    return str(zone["id"]).replace("_", " ").title()
+
+
+@dataclass
+class Generated:
+    """A generated graph in plan coordinates, with what went into it."""
+
+    nodes: List[Dict[str, Any]]
+    graph: Graph
+    #: Map units per pixel, raster size, walkable and skeleton pixel counts.
+    cell: float
+    shape: Tuple[int, int]
+    walkable: int
+    skeleton: int
+    rooms: int
+    #: Ids of the zones left out because their door sees no corridor node.
+    unseen: List[str]
+
+
+def generate(
+    text: str,
+    zones: Sequence[Mapping[str, Any]],
+    resolution: int = RESOLUTION,
+) -> Generated:
+    """A routable graph of the plan ``text`` whose rooms are ``zones``."""
+    raster = Raster.build(text, zones, resolution)
+    cell = raster.cell
+    skeleton = thin(raster.corridors)
+    positions, junctions, blocks = corridor_nodes(skeleton, _scaled(SPACING, resolution))
+    edges: Dict[int, Dict[int, float]] = {i: {} for i in range(len(positions))}
+    for a, b in _joins(raster.walkable, positions, blocks).tolist():
+        length = float(np.hypot(*(positions[a] - positions[b]))) * cell
+        edges[a][b] = edges[b][a] = length
+    _prune(edges)
+
+    names = []
+    nodes: List[Dict[str, Any]] = []
+
+    def add(name: str, point, label_: str, kind: str, searchable: bool) -> None:
+        x, y = raster.point(*point)
+        names.append(name)
+        nodes.append(
+            {
+                "id": name,
+                "x": round(float(x), 1),
+                "y": round(float(y), 1),
+                "label": label_,
+                "type": kind,
+                "searchable": searchable,
+                "cluster_size": 1,
+            }
+        )
+
+    counters = {"intersection": 0, "invisible": 0}
+    for position, junction in zip(positions.tolist(), junctions.tolist()):
+        kind = "intersection" if junction else "invisible"
+        counters[kind] += 1
+        add(f"{kind}_{counters[kind]}", position, "", kind, False)
+
+    rooms = [position for position, zone in enumerate(zones) if zone.get("points")]
+    unseen: List[str] = []
+    doors = raster.doors()
+    for position in rooms if len(positions) else ():
+        zone = zones[position]
+        door = doors[position] if position < len(doors) else np.array([np.nan, np.nan])
+        if np.isnan(door).any():
+            # A closed room: its centre stands in for the door.
+            door = np.array(raster.pixel((zone["centroid_x"], zone["centroid_y"])))
+        distance = np.hypot(*(positions - door).T)
+        ranked = np.argsort(distance)
+        starts = np.repeat(door[None], len(ranked), axis=0)
+        seen = line_of_sight(raster.walkable, starts, positions[ranked])
+        if not seen.any():
+            unseen.append(str(zone["id"]))
+            continue
+        target = int(ranked[seen.argmax()])
+        node = len(names)
+        add(zone["id"], door, _room_label(zone), "class", True)
+        edges[node] = {target: float(distance[target]) * cell}
+        edges[target][node] = edges[node][target]
+
+    graph = {
+        names[a]: {names[b]: round(length, 2) for b, length in sorted(neighbours.items())}
+        for a, neighbours in edges.items()
+    }
+    return Generated(
+        nodes,
+        graph,
+        cell,
+        raster.walkable.shape,
+        int(raster.walkable.sum()),
+        int(skeleton.sum()),
+        len(rooms),
+        unseen,
+    )
+
+
+def output_path(root: Path, floor: Floor) -> Path:
+    return root / OUTPUT_DIR / Path(floor.nodes).name
+
+
+@dataclass
+class Result:
+    floor: str
+    shape: Tuple[int, int]
+    walkable: int
+    skeleton: int
+    nodes: int
+    edges: int
+    rooms: int
+    unseen: List[str]
+    #: Edges crossing a wall, by :func:`.walls.check_edges`.
+    crossings: int
+    seconds: float
+
+
+def generate_floors(
+    root: Path, floors: Optional[Sequence[Floor]] = None, resolution: int = RESOLUTION
+) -> List[Result]:
+    """Generate every floor's graph into :data:`OUTPUT_DIR`."""
+    (root / OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    results = []
+    for floor in floors or FLOORS:
+        began = time.perf_counter()
+        text = (root / floor.svg).read_text(encoding="utf-8")
+        generated = generate(text, load_zones(root, floor), resolution)
+        took = time.perf_counter() - began
+        positions = {node["id"]: (node["x"], node["y"]) for node in generated.nodes}
+        edges = graph_edges(generated.graph)
+        crossings = check_edges(floor.id, SegmentIndex.build(wall_segments(text)), positions, edges)
+        # Plans are drawn in display coordinates; the nodes file holds raw ones.
+        nodes = [
+            {**node, "x": round(node["x"], 1), "y": round(node["y"], 1)}
+            for node in raw_nodes(root, floor, generated.nodes)
+        ]
+        data = {"nodes": nodes, "graph": generated.graph}
+        output_path(root, floor).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        results.append(
+            Result(
+                floor.id,
+                generated.shape,
+                generated.walkable,
+                generated.skeleton,
+                len(nodes),
+                len(edges),
+                generated.rooms,
+                generated.unseen,
+                len(crossings),
+                took,
+            )
+        )
+    return results
+
+
+def format_report(results: Sequence[Result]) -> str:
+    header = [
+        "floor",
+        "raster",
+        "walkable px",
+        "skeleton px",
+        "nodes",
+        "edges",
+        "rooms",
+        "unseen",
+        "crossings",
+        "seconds",
+    ]
+    rows = []
+    for r in results:
+        rows.append(
+            [
+                r.floor,
+                f"{r.shape[1]}x{r.shape[0]}",
+                str(r.walkable),
+                str(r.skeleton),
+                str(r.nodes),
+                str(r.edges),
+                str(r.rooms),
+                str(len(r.unseen)),
+                str(r.crossings),
+                f"{r.seconds:.2f}",
+            ]
+        )
+    lines = table(header, rows)
+    for r in results:
+        if r.unseen:
+            lines.append(f"{r.floor}: left out, door sees no corridor: {', '.join(r.unseen)}")
+    lines.append(f"wrote {OUTPUT_DIR}/")
+    return "\n".join(lines)
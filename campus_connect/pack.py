@@ -0,0 +1,527 @@
+"""Binary floor packs: a floor's nodes, graph and zones in typed arrays.
+
+``*_floor_nodes.json`` spells out every key of every node and nests the
+graph as dicts keyed by node id; ``*_zones.json`` writes every vertex as a
+list of two numbers. A pack holds the same data as flat little-endian
+arrays that both ends read in place: Python through :class:`memoryview`
+casts over the bytes or an ``mmap`` of the file, the page through typed
+array views of the response's ``ArrayBuffer``.
+
+Layout (version :data:`VERSION`)::
+
+    header     magic "CCFP", u16 version, u16 array count, u32 total size
+    directory  per array: 8-byte ASCII name, u8 type ("B", "I" or "f"),
+               3 padding bytes, u32 element count, u32 byte offset
+    arrays     each starting on an 8-byte boundary
+
+``B`` is ``uint8``, ``I`` ``uint32`` and ``f`` ``float32``. The arrays are:
+
+- ``strofs``/``strdata``: the string table, UTF-8 bytes of string ``i``
+  from ``strofs[i]`` to ``strofs[i + 1]``. Every id, label, type, zone
+  category and fill is stored once and referred to by number;
+  :data:`NONE` stands for a missing string.
+- ``vid``/``vflags``/``eoffs``/``etarget``/``eweight``: the graph in CSR
+  form over the vertices of :class:`~campus_connect.routing.CompactGraph`
+  (every node id, then ids that only appear in the graph). ``vflags`` is 1
+  where the vertex has its own entry in ``graph``; the neighbours of
+  vertex ``v`` are ``etarget[eoffs[v]:eoffs[v + 1]]``, in JSON order.
+- ``nvert``/``nx``/``ny``/``nlabel``/``ntype``/``ncluster``/``nflags``:
+  one row per entry of ``nodes``, in order; ``nvert`` is the vertex of its
+  id and ``nflags`` holds :data:`SEARCHABLE`, :data:`HAS_SEARCHABLE` and
+  :data:`HAS_CLUSTER`.
+- ``zid``/``zcat``/``zfill``/``zsource``/``zflags``/``zring``/``zpoints``/
+  ``zbox``: one row per zone; the zone's ``points`` are vertices
+  ``zring[i]`` to ``zring[i + 1]`` of the ``x, y`` pairs in ``zpoints``
+  (present when ``zflags`` has :data:`HAS_POINTS`), and ``zbox`` holds its
+  centroid and bounding box, NaN where the zone has none.
+- ``extra``: optional UTF-8 JSON ``{"nodes": {row: {...}}, "zones": {row:
+  {...}}}`` of the fields the columns do not cover, such as zone names or
+  the node lists of hand-made zones.
+
+Coordinates and weights are ``float32``: about a thousandth of a map unit
+at the size of the plans, well under a pixel at any zoom.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .assets import BUILD_DIR
+from .compress import CompressionResult, available_encoders, precompress, sibling
+from .floors import FLOORS, Floor, Graph, load_zones
+from .report import table
+from .routing import CompactGraph
+from .static import COMPRESSED_SUFFIXES, StaticFiles, load_variants
+from .transform import load_display_nodes
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CCFP"
+VERSION = 1
+
+#: String number of a missing string.
+NONE = 0xFFFFFFFF
+
+#: ``nflags`` bits.
+SEARCHABLE = 1
+HAS_SEARCHABLE = 2
+HAS_CLUSTER = 4
+
+#: ``zflags`` bits.
+HAS_POINTS = 1
+
+#: Media type of a pack response.
+CONTENT_TYPE = "application/octet-stream"
+
+#: Directory of the packs written by the build.
+OUTPUT_DIR = f"{BUILD_DIR}/packs"
+
+_HEADER = struct.Struct("<4sHHI")
+_ENTRY = struct.Struct("<8sB3xII")
+_ALIGN = 8
+_ITEM_SIZES = {"B": 1, "I": 4, "f": 4}
+
+#: Node and zone fields held in columns; the others go to ``extra``.
+NODE_FIELDS = ("id", "x", "y", "label", "type", "searchable", "cluster_size")
+ZONE_FIELDS = ("id", "category", "fill", "points", "source_type")
+ZONE_BOX = (
+    "centroid_x",
+    "centroid_y",
+    "bbox_min_x",
+    "bbox_min_y",
+    "bbox_max_x",
+    "bbox_max_y",
+)
+
+#: Array names and types of the node and zone columns, in pack order.
+NODE_COLUMNS = (
+    ("nvert", "I"),
+    ("nx", "f"),
+    ("ny", "f"),
+    ("nlabel", "I"),
+    ("ntype", "I"),
+    ("ncluster", "I"),
+    ("nflags", "B"),
+)
+ZONE_COLUMNS = (
+    ("zid", "I"),
+    ("zcat", "I"),
+    ("zfill", "I"),
+    ("zsource", "I"),
+    ("zflags", "B"),
+    ("zring", "I"),
+    ("zpoints", "f"),
+    ("zbox", "f"),
+)
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class PackError(ValueError):
+    """Bytes that are not a floor pack this version can read."""
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self.numbers: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, value: Any) -> int:
+        if not isinstance(value, str):
+            return NONE
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.offsets) - 1
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return number
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _cluster(node: Mapping[str, Any]) -> Optional[int]:
+    value = node.get("cluster_size")
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < NONE:
+        return value
+    return None
+
+
+def _ring(zone: Mapping[str, Any]) -> Optional[List[Tuple[float, float]]]:
+    points = zone.get("points")
+    if not isinstance(points, list):
+        return None
+    if not all(isinstance(p, list) and len(p) == 2 and all(map(_is_number, p)) for p in points):
+        return None
+    return [(float(x), float(y)) for x, y in points]
+
+
+def encode_floor(
+    nodes: Sequence[Mapping[str, Any]],
+    graph: Mapping[str, Mapping[str, float]],
+    zones: Sequence[Mapping[str, Any]],
+) -> bytes:
+    """Pack a floor's ``nodes`` list, adjacency ``graph`` and ``zones``."""
+    compact = CompactGraph.from_json(nodes, graph)
+    strings = _Strings()
+    arrays: Dict[str, array] = {}
+    extra: Dict[str, Dict[str, Dict[str, Any]]] = {"nodes": {}, "zones": {}}
+
+    arrays["vid"] = array("I", [strings.add(node_id) for node_id in compact.ids])
+    arrays["vflags"] = array("B", compact.in_graph)
+    arrays["eoffs"] = array("I", compact.offsets)
+    arrays["etarget"] = array("I", compact.targets)
+    arrays["eweight"] = array("f", compact.weights)
+
+    columns = {name: array(code) for name, code in NODE_COLUMNS}
+    for row, node in enumerate(nodes):
+        columns["nvert"].append(compact.index[node["id"]])
+        columns["nx"].append(float(node["x"]))
+        columns["ny"].append(float(node["y"]))
+        columns["nlabel"].append(strings.add(node.get("label")))
+        columns["ntype"].append(strings.add(node.get("type")))
+        cluster = _cluster(node)
+        columns["ncluster"].append(0 if cluster is None else cluster)
+        searchable = node.get("searchable")
+        flags = HAS_CLUSTER if cluster is not None else 0
+        if isinstance(searchable, bool):
+            flags |= HAS_SEARCHABLE | (SEARCHABLE if searchable else 0)
+        columns["nflags"].append(flags)
+        kept = {
+            key: value
+            for key, value in node.items()
+            if key not in NODE_FIELDS
+            or (key in ("label", "type") and not isinstance(value, str))
+            or (key == "searchable" and not isinstance(value, bool))
+            or (key == "cluster_size" and cluster is None)
+        }
+        if kept:
+            extra["nodes"][str(row)] = kept
+    arrays.update(columns)
+
+    columns = {name: array(code) for name, code in ZONE_COLUMNS}
+    columns["zring"].append(0)
+    for row, zone in enumerate(zones):
+        for name, key in (("zid", "id"), ("zcat", "category"), ("zfill", "fill")):
+            columns[name].append(strings.add(zone.get(key)))
+        columns["zsource"].append(strings.add(zone.get("source_type")))
+        ring = _ring(zone)
+        columns["zflags"].append(HAS_POINTS if ring is not None else 0)
+        for x, y in ring or ():
+            columns["zpoints"].extend((x, y))
+        columns["zring"].append(len(columns["zpoints"]) // 2)
+        box = [zone.get(key) for key in ZONE_BOX]
+        columns["zbox"].extend(float(v) if _is_number(v) else math.nan for v in box)
+        kept = {
+            key: value
+            for key, value in zone.items()
+            if (key not in ZONE_FIELDS and key not in ZONE_BOX)
+            or (key in ZONE_BOX and not _is_number(value))
+            or (key == "points" and ring is None)
+            or (key in ("id", "category", "fill", "source_type") and not isinstance(value, str))
+        }
+        if kept:
+            extra["zones"][str(row)] = kept
+    arrays.update(columns)
+
+    arrays["strofs"] = strings.offsets
+    arrays["strdata"] = array("B", strings.data)
+    if extra["nodes"] or extra["zones"]:
+        arrays["extra"] = array("B", json.dumps(extra, separators=(",", ":")).encode("utf-8"))
+    return _write(arrays)
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGN
+
+
+def _write(arrays: Mapping[str, array]) -> bytes:
+    directory = bytearray()
+    body = bytearray()
+    start = _HEADER.size + _ENTRY.size * len(arrays)
+    start += _padding(start)
+    for name, values in arrays.items():
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        offset = start + len(body)
+        directory += _ENTRY.pack(name.encode("ascii"), ord(values.typecode), len(values), offset)
+        body += values.tobytes()
+        body += bytes(_padding(len(body)))
+    header = _HEADER.pack(MAGIC, VERSION, len(arrays), start + len(body))
+    head = header + directory
+    return bytes(head + bytes(_padding(len(head))) + body)
+
+
+class FloorPack:
+    """Read-only view of a pack; arrays are read in place, strings on demand.
+
+    ``buffer`` may be ``bytes`` or an ``mmap``; :meth:`open` maps a file.
+    """
+
+    def __init__(self, buffer: Buffer) -> None:
+        self.buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise PackError("too short for a floor pack")
+        magic, version, count, size = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise PackError("not a floor pack")
+        if version != VERSION:
+            raise PackError(f"floor pack version {version}, expected {VERSION}")
+        if size != len(view):
+            raise PackError(f"floor pack of {len(view)} bytes, header says {size}")
+        self._arrays: Dict[str, memoryview] = {}
+        for n in range(count):
+            name, code, length, offset = _ENTRY.unpack_from(view, _HEADER.size + n * _ENTRY.size)
+            typecode = chr(code)
+            if typecode not in _ITEM_SIZES:
+                raise PackError(f"unknown array type {typecode!r}")
+            end = offset + length * _ITEM_SIZES[typecode]
+            if end > size:
+                raise PackError(f"array {name!r} runs past the end")
+            self._arrays[name.rstrip(b"\0").decode("ascii")] = _cast(view[offset:end], typecode)
+        self._strings: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: Path) -> "FloorPack":
+        """Memory-map the pack at ``path``; nothing is read until it is used."""
+        with open(path, "rb") as fh:
+            return cls(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def array(self, name: str) -> memoryview:
+        return self._arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+    @property
+    def node_count(self) -> int:
+        return len(self._arrays["nvert"])
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self._arrays["vid"])
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._arrays["etarget"])
+
+    @property
+    def zone_count(self) -> int:
+        return len(self._arrays["zid"])
+
+    def strings(self) -> List[str]:
+        """The string table, decoded on first use."""
+        if self._strings is None:
+            offsets = self._arrays["strofs"].tolist()
+            data = bytes(self._arrays["strdata"])
+            self._strings = [data[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        return self._strings
+
+    def string(self, number: int) -> Optional[str]:
+        return None if number == NONE else self.strings()[number]
+
+    def neighbors(self, vertex: int) -> Iterable[Tuple[int, float]]:
+        offsets = self._arrays["eoffs"]
+        start, stop = offsets[vertex], offsets[vertex + 1]
+        return zip(self._arrays["etarget"][start:stop], self._arrays["eweight"][start:stop])
+
+    def _extra(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        if "extra" not in self._arrays:
+            return {}
+        return json.loads(bytes(self._arrays["extra"]).decode("utf-8"))[kind]
+
+    def nodes(self) -> List[Dict[str, Any]]:
+        """The ``nodes`` list, as :func:`~.transform.load_display_nodes` returns it."""
+        ids = self._ids()
+        string = self.string
+        extra = self._extra("nodes")
+        columns = zip(*(self._arrays[name].tolist() for name, _ in NODE_COLUMNS))
+        found = []
+        for row, (vertex, x, y, label, kind, cluster, flags) in enumerate(columns):
+            node: Dict[str, Any] = {"id": ids[vertex], "x": x, "y": y}
+            if label != NONE:
+                node["label"] = string(label)
+            if kind != NONE:
+                node["type"] = string(kind)
+            if flags & HAS_SEARCHABLE:
+                node["searchable"] = bool(flags & SEARCHABLE)
+            if flags & HAS_CLUSTER:
+                node["cluster_size"] = cluster
+            if extra:
+                node.update(extra.get(str(row), {}))
+            found.append(node)
+        return found
+
+    def graph(self) -> Graph:
+        """The adjacency ``graph``, sources in vertex order."""
+        a = self._arrays
+        ids = self._ids()
+        offsets, weights = a["eoffs"].tolist(), a["eweight"].tolist()
+        targets = [ids[target] for target in a["etarget"].tolist()]
+        return {
+            ids[vertex]: dict(zip(targets[start:stop], weights[start:stop]))
+            for vertex, (start, stop, flag) in enumerate(
+                zip(offsets, offsets[1:], a["vflags"].tolist())
+            )
+            if flag
+        }
+
+    def zones(self) -> List[Dict[str, Any]]:
+        """The zones list, as :func:`~campus_connect.floors.load_zones` returns it."""
+        string = self.string
+        extra = self._extra("zones")
+        columns = {name: self._arrays[name].tolist() for name, _ in ZONE_COLUMNS}
+        points = columns["zpoints"]
+        vertices = [[x, y] for x, y in zip(points[0::2], points[1::2])]
+        rings, boxes = columns["zring"], columns["zbox"]
+        found = []
+        for row in range(self.zone_count):
+            zone: Dict[str, Any] = {}
+            for key, column in (("id", "zid"), ("category", "zcat"), ("fill", "zfill")):
+                if columns[column][row] != NONE:
+                    zone[key] = string(columns[column][row])
+            if columns["zflags"][row] & HAS_POINTS:
+                zone["points"] = vertices[rings[row] : rings[row + 1]]
+            for key, value in zip(ZONE_BOX, boxes[row * 6 : row * 6 + 6]):
+                if not math.isnan(value):
+                    zone[key] = value
+            if columns["zsource"][row] != NONE:
+                zone["source_type"] = string(columns["zsource"][row])
+            if extra:
+                zone.update(extra.get(str(row), {}))
+            found.append(zone)
+        return found
+
+    def _ids(self) -> List[str]:
+        strings = self.strings()
+        return [strings[number] for number in self._arrays["vid"].tolist()]
+
+    def close(self) -> None:
+        self._arrays.clear()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def _cast(view: memoryview, typecode: str) -> memoryview:
+    """``view`` as ``typecode`` items; copied and swapped only on big-endian hosts."""
+    if sys.byteorder == "little" or typecode == "B":
+        return view.cast(typecode)
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return memoryview(values)
+
+
+def pack_floor(root: Path, floor: Floor) -> bytes:
+    nodes, graph = load_display_nodes(root, floor)
+    return encode_floor(nodes, graph, load_zones(root, floor))
+
+
+def pack_url(floor_id: str) -> str:
+    """Logical path (without leading slash) of a floor's pack."""
+    return f"api/floor/{floor_id}/pack"
+
+
+def output_path(root: Path, floor: Floor) -> Path:
+    return root / OUTPUT_DIR / f"{floor.id}.ccfp"
+
+
+def built_pack(root: Path, floor: Floor) -> Optional[Path]:
+    """The pack the build wrote for ``floor`` if it is newer than the floor's data and plan."""
+    path = output_path(root, floor)
+    if not path.is_file():
+        return None
+    mtime = path.stat().st_mtime
+    sources = (root / floor.nodes, root / floor.zones, root / floor.svg)
+    return path if all(mtime >= source.stat().st_mtime for source in sources) else None
+
+
+@dataclass
+class Result:
+    floor: str
+    #: Bytes of the two JSON files as stored, and as compact JSON.
+    json: int
+    compact: int
+    pack: int
+    #: Encoding to ``(compact JSON, pack)`` compressed bytes.
+    compressed: Dict[str, Tuple[int, int]]
+    written: CompressionResult
+
+
+def write_floor_packs(root: Path, floors: Optional[Sequence[Floor]] = None) -> List[Result]:
+    """Write every floor's pack, with precompressed siblings, under :data:`OUTPUT_DIR`."""
+    (root / OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    results = []
+    for floor in floors or FLOORS:
+        body = pack_floor(root, floor)
+        target = output_path(root, floor)
+        if built_pack(root, floor) is None or target.read_bytes() != body:
+            target.write_bytes(body)
+            for encoding in COMPRESSED_SUFFIXES:
+                sibling(target, encoding).unlink(missing_ok=True)
+        nodes, graph = load_display_nodes(root, floor)
+        compact = b"".join(
+            json.dumps(data, separators=(",", ":")).encode("utf-8")
+            for data in ({"nodes": nodes, "graph": graph}, load_zones(root, floor))
+        )
+        stored = (root / floor.nodes).stat().st_size + (root / floor.zones).stat().st_size
+        compressed = {
+            encoding: (len(encode(compact)), len(encode(body)))
+            for encoding, encode in available_encoders().items()
+        }
+        [written] = precompress([target])
+        results.append(Result(floor.id, stored, len(compact), len(body), compressed, written))
+    return results
+
+
+def format_report(results: Sequence[Result]) -> str:
+    encodings = [enc for enc in available_encoders() if all(enc in r.compressed for r in results)]
+    header = ["floor", "json", "compact", "pack"]
+    header += [f"{enc} {kind}" for enc in encodings for kind in ("json", "pack")]
+    rows = []
+    for result in results:
+        row = [result.floor, str(result.json), str(result.compact), str(result.pack)]
+        row += [str(n) for enc in encodings for n in result.compressed[enc]]
+        rows.append(row)
+    lines = table(header, rows)
+    lines.append("json: the nodes and zones files; compressed sizes are of the compact JSON")
+    lines.append(f"wrote {OUTPUT_DIR}/")
+    return "\n".join(lines)
+
+
+def install_packs(static: StaticFiles, root: Path) -> Dict[str, str]:
+    """Publish every floor's pack; returns floor id to pack URL.
+
+    Packs written by the build are memory-mapped and served from the
+    mapping with their precompressed siblings; otherwise they are encoded
+    here and only gzipped.
+    """
+    gzip = available_encoders()["gzip"]
+    urls = {}
+    for floor in FLOORS:
+        path = built_pack(root, floor)
+        if path is not None:
+            pack = FloorPack.open(path)
+            body, variants = pack.buffer, load_variants(path)
+        else:
+            body = pack_floor(root, floor)
+            compressed = gzip(body)
+            variants = {"gzip": compressed} if len(compressed) < len(body) else {}
+        static.add(pack_url(floor.id), body, CONTENT_TYPE, variants, fingerprint=True)
+        urls[floor.id] = pack_url(floor.id)
+        logger.info(
+            "pack %s: %d bytes%s", floor.id, len(body), " (mapped)" if path is not None else ""
+        )
+    return urls
@@ -0,0 +1,61 @@
+"""Warming the floors next to the one on screen.
+
+Pressing next or previous used to start a cold load of the new floor's
+bundle and pack. The floors a user is likely to switch to are the ones
+below and above in the floor manifest's order, so once a floor is up the
+page fetches theirs at low priority and a switch finds them ready.
+
+Each bundle response names those files in a ``Link: <url>; rel=prefetch``
+header, and ``GET /api/floor/{id}/prefetch`` lists them as JSON for the
+page to fetch itself (browsers act on ``Link`` headers of documents only).
+The hints are ``prefetch`` rather than ``preload``: the files are for a
+later navigation and must not compete with the floor being shown. URLs are
+the content-hashed ones, which browsers cache for good.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from .bundle import bundle_url
+from .catalog import adjacent_floors
+from .floors import FLOORS
+from .pack import pack_url
+from .static import StaticFiles
+
+
+def prefetch_url(floor_id: str) -> str:
+    """Logical path (without leading slash) of a floor's prefetch list."""
+    return f"api/floor/{floor_id}/prefetch"
+
+
+def floor_assets(floor_id: str) -> List[str]:
+    """Logical paths a floor switch fetches, in the page's order."""
+    return [bundle_url(floor_id), pack_url(floor_id)]
+
+
+def warm_urls(static: StaticFiles, floor_id: str) -> List[str]:
+    """Hashed URLs (without leading slash) of the files of the floors next to ``floor_id``.
+
+    Raises ``KeyError`` for an unknown floor.
+    """
+    below, above = adjacent_floors()[floor_id]
+    return [
+        static.manifest[logical]
+        for neighbour in (above, below)
+        if neighbour is not None
+        for logical in floor_assets(neighbour)
+        if logical in static.manifest
+    ]
+
+
+def link_header(urls: List[str]) -> str:
+    return ", ".join(f"</{url}>; rel=prefetch" for url in urls)
+
+
+def install_hints(static: StaticFiles) -> None:
+    """Send every floor's bundle with ``Link`` hints for its neighbours' files."""
+    for floor in FLOORS:
+        urls = warm_urls(static, floor.id)
+        if urls and bundle_url(floor.id) in static.manifest:
+            static.set_headers(bundle_url(floor.id), {"Link": link_header(urls)})
@@ -0,0 +1,163 @@
+"""Minimal HTTP/1.1 message handling for the asyncio server.
+
+Only what the campus map needs is implemented: ``GET``/``HEAD`` style
+requests with optional ``Content-Length`` bodies, persistent connections and
+pipelining. Chunked request bodies are rejected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+MAX_HEAD_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """Raised when a request cannot be parsed; carries the status to answer."""
+
+    def __init__(self, status: HTTPStatus, message: str = "") -> None:
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    target: str
+    version: str
+    headers: Dict[str, str]
+    body: bytes = b""
+    path: str = "/"
+    query: Dict[str, str] = field(default_factory=dict)
+    params: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return "keep-alive" in connection
+        return "close" not in connection
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def text(cls, status: int, message: str) -> "Response":
+        return cls(
+            status,
+            message.encode("utf-8"),
+            {"Content-Type": "text/plain; charset=utf-8"},
+        )
+
+    @classmethod
+    def json(
+        cls, status: int, payload: Any, headers: Optional[Dict[str, str]] = None
+    ) -> "Response":
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return cls(status, body, {"Content-Type": "application/json", **(headers or {})})
+
+    @classmethod
+    def error(cls, status: HTTPStatus) -> "Response":
+        return cls.text(status.value, f"{status.value} {status.phrase}\n")
+
+
+_date_cache: Tuple[int, str] = (0, "")
+
+
+def http_date() -> str:
+    """Return the current ``Date`` header value, formatted at most once a second."""
+    global _date_cache
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache = (now, formatdate(now, usegmt=True))
+    return _date_cache[1]
+
+
+def parse_head(head: bytes) -> Request:
+    """Parse a request line and header block terminated by ``CRLFCRLF``."""
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3:
+        raise ProtocolError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    method, target, version = parts
+    if version not in ("HTTP/1.1", "HTTP/1.0"):
+        raise ProtocolError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep or not name or name != name.strip():
+            raise ProtocolError(HTTPStatus.BAD_REQUEST, "malformed header")
+        name = name.lower()
+        value = value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+    split = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+    return Request(method, target, version, headers, path=unquote(split.path) or "/", query=query)
+
+
+async def read_request(reader: asyncio.StreamReader, timeout: float) -> Optional[Request]:
+    """Read one request from ``reader``.
+
+    Returns ``None`` when the peer closed the connection (or stayed idle for
+    ``timeout`` seconds) before sending anything.
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ProtocolError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+    if len(head) > MAX_HEAD_BYTES:
+        raise ProtocolError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+    request = parse_head(head[:-4])
+    if "chunked" in request.headers.get("transfer-encoding", "").lower():
+        raise ProtocolError(HTTPStatus.NOT_IMPLEMENTED, "chunked bodies are not supported")
+    length = request.headers.get("content-length")
+    if length:
+        if not length.isdigit():
+            raise ProtocolError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if int(length) > MAX_BODY_BYTES:
+            raise ProtocolError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            request.body = await asyncio.wait_for(reader.readexactly(int(length)), timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            raise ProtocolError(HTTPStatus.BAD_REQUEST, "truncated body")
+    return request
+
+
+def encode_response(response: Response, *, keep_alive: bool, head_only: bool = False) -> bytes:
+    """Serialise ``response`` as an HTTP/1.1 message."""
+    status = HTTPStatus(response.status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    headers = {
+        "Date": http_date(),
+        "Server": "campus-connect",
+        **response.headers,
+        "Content-Length": str(len(response.body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }
+    bodyless = status in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED)
+    if bodyless:
+        del headers["Content-Length"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    if head_only or bodyless:
+        return head
+    return head + response.body
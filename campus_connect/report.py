@@ -0,0 +1,22 @@
+"""Plain-text tables of the build stages' reports.
+
+Every stage prints one row per floor (or file) under a header: the first
+column left-justified, the rest right-justified, and a rule under the
+header as wide as the header line. Stages append their own notes below.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+
+def table(header: Sequence[object], rows: Sequence[Sequence[object]]) -> List[str]:
+    """The lines of a table of ``rows`` under ``header``, cells as ``str``."""
+    cells = [[str(cell) for cell in row] for row in [header, *rows]]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    lines = [
+        "  ".join([row[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(row[1:], widths[1:])])
+        for row in cells
+    ]
+    lines.insert(1, "-" * len(lines[0]))
+    return lines
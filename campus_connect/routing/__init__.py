@@ -0,0 +1,25 @@
+"""Server-side routing over the floor navigation graphs."""
+
+from .astar import astar_path
+from .contract import ContractedGraph, contract
+from .engine import CampusRoute, Route, RoutingEngine, RoutingError
+from .graph import CompactGraph
+from .multifloor import DEFAULT_VERTICAL_COST
+from .nexthop import NextHopTable, floyd_warshall
+from .search import astar, dijkstra
+
+__all__ = [
+    "DEFAULT_VERTICAL_COST",
+    "CampusRoute",
+    "CompactGraph",
+    "ContractedGraph",
+    "NextHopTable",
+    "Route",
+    "RoutingEngine",
+    "RoutingError",
+    "astar",
+    "astar_path",
+    "contract",
+    "dijkstra",
+    "floyd_warshall",
+]
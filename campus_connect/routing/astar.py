@@ -0,0 +1,90 @@
+"""Faithful port of ``astarPath()``, the page's former route search.
+
+The page now routes with ``shortestPath()``, which picks the same route as
+the next-hop tables; the port is kept as the baseline of
+``benchmarks/bench_astar.py``. It keeps the browser's exact search order
+(linear scan of the open set in insertion order, first minimum wins,
+neighbours in JSON key order). The only change is that coordinates come
+from a dict instead of a linear scan over ``nodes``; the first node with a
+given id wins, as in ``getNodeCoordinates()``.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Mapping, Optional, Tuple
+
+Coords = Mapping[str, Tuple[float, float]]
+Graph = Mapping[str, Mapping[str, float]]
+
+
+def coordinate_table(nodes) -> Dict[str, Tuple[float, float]]:
+    table: Dict[str, Tuple[float, float]] = {}
+    for node in nodes:
+        table.setdefault(node["id"], (node["x"], node["y"]))
+    return table
+
+
+def heuristic_distance(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
+
+
+def astar_path(graph: Graph, coords: Coords, start: str, end: str) -> Optional[List[str]]:
+    """Return the node path from ``start`` to ``end`` or ``None``."""
+    start_coords = coords.get(start)
+    end_coords = coords.get(end)
+    if start_coords is None or end_coords is None:
+        return None
+    if start not in graph or end not in graph:
+        return None
+
+    inf = math.inf
+    g_score: Dict[str, float] = dict.fromkeys(graph, inf)
+    f_score: Dict[str, float] = dict.fromkeys(graph, inf)
+    previous: Dict[str, Optional[str]] = dict.fromkeys(graph)
+    open_set: Dict[str, None] = {}  # insertion-ordered, like a JS Set
+    closed: set = set()
+
+    g_score[start] = 0.0
+    f_score[start] = heuristic_distance(start_coords, end_coords)
+    open_set[start] = None
+
+    while open_set:
+        current = None
+        best = inf
+        for node in open_set:
+            if f_score.get(node, inf) < best:
+                best = f_score[node]
+                current = node
+        if current is None or current == end:
+            break
+
+        del open_set[current]
+        closed.add(current)
+
+        for neighbor, weight in (graph.get(current) or {}).items():
+            if neighbor in closed:
+                continue
+            tentative = g_score[current] + weight
+            if neighbor not in open_set:
+                open_set[neighbor] = None
+            elif tentative >= g_score.get(neighbor, inf):
+                continue
+
+            previous[neighbor] = current
+            g_score[neighbor] = tentative
+            neighbor_coords = coords.get(neighbor)
+            if neighbor_coords is not None:
+                f_score[neighbor] = tentative + heuristic_distance(neighbor_coords, end_coords)
+
+    path: List[str] = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = previous.get(node)
+    path.reverse()
+    return path if len(path) > 1 and path[0] == start else None
+
+
+def path_distance(graph: Graph, path: List[str]) -> float:
+    return sum(graph[a][b] for a, b in zip(path, path[1:]))
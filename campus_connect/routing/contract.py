@@ -0,0 +1,340 @@
+"""Degree-2 chain contraction.
+
+Corridors are drawn as chains of pass-through points: ``invisible_*``
+waypoints, the ``data_node_*`` of the hand-made data, and most nodes of a
+graph generated by :mod:`campus_connect.navgraph`. A search settles every one
+of them although nothing can happen there but going on to the next.
+
+:func:`contract` removes every node that is not searchable and has exactly
+two neighbours, joined to it in both directions. A chain of such nodes
+between two kept nodes becomes a single edge weighted by the chain's total
+and remembering the nodes in between, so searches run on the smaller core
+graph and routes are expanded back to every original node, with their
+geometry, on output. A cycle made only of removable nodes keeps one of them.
+
+Routes may start or end on a removed node: the search then starts from both
+ends of its chain, or finishes at whichever end gives the shorter total.
+:meth:`ContractedGraph.route` runs A*, whose routes are shortest as long as
+no edge is shorter than the straight line between its ends.
+:meth:`ContractedGraph.shortest` is exact on any weights: a Dijkstra search
+from the end over the core gives every node's distance, and the route is
+walked from the start by :meth:`CompactGraph.next_hop
+<campus_connect.routing.graph.CompactGraph.next_hop>`, picking the same
+route as the next-hop tables of :mod:`.nexthop`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .graph import CompactGraph
+
+#: One end of a search: core node, cost from or to the endpoint, and the
+#: original nodes walked between them.
+Leg = Tuple[int, float, List[int]]
+
+
+@dataclass
+class ContractedGraph:
+    """A :class:`CompactGraph` (``base``) and its core without the removed nodes."""
+
+    base: CompactGraph
+    #: Kept nodes only, numbered in ``base`` order; every edge is a chain.
+    core: CompactGraph
+    #: ``base`` node number of every ``core`` node.
+    kept: array
+    #: ``core`` node number of every ``base`` node, -1 where removed.
+    core_of: array
+    #: ``core`` node every ``core`` edge leaves from.
+    sources: array
+    #: ``base`` nodes inside the chain of every ``core`` edge, in walking order.
+    via: List[Tuple[int, ...]]
+    #: Removed ``base`` node to a ``core`` edge whose chain passes through it.
+    chain_of: Dict[int, int]
+
+    @property
+    def removed(self) -> int:
+        return self.base.node_count - self.core.node_count
+
+    @classmethod
+    def from_json(
+        cls, nodes: Iterable[Mapping[str, Any]], graph: Mapping[str, Mapping[str, float]]
+    ) -> "ContractedGraph":
+        """Contract the ``nodes`` and ``graph`` of a floor file, keeping searchable nodes."""
+        nodes = list(nodes)
+        base = CompactGraph.from_json(nodes, graph)
+        return contract(base, [base.index[node["id"]] for node in nodes if node.get("searchable")])
+
+    def chain(self, edge: int) -> List[int]:
+        """Every ``base`` node of a ``core`` edge, ends included."""
+        kept = self.kept
+        return [kept[self.sources[edge]], *self.via[edge], kept[self.core.targets[edge]]]
+
+    def walk(self, nodes: Sequence[int]) -> float:
+        weight = self.base.weight
+        return sum(weight(a, b) for a, b in zip(nodes, nodes[1:]))
+
+    def route(self, start: int, end: int, heuristic: bool = True) -> Optional[List[int]]:
+        """The ``base`` node path from ``start`` to ``end``, or ``None``.
+
+        Searches the core with a binary-heap A*; ``heuristic=False`` makes it
+        Dijkstra, for graphs whose coordinates are not one frame.
+        """
+        base = self.base
+        if start == end or not base.in_graph[start] or not base.in_graph[end]:
+            return None
+        if heuristic and (math.isnan(base.xs[start]) or math.isnan(base.xs[end])):
+            return None
+        best, found = self._same_chain(start, end)
+        starts = self._legs(start, forward=True)
+        ends: Dict[int, Tuple[float, List[int]]] = {}
+        for node, cost, nodes in self._legs(end, forward=False):
+            if node not in ends or cost < ends[node][0]:
+                ends[node] = cost, nodes
+
+        core = self.core
+        xs, ys = core.xs, core.ys
+        ex, ey = base.xs[end], base.ys[end]
+        sqrt = math.sqrt
+
+        def h(node: int) -> float:
+            if not heuristic or xs[node] != xs[node]:
+                return 0.0
+            return sqrt((ex - xs[node]) ** 2 + (ey - ys[node]) ** 2)
+
+        n = core.node_count
+        inf = math.inf
+        offsets, targets, weights = core.offsets, core.targets, core.weights
+        g = [inf] * n
+        previous = [-1] * n
+        done = bytearray(n)
+        heap = []
+        seq = 0
+        first: Dict[int, List[int]] = {}
+        for node, cost, nodes in starts:
+            if cost < g[node]:
+                g[node], first[node] = cost, nodes
+                seq += 1
+                heapq.heappush(heap, (cost + h(node), seq, node))
+        reached = -1
+        while heap:
+            fscore, _, current = heapq.heappop(heap)
+            if fscore >= best:
+                break
+            if done[current]:
+                continue
+            done[current] = 1
+            gcur = g[current]
+            finish = ends.get(current)
+            if finish is not None and gcur + finish[0] < best:
+                best, reached = gcur + finish[0], current
+            for i in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[i]
+                tentative = gcur + weights[i]
+                if done[neighbor] or tentative >= g[neighbor]:
+                    continue
+                g[neighbor] = tentative
+                previous[neighbor] = i
+                seq += 1
+                nx = xs[neighbor]
+                if heuristic and nx == nx:
+                    tentative += sqrt((ex - nx) ** 2 + (ey - ys[neighbor]) ** 2)
+                heapq.heappush(heap, (tentative, seq, neighbor))
+
+        if reached == -1:
+            return found
+        edges = []
+        node = reached
+        while previous[node] != -1:
+            edges.append(previous[node])
+            node = self.sources[previous[node]]
+        edges.reverse()
+        path = list(first[node])
+        kept, via = self.kept, self.via
+        for edge in edges:
+            path.extend(via[edge])
+            path.append(kept[targets[edge]])
+        path.extend(ends[reached][1][1:])
+        return path
+
+    def shortest(self, start: int, end: int) -> Optional[List[int]]:
+        """The shortest ``base`` node path from ``start`` to ``end``, or ``None``."""
+        base = self.base
+        if start == end or not base.in_graph[start] or not base.in_graph[end]:
+            return None
+        remaining = self.distances_to(end)
+        if remaining[start] == math.inf:
+            return None
+        path = [start]
+        while path[-1] != end:
+            if len(path) > base.node_count:  # only possible with zero-weight cycles
+                return None
+            path.append(base.next_hop(path[-1], remaining))
+        return path
+
+    def distances_to(self, end: int) -> List[float]:
+        """Shortest distance from every ``base`` node to ``end``, ``inf`` where none."""
+        core = self.core
+        inf = math.inf
+        weights, sources = core.weights, self.sources
+        g = [inf] * core.node_count
+        heap = []
+        for node, cost, _ in self._legs(end, forward=False):
+            if cost < g[node]:
+                g[node] = cost
+                heapq.heappush(heap, (cost, node))
+        done = bytearray(core.node_count)
+        while heap:
+            cost, current = heapq.heappop(heap)
+            if done[current]:
+                continue
+            done[current] = 1
+            for i in self._incoming[current]:
+                source = sources[i]
+                tentative = cost + weights[i]
+                if tentative < g[source]:
+                    g[source] = tentative
+                    heapq.heappush(heap, (tentative, source))
+
+        base = self.base
+        remaining = [inf] * base.node_count
+        for number, node in enumerate(self.kept):
+            remaining[node] = g[number]
+        remaining[end] = 0.0
+        # Removed nodes go on along their chain to whichever end (or ``end``)
+        # is nearer: one pass each way settles the whole chain.
+        weight = base.weight
+        for edge in set(self.chain_of.values()):
+            chain = self.chain(edge)
+            for i in range(len(chain) - 2, 0, -1):
+                node, after = chain[i], chain[i + 1]
+                remaining[node] = min(remaining[node], weight(node, after) + remaining[after])
+            for i in range(1, len(chain) - 1):
+                node, before = chain[i], chain[i - 1]
+                remaining[node] = min(remaining[node], weight(node, before) + remaining[before])
+        return remaining
+
+    @cached_property
+    def _incoming(self) -> List[List[int]]:
+        """``core`` edges arriving at every ``core`` node."""
+        incoming: List[List[int]] = [[] for _ in range(self.core.node_count)]
+        for i, target in enumerate(self.core.targets):
+            incoming[target].append(i)
+        return incoming
+
+    def _legs(self, node: int, forward: bool) -> List[Leg]:
+        """Core nodes reachable from (or reaching) ``node`` along its chain."""
+        core_node = self.core_of[node]
+        if core_node != -1:
+            return [(core_node, 0.0, [node])]
+        legs = []
+        chain = self.chain(self.chain_of[node])
+        position = chain.index(node)
+        for side in (chain[position:], chain[position::-1]):
+            nodes = side if forward else side[::-1]
+            legs.append((self.core_of[side[-1]], self.walk(nodes), nodes))
+        return legs
+
+    def _same_chain(self, start: int, end: int) -> Tuple[float, Optional[List[int]]]:
+        """The walk from ``start`` to ``end`` inside one chain, if both lie in it."""
+        for node in (start, end):
+            if self.core_of[node] == -1:
+                chain = self.chain(self.chain_of[node])
+                break
+        else:
+            return math.inf, None
+        if start not in chain or end not in chain:
+            return math.inf, None
+        i, j = chain.index(start), chain.index(end)
+        nodes = chain[i : j + 1] if i < j else chain[j : i + 1][::-1]
+        return self.walk(nodes), nodes
+
+
+def contract(graph: CompactGraph, keep: Iterable[int] = ()) -> ContractedGraph:
+    """Remove the degree-2 nodes of ``graph`` not in ``keep`` (searchable nodes)."""
+    n = graph.node_count
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    incoming = [0] * n
+    for target in targets:
+        incoming[target] += 1
+
+    removable = bytearray(n)
+    kept_ids = set(keep)
+    for node in range(n):
+        if node in kept_ids or not graph.in_graph[node] or incoming[node] != 2:
+            continue
+        out = targets[offsets[node] : offsets[node + 1]]
+        if len(out) == 2 and out[0] != out[1] and node not in out:
+            if all(node in _targets(graph, other) for other in out):
+                removable[node] = 1
+
+    chains: Dict[int, List[Tuple[int, float, Tuple[int, ...]]]] = {}
+    chain_of: Dict[int, Tuple[int, int]] = {}
+
+    def walk_from(source: int) -> None:
+        edges = chains[source] = []
+        for i in range(offsets[source], offsets[source + 1]):
+            previous, current, total, via = source, targets[i], weights[i], []
+            while removable[current]:
+                chain_of.setdefault(current, (source, len(edges)))
+                via.append(current)
+                start = offsets[current]
+                j = start if targets[start] != previous else start + 1
+                previous, current, total = current, targets[j], total + weights[j]
+            edges.append((current, total, tuple(via)))
+
+    for node in range(n):
+        if not removable[node]:
+            walk_from(node)
+    # Cycles of removable nodes only: keep one node of each.
+    for node in range(n):
+        if removable[node] and node not in chain_of:
+            removable[node] = 0
+            walk_from(node)
+
+    kept = array("l", (node for node in range(n) if not removable[node]))
+    core_of = array("l", [-1] * n)
+    for number, node in enumerate(kept):
+        core_of[node] = number
+
+    core_offsets = array("l", [0] * (len(kept) + 1))
+    core_sources, core_targets, core_weights = array("l"), array("l"), array("d")
+    via: List[Tuple[int, ...]] = []
+    first_edge: Dict[int, int] = {}
+    for number, node in enumerate(kept):
+        first_edge[node] = len(core_targets)
+        for target, total, inner in chains[node]:
+            core_sources.append(number)
+            core_targets.append(core_of[target])
+            core_weights.append(total)
+            via.append(inner)
+        core_offsets[number + 1] = len(core_targets)
+
+    core = CompactGraph(
+        [graph.ids[node] for node in kept],
+        {graph.ids[node]: number for number, node in enumerate(kept)},
+        array("d", (graph.xs[node] for node in kept)),
+        array("d", (graph.ys[node] for node in kept)),
+        bytearray(graph.in_graph[node] for node in kept),
+        core_offsets,
+        core_targets,
+        core_weights,
+    )
+    return ContractedGraph(
+        graph,
+        core,
+        kept,
+        core_of,
+        core_sources,
+        via,
+        {node: first_edge[source] + k for node, (source, k) in chain_of.items()},
+    )
+
+
+def _targets(graph: CompactGraph, node: int) -> array:
+    return graph.targets[graph.offsets[node] : graph.offsets[node + 1]]
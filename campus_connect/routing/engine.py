@@ -0,0 +1,229 @@
+"""Server-side route computation for every floor.
+
+Floor graphs are loaded and contracted once and answers are memoised per
+query in an LRU cache, so the same query from many phones is searched once.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+from ..floors import FLOORS, Floor
+from ..transform import load_display_nodes
+from .contract import ContractedGraph, contract
+from .graph import CompactGraph
+from .multifloor import (
+    DEFAULT_VERTICAL_COST,
+    FloorSource,
+    qualified,
+    split_qualified,
+    stair_links,
+    stitch,
+)
+
+
+class RoutingError(LookupError):
+    """Raised for unknown floors or nodes."""
+
+
+@dataclass(frozen=True)
+class Route:
+    floor: str
+    path: List[str]
+    distance: float
+    polyline: List[Tuple[float, float]]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "floor": self.floor,
+            "from": self.path[0],
+            "to": self.path[-1],
+            "path": self.path,
+            "distance": self.distance,
+            "polyline": [list(point) for point in self.polyline],
+        }
+
+
+@dataclass(frozen=True)
+class CampusRoute:
+    """A route that may change floors; one :class:`Route` leg per floor visited."""
+
+    legs: List[Route]
+    distance: float
+
+    def to_json(self) -> Dict[str, Any]:
+        first, last = self.legs[0], self.legs[-1]
+        return {
+            "from": first.path[0],
+            "to": last.path[-1],
+            "from_floor": first.floor,
+            "to_floor": last.floor,
+            "distance": self.distance,
+            "legs": [leg.to_json() for leg in self.legs],
+        }
+
+
+@dataclass
+class FloorGraph:
+    floor: Floor
+    #: ``graph`` without its corridor chains; routes are searched on its core.
+    contracted: ContractedGraph
+
+    @property
+    def graph(self) -> CompactGraph:
+        return self.contracted.base
+
+
+class RoutingEngine:
+    """Answers shortest-route queries.
+
+    Routes are shortest paths, found by
+    :meth:`~.contract.ContractedGraph.shortest` on the core of each floor
+    graph, with chains of pass-through nodes contracted (:mod:`.contract`),
+    and expanded back to every node. Among equally short routes it picks
+    the one the bundles' next-hop tables and the page's ``shortestPath()``
+    pick. Cross-floor queries search the stitched campus graph of
+    :mod:`.multifloor`, contracted the same way, once.
+
+    Coordinates are in the SVG frame the page draws in, so ``polyline`` can
+    be rendered directly.
+    """
+
+    def __init__(
+        self,
+        floors: Dict[str, FloorGraph],
+        campus: Optional[ContractedGraph] = None,
+        cache_size: int = 65536,
+    ) -> None:
+        self.floors = floors
+        self.campus = campus
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    @classmethod
+    def load(
+        cls,
+        root: Path,
+        *,
+        vertical_cost: float = DEFAULT_VERTICAL_COST,
+        stair_costs: Optional[Mapping[str, float]] = None,
+        **options: Any,
+    ) -> "RoutingEngine":
+        floors = {}
+        sources = []
+        for floor in FLOORS:
+            nodes, graph = load_display_nodes(root, floor)
+            floors[floor.id] = FloorGraph(floor, ContractedGraph.from_json(nodes, graph))
+            sources.append(FloorSource(floor.id, floor.level, nodes, graph))
+        stitched = stitch(sources, stair_links(sources, vertical_cost, stair_costs))
+        searchable = [
+            stitched.index[qualified(source.id, node["id"])]
+            for source in sources
+            for node in source.nodes
+            if node.get("searchable")
+        ]
+        return cls(floors, contract(stitched, searchable), **options)
+
+    def floor_graph(self, floor_id: str) -> FloorGraph:
+        try:
+            return self.floors[floor_id]
+        except KeyError:
+            raise RoutingError(f"unknown floor {floor_id!r}") from None
+
+    def locate(self, node_id: str) -> List[str]:
+        """Ids of the floors that have a node called ``node_id``."""
+        floors = []
+        for floor_id, data in self.floors.items():
+            node = data.graph.lookup(node_id)
+            if node is not None and data.graph.has_coords(node):
+                floors.append(floor_id)
+        return floors
+
+    def route(self, floor_id: str, start: str, end: str) -> Optional[Route]:
+        """Return the route from ``start`` to ``end``, or ``None`` if unreachable."""
+        return self._cached((floor_id, start, end), lambda: self._search(floor_id, start, end))
+
+    def route_between(
+        self, from_floor: str, start: str, to_floor: str, end: str
+    ) -> Optional[CampusRoute]:
+        """Route from ``start`` on ``from_floor`` to ``end`` on ``to_floor``."""
+        if from_floor == to_floor:
+            route = self.route(from_floor, start, end)
+            return None if route is None else CampusRoute([route], route.distance)
+        return self._cached(
+            (from_floor, start, to_floor, end),
+            lambda: self._search_campus(from_floor, start, to_floor, end),
+        )
+
+    def _cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        try:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = self._cache[key] = compute()
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _endpoint(graph: CompactGraph, name: str, node_id: str, floor_id: str) -> int:
+        node = graph.lookup(name)
+        if node is None or not graph.has_coords(node):
+            raise RoutingError(f"unknown node {node_id!r} on floor {floor_id!r}")
+        return node
+
+    def _search(self, floor_id: str, start: str, end: str) -> Optional[Route]:
+        contracted = self.floor_graph(floor_id).contracted
+        graph = contracted.base
+        path = contracted.shortest(
+            self._endpoint(graph, start, start, floor_id),
+            self._endpoint(graph, end, end, floor_id),
+        )
+        if path is None:
+            return None
+        return Route(
+            floor_id,
+            [graph.ids[node] for node in path],
+            sum(graph.weight(a, b) for a, b in zip(path, path[1:])),
+            [graph.coords(node) for node in path if graph.has_coords(node)],
+        )
+
+    def _search_campus(
+        self, from_floor: str, start: str, to_floor: str, end: str
+    ) -> Optional[CampusRoute]:
+        if self.campus is None:
+            raise RoutingError("cross-floor routing is not configured")
+        for floor_id in (from_floor, to_floor):
+            self.floor_graph(floor_id)
+        graph = self.campus.base
+        path = self.campus.shortest(
+            self._endpoint(graph, qualified(from_floor, start), start, from_floor),
+            self._endpoint(graph, qualified(to_floor, end), end, to_floor),
+        )
+        if path is None:
+            return None
+
+        legs: List[Route] = []
+        leg: List[int] = [path[0]]
+        for node in path[1:]:
+            if split_qualified(graph.ids[node])[0] != split_qualified(graph.ids[leg[-1]])[0]:
+                legs.append(self._leg(graph, leg))
+                leg = []
+            leg.append(node)
+        legs.append(self._leg(graph, leg))
+        distance = sum(graph.weight(a, b) for a, b in zip(path, path[1:]))
+        return CampusRoute(legs, distance)
+
+    @staticmethod
+    def _leg(graph: CompactGraph, nodes: List[int]) -> Route:
+        floor_id = split_qualified(graph.ids[nodes[0]])[0]
+        return Route(
+            floor_id,
+            [split_qualified(graph.ids[node])[1] for node in nodes],
+            sum(graph.weight(a, b) for a, b in zip(nodes, nodes[1:])),
+            [graph.coords(node) for node in nodes if graph.has_coords(node)],
+        )
@@ -0,0 +1,120 @@
+"""Array-backed navigation graph.
+
+Node ids are interned to consecutive integers; coordinates live in two
+contiguous ``array('d')`` buffers and adjacency in CSR form (``offsets``,
+``targets``, ``weights``), preserving each node's neighbour order from the
+JSON ``graph``.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+#: Route lengths closer than this are equal. Shortest routes are walked by
+#: :meth:`CompactGraph.next_hop`, and the next-hop tables, the routing engine
+#: and the page all break ties the same way, so they return the same route.
+TIE = 1e-6
+
+
+@dataclass
+class CompactGraph:
+    ids: List[str]
+    index: Dict[str, int]
+    xs: array
+    ys: array
+    #: 1 where the node has its own entry in the JSON ``graph``.
+    in_graph: bytearray
+    offsets: array
+    targets: array
+    weights: array
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def has_coords(self, node: int) -> bool:
+        return not math.isnan(self.xs[node])
+
+    def coords(self, node: int) -> Tuple[float, float]:
+        return self.xs[node], self.ys[node]
+
+    def neighbors(self, node: int) -> Iterable[Tuple[int, float]]:
+        start, stop = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:stop], self.weights[start:stop])
+
+    def weight(self, a: int, b: int) -> float:
+        for target, weight in self.neighbors(a):
+            if target == b:
+                return weight
+        raise KeyError((self.ids[a], self.ids[b]))
+
+    def next_hop(self, node: int, remaining: Sequence[float]) -> int:
+        """The neighbour a shortest route takes from ``node``, or -1 if none.
+
+        ``remaining`` is every node's distance to the route's end. The hop is
+        the first neighbour, in graph order, whose ``weight + remaining`` is
+        within :data:`TIE` of the least.
+        """
+        totals = [(target, weight + remaining[target]) for target, weight in self.neighbors(node)]
+        least = min((total for _, total in totals), default=math.inf)
+        if least == math.inf:
+            return -1
+        return next(target for target, total in totals if total <= least + TIE)
+
+    def lookup(self, node_id: str) -> Optional[int]:
+        return self.index.get(node_id)
+
+    @classmethod
+    def from_json(
+        cls, nodes: Iterable[Mapping[str, Any]], graph: Mapping[str, Mapping[str, float]]
+    ) -> "CompactGraph":
+        """Build from the ``nodes`` list and ``graph`` dict of a floor file.
+
+        The first node with a given id supplies its coordinates, as in
+        ``getNodeCoordinates()``. Ids that appear only in ``graph`` get NaN
+        coordinates.
+        """
+        ids: List[str] = []
+        index: Dict[str, int] = {}
+
+        def intern(node_id: str) -> int:
+            number = index.get(node_id)
+            if number is None:
+                number = index[node_id] = len(ids)
+                ids.append(node_id)
+            return number
+
+        xs, ys = array("d"), array("d")
+        for node in nodes:
+            if node["id"] not in index:
+                intern(node["id"])
+                xs.append(float(node["x"]))
+                ys.append(float(node["y"]))
+        for source, edges in graph.items():
+            intern(source)
+            for target in edges or {}:
+                intern(target)
+        missing = len(ids) - len(xs)
+        xs.extend([math.nan] * missing)
+        ys.extend([math.nan] * missing)
+
+        in_graph = bytearray(len(ids))
+        offsets = array("l", [0] * (len(ids) + 1))
+        targets, weights = array("l"), array("d")
+        adjacency = {index[source]: edges or {} for source, edges in graph.items()}
+        for node in range(len(ids)):
+            edges = adjacency.get(node)
+            if edges is not None:
+                in_graph[node] = 1
+                for target, weight in edges.items():
+                    targets.append(index[target])
+                    weights.append(float(weight))
+            offsets[node + 1] = len(targets)
+        return cls(ids, index, xs, ys, in_graph, offsets, targets, weights)
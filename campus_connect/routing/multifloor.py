@@ -0,0 +1,88 @@
+"""Stitched campus graph linking floors through their stairways.
+
+Every floor's nodes are copied into one graph under ``"<floor>:<id>"`` names,
+and stairway nodes with the same id on adjacent levels are joined in both
+directions by a vertical-traversal edge. A cross-floor query is then a single
+search over that graph, split into per-floor legs afterwards.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .graph import CompactGraph
+
+#: Default cost of climbing or descending one level by stairs, in map units.
+DEFAULT_VERTICAL_COST = 300.0
+
+SEPARATOR = ":"
+
+
+def qualified(floor_id: str, node_id: str) -> str:
+    return f"{floor_id}{SEPARATOR}{node_id}"
+
+
+def split_qualified(name: str) -> Tuple[str, str]:
+    floor_id, _, node_id = name.partition(SEPARATOR)
+    return floor_id, node_id
+
+
+@dataclass(frozen=True)
+class FloorSource:
+    """One floor's data in the frame the page draws it."""
+
+    id: str
+    level: int
+    nodes: Sequence[Mapping[str, Any]]
+    graph: Mapping[str, Mapping[str, float]]
+
+
+@dataclass(frozen=True)
+class StairLink:
+    lower: str
+    upper: str
+    node: str
+    cost: float
+
+
+def stair_links(
+    floors: Sequence[FloorSource],
+    vertical_cost: float = DEFAULT_VERTICAL_COST,
+    stair_costs: Optional[Mapping[str, float]] = None,
+) -> List[StairLink]:
+    """Pair stairway nodes sharing an id on floors one level apart.
+
+    ``stair_costs`` overrides ``vertical_cost`` per stairway id.
+    """
+    stair_costs = stair_costs or {}
+    stairways = {
+        floor.id: {node["id"] for node in floor.nodes if node.get("type") == "stairway"}
+        for floor in floors
+    }
+    ordered = sorted(floors, key=lambda floor: floor.level)
+    links = []
+    for lower, upper in zip(ordered, ordered[1:]):
+        if upper.level - lower.level != 1:
+            continue
+        for node in sorted(stairways[lower.id] & stairways[upper.id]):
+            links.append(StairLink(lower.id, upper.id, node, stair_costs.get(node, vertical_cost)))
+    return links
+
+
+def stitch(floors: Sequence[FloorSource], links: Sequence[StairLink]) -> CompactGraph:
+    nodes: List[Dict[str, Any]] = []
+    graph: Dict[str, Dict[str, float]] = {}
+    for floor in floors:
+        for node in floor.nodes:
+            nodes.append({**node, "id": qualified(floor.id, node["id"])})
+        for source, edges in floor.graph.items():
+            graph[qualified(floor.id, source)] = {
+                qualified(floor.id, target): weight for target, weight in (edges or {}).items()
+            }
+    for link in links:
+        lower = qualified(link.lower, link.node)
+        upper = qualified(link.upper, link.node)
+        graph.setdefault(lower, {})[upper] = link.cost
+        graph.setdefault(upper, {})[lower] = link.cost
+    return CompactGraph.from_json(nodes, graph)
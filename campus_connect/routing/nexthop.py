@@ -0,0 +1,131 @@
+"""All-pairs shortest-path tables for small floors.
+
+Floors have tens of nodes, so every route can be precomputed: a vectorised
+Floyd–Warshall over a dense NumPy weight matrix gives all-pairs distances
+and a next-hop matrix, where ``next[i, j]`` is the node after ``i`` on the
+shortest path to ``j``. A route is then read off in O(path length) by
+following next hops, with no search. Next hops are stored as ``uint8`` up to
+255 nodes and ``uint16`` beyond, with the largest value of the type marking
+"unreachable".
+
+The tables need the optional ``numpy`` package; :func:`available` reports
+whether it is installed.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .graph import TIE, CompactGraph
+
+#: Largest floor the tables are built for; ``uint16`` next hops cap it anyway.
+MAX_NODES = 65535
+
+
+def available() -> bool:
+    return np is not None
+
+
+def next_hop_dtype(node_count: int):
+    if node_count > MAX_NODES:
+        raise ValueError(f"{node_count} nodes do not fit a uint16 next-hop table")
+    return np.dtype("<u1") if node_count <= 255 else np.dtype("<u2")
+
+
+@dataclass
+class NextHopTable:
+    ids: List[str]
+    #: ``float64`` shortest distances, ``inf`` where unreachable.
+    distances: Any
+    #: ``uint8``/``uint16`` next hops, ``unreachable`` where there is no path.
+    next: Any
+
+    @property
+    def unreachable(self) -> int:
+        return int(np.iinfo(self.next.dtype).max)
+
+    @property
+    def nbytes(self) -> int:
+        return self.distances.nbytes + self.next.nbytes
+
+    def path(self, start: int, end: int) -> Optional[List[int]]:
+        """Node numbers from ``start`` to ``end``, or ``None`` if unreachable."""
+        if start == end or self.next[start, end] == self.unreachable:
+            return None
+        path = [start]
+        hops = self.next
+        while path[-1] != end:
+            if len(path) > len(self.ids):  # only possible with zero-weight cycles
+                return None
+            path.append(int(hops[path[-1], end]))
+        return path
+
+    def to_json(self) -> Dict[str, Any]:
+        """Compact JSON form: little-endian matrices, row-major, base64-encoded.
+
+        Distances are shipped as ``float32`` with ``-1`` for unreachable.
+        """
+        distances = np.where(np.isinf(self.distances), -1.0, self.distances).astype("<f4")
+        return {
+            "ids": self.ids,
+            "dtype": self.next.dtype.name,
+            "next": base64.b64encode(self.next.tobytes()).decode("ascii"),
+            "distances": base64.b64encode(distances.tobytes()).decode("ascii"),
+        }
+
+
+def weight_matrix(graph: CompactGraph):
+    """Dense matrix of edge weights, ``inf`` without an edge and 0 on the diagonal."""
+    n = graph.node_count
+    weights = np.full((n, n), np.inf)
+    offsets = np.frombuffer(graph.offsets, dtype=np.dtype(graph.offsets.typecode))
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    targets = np.frombuffer(graph.targets, dtype=np.dtype(graph.targets.typecode))
+    # Duplicate edges keep the cheapest weight.
+    np.minimum.at(weights, (sources, targets), np.frombuffer(graph.weights, dtype=np.float64))
+    np.fill_diagonal(weights, 0.0)
+    return weights
+
+
+def next_hops(graph: CompactGraph, dist):
+    """Next-hop matrix consistent with the all-pairs distances ``dist``.
+
+    The hop from ``i`` towards ``j`` is the first neighbour ``v``, in
+    ``graph`` order, whose ``w(i, v) + dist[v, j]`` is within
+    :data:`~.graph.TIE` of the least, as :meth:`CompactGraph.next_hop` picks
+    it. Deriving it after the fact costs O(V * E) and keeps the O(V^3) loop
+    down to one ``minimum`` per pivot.
+    """
+    n = graph.node_count
+    dtype = next_hop_dtype(n)
+    hops = np.full((n, n), np.iinfo(dtype).max, dtype=dtype)
+    offsets = np.frombuffer(graph.offsets, dtype=np.dtype(graph.offsets.typecode))
+    targets = np.frombuffer(graph.targets, dtype=np.dtype(graph.targets.typecode))
+    weights = np.frombuffer(graph.weights, dtype=np.float64)
+    for node in range(n):
+        lo, hi = offsets[node], offsets[node + 1]
+        if lo == hi:
+            continue
+        neighbours = targets[lo:hi]
+        reachable = np.isfinite(dist[node])
+        candidates = weights[lo:hi, None] + dist[neighbours][:, reachable]
+        ties = candidates <= candidates.min(axis=0) + TIE
+        hops[node, reachable] = neighbours[ties.argmax(axis=0)]
+    np.fill_diagonal(hops, np.arange(n))
+    return hops
+
+
+def floyd_warshall(graph: CompactGraph) -> NextHopTable:
+    """All-pairs distances and next hops; O(V^3) time, O(V^2) memory."""
+    next_hop_dtype(graph.node_count)
+    dist = weight_matrix(graph)
+    for k in range(graph.node_count):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return NextHopTable(list(graph.ids), dist, next_hops(graph, dist))
@@ -0,0 +1,122 @@
+"""Binary-heap A* over a :class:`~campus_connect.routing.graph.CompactGraph`.
+
+The open set is a ``heapq`` with lazy deletion: improving a node pushes a
+new entry and stale entries are skipped when popped. Heap entries are
+ordered by ``(f, first time the node entered the open set)``, which is
+exactly the tie-break of the page's linear scan over an insertion-ordered
+``Set``, so routes are identical to the page's former ``astarPath()`` at
+O((V + E) log V) instead of O(V^2).
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import List, Optional
+
+from .graph import CompactGraph
+
+
+def astar(graph: CompactGraph, start: int, end: int) -> Optional[List[int]]:
+    """Return the node-number path from ``start`` to ``end`` or ``None``."""
+    xs, ys = graph.xs, graph.ys
+    if math.isnan(xs[start]) or math.isnan(xs[end]):
+        return None
+    if not graph.in_graph[start] or not graph.in_graph[end]:
+        return None
+
+    n = graph.node_count
+    inf = math.inf
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    ex, ey = xs[end], ys[end]
+    sqrt = math.sqrt
+
+    g = [inf] * n
+    f = [inf] * n
+    previous = [-1] * n
+    # 0 = unseen, 1 = open, 2 = closed
+    state = bytearray(n)
+    order = [0] * n
+    seq = 0
+
+    g[start] = 0.0
+    f[start] = sqrt((ex - xs[start]) ** 2 + (ey - ys[start]) ** 2)
+    state[start] = 1
+    heap = [(f[start], 0, start)]
+
+    while heap:
+        fscore, _, current = heapq.heappop(heap)
+        if state[current] != 1 or fscore != f[current]:
+            continue
+        if current == end:
+            break
+        state[current] = 2
+
+        gcur = g[current]
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            status = state[neighbor]
+            if status == 2:
+                continue
+            tentative = gcur + weights[i]
+            if status == 0:
+                state[neighbor] = 1
+                seq += 1
+                order[neighbor] = seq
+            elif tentative >= g[neighbor]:
+                continue
+
+            previous[neighbor] = current
+            g[neighbor] = tentative
+            nx = xs[neighbor]
+            if nx == nx:  # not NaN: the page leaves fScore unset without coordinates
+                f[neighbor] = tentative + sqrt((ex - nx) ** 2 + (ey - ys[neighbor]) ** 2)
+                heapq.heappush(heap, (f[neighbor], order[neighbor], neighbor))
+
+    path = []
+    node = end
+    while node != -1:
+        path.append(node)
+        node = previous[node]
+    path.reverse()
+    return path if len(path) > 1 and path[0] == start else None
+
+
+def dijkstra(graph: CompactGraph, start: int, end: int) -> Optional[List[int]]:
+    """Plain shortest path (no heuristic) from ``start`` to ``end`` or ``None``.
+
+    Used on the stitched multi-floor graph, where floors have unrelated
+    coordinate frames and a Euclidean heuristic would not be admissible.
+    """
+    if start == end:
+        return None
+    n = graph.node_count
+    inf = math.inf
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist = [inf] * n
+    previous = [-1] * n
+    done = bytearray(n)
+    dist[start] = 0.0
+    heap = [(0.0, start)]
+    while heap:
+        d, current = heapq.heappop(heap)
+        if done[current]:
+            continue
+        if current == end:
+            break
+        done[current] = 1
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            nd = d + weights[i]
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                previous[neighbor] = current
+                heapq.heappush(heap, (nd, neighbor))
+    if previous[end] == -1:
+        return None
+
+    path = [end]
+    while path[-1] != start:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
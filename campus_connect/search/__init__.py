@@ -0,0 +1,7 @@
+"""Search over place labels."""
+
+from .fuzzy import FuzzyIndex
+from .index import Document, LabelIndex
+from .service import SearchService, node_documents
+
+__all__ = ["Document", "FuzzyIndex", "LabelIndex", "SearchService", "node_documents"]
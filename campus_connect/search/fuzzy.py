@@ -0,0 +1,179 @@
+"""Typo-tolerant label search with a SymSpell-style deletion dictionary.
+
+Every word of the label vocabulary is stored under each string obtained by
+deleting up to :data:`MAX_EDITS` of its characters. A query word is
+corrected by looking up its own deletions there and verifying the few
+candidates with a bounded optimal-string-alignment distance, so the cost of
+a correction depends on the query word's length, not on the vocabulary size.
+
+A label matches when each query word matches one of its words; its distance
+is the sum of the corrections. Results rank by distance, then by the
+documents' popularity prior, then by label. Query words of one or two
+characters and room numbers (all digits) must match exactly: ``310`` is not a
+typo for ``311``.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .index import LabelIndex, _merged, words
+
+#: Deletions stored per vocabulary word, and the most edits ever corrected.
+MAX_EDITS = 2
+
+
+def max_edits(word: str) -> int:
+    """Edits tolerated in a query word: none for short words and numbers."""
+    if len(word) <= 2 or word.isdigit():
+        return 0
+    return 1 if len(word) <= 5 else MAX_EDITS
+
+
+def deletions(word: str, edits: int) -> Set[str]:
+    """``word`` and every string made by deleting up to ``edits`` characters."""
+    found = {word}
+    for count in range(1, min(edits, len(word)) + 1):
+        for positions in combinations(range(len(word)), count):
+            skip = set(positions)
+            found.add("".join(ch for i, ch in enumerate(word) if i not in skip))
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Optimal string alignment distance (Damerau), or ``None`` if above ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class FuzzyIndex:
+    """Deletion dictionary over the vocabulary of a :class:`LabelIndex`.
+
+    Postings are renumbered by rank (popularity, then label order) so each
+    correction's documents stream best-first and the search stops once the
+    top ``k`` cannot improve.
+    """
+
+    def __init__(self, labels: LabelIndex) -> None:
+        self.index = labels
+        vocabulary = labels.words.words
+        self.vocabulary = vocabulary
+        word_ids = {word: number for number, word in enumerate(vocabulary)}
+
+        ranked = sorted(
+            range(len(labels.documents)),
+            key=lambda doc: (-labels.documents[doc].popularity, doc),
+        )
+        #: ``order[rank]`` is the document number at that rank.
+        self.order = array("l", ranked)
+        rank_of = [0] * len(ranked)
+        for rank, doc in enumerate(ranked):
+            rank_of[doc] = rank
+        self.postings = [
+            array("l", sorted(rank_of[doc] for doc in docs)) for docs in labels.words.postings
+        ]
+        #: Vocabulary numbers of each document's words, by document number.
+        self.doc_words = [
+            tuple(sorted({word_ids[word] for word in words(label)})) for label in labels.labels
+        ]
+
+        self.deletes: Dict[str, List[int]] = {}
+        for number, word in enumerate(vocabulary):
+            for variant in deletions(word, MAX_EDITS):
+                self.deletes.setdefault(variant, []).append(number)
+        self._ids = word_ids
+
+    def corrections(self, word: str) -> Dict[int, int]:
+        """Vocabulary numbers within :func:`max_edits` of ``word``, with distances."""
+        limit = max_edits(word)
+        exact = self._ids.get(word)
+        if limit == 0:
+            return {} if exact is None else {exact: 0}
+        vocabulary = self.vocabulary
+        found: Dict[int, int] = {}
+        checked = set()
+        for variant in deletions(word, limit):
+            for number in self.deletes.get(variant, ()):
+                # Within ``limit`` edits, each side reaches a common string
+                # in at most ``limit`` deletions.
+                if number in checked or len(vocabulary[number]) - len(variant) > limit:
+                    continue
+                checked.add(number)
+                distance = edit_distance(word, vocabulary[number], limit)
+                if distance is not None:
+                    found[number] = distance
+        return found
+
+    def search(self, query: str, k: int = 15) -> List[Tuple[int, int]]:
+        """Best ``k`` ``(document number, distance)`` pairs for ``query``."""
+        tokens = words(query)
+        if not tokens or k <= 0:
+            return []
+        matches = [self.corrections(token) for token in tokens]
+        if not all(matches):
+            return []
+        # Stream the documents of the query word with the fewest; the other
+        # words only add to the distance.
+        driver = min(
+            range(len(tokens)),
+            key=lambda i: sum(len(self.postings[number]) for number in matches[i]),
+        )
+        others = [match for i, match in enumerate(matches) if i != driver]
+        levels: Dict[int, List[int]] = {}
+        for number, distance in matches[driver].items():
+            levels.setdefault(distance, []).append(number)
+
+        # Max-heap of the best k as (-distance, -rank).
+        best: List[Tuple[int, int]] = []
+        seen: Set[int] = set()
+        for level in sorted(levels):
+            if len(best) == k and level > -best[0][0]:
+                break
+            for rank in self._ranks(levels[level]):
+                if len(best) == k and (level, rank) > (-best[0][0], -best[0][1]):
+                    break
+                if rank in seen:
+                    continue
+                seen.add(rank)
+                total = self._distance(self.order[rank], level, others)
+                if total is None:
+                    continue
+                entry = (-total, -rank)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+        return [(self.order[-rank], -distance) for distance, rank in sorted(best, reverse=True)]
+
+    def _ranks(self, numbers: List[int]) -> Iterator[int]:
+        return _merged([self.postings[number] for number in numbers])
+
+    def _distance(self, doc: int, base: int, others: List[Dict[int, int]]) -> Optional[int]:
+        total = base
+        doc_words = self.doc_words[doc]
+        for match in others:
+            distances = [match[number] for number in doc_words if number in match]
+            if not distances:
+                return None
+            total += min(distances)
+        return total
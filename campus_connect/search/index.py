@@ -0,0 +1,199 @@
+"""Trigram + word-prefix index over place labels.
+
+The page filters every node with ``label.toLowerCase().includes(query)`` on
+each keystroke. :class:`LabelIndex` answers from precomputed structures
+instead, and ranks matches by tier: whole label, label prefix, word prefix,
+then any other substring (queries shorter than three characters only match
+prefixes).
+
+Documents are numbered in label order, so within a tier the best matches are
+the lowest numbers, and every tier is read best-first with an early stop at
+``k``:
+
+* label-prefix matches are one contiguous range of numbers, found by
+  bisection;
+* word-prefix matches merge the postings (sorted ``array`` s of document
+  numbers) of the words starting with the query, found by bisection in a
+  sorted word table;
+* other substrings come from the shortest posting list among the query's
+  trigrams (a match must contain all of them), confirmed with ``in``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+#: Shortest query answered from trigram postings.
+GRAM = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+_WORD_CHAR = re.compile(r"[a-z0-9]")
+
+
+def normalize(text: str) -> str:
+    return text.lower()
+
+
+def words(text: str) -> List[str]:
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(text: str) -> Iterator[str]:
+    text = normalize(text)
+    return (text[i : i + GRAM] for i in range(len(text) - GRAM + 1))
+
+
+@dataclass(frozen=True)
+class Document:
+    """One searchable place: a node, or a zone reached through its ``entry`` node."""
+
+    floor: str
+    id: str
+    label: str
+    type: Optional[str] = None
+    kind: str = "node"
+    entry: Optional[str] = None
+    #: Prior for ranking equally good fuzzy matches; higher ranks first.
+    popularity: float = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        payload = {
+            "floor": self.floor,
+            "id": self.id,
+            "label": self.label,
+            "type": self.type,
+            "kind": self.kind,
+        }
+        if self.entry is not None:
+            payload["entry"] = self.entry
+        return payload
+
+
+class WordTable:
+    """Sorted words with their postings; prefix lookups by bisection."""
+
+    def __init__(self, postings: Dict[str, List[int]]) -> None:
+        self.words = sorted(postings)
+        self.postings = [array("l", sorted(set(postings[word]))) for word in self.words]
+
+    def prefixed(self, prefix: str) -> List[array]:
+        """Postings of every word starting with ``prefix``."""
+        start = bisect.bisect_left(self.words, prefix)
+        stop = bisect.bisect_left(self.words, prefix + "\uffff", start)
+        return self.postings[start:stop]
+
+    def to_json(self) -> List[Tuple[str, List[int]]]:
+        return [(word, list(docs)) for word, docs in zip(self.words, self.postings)]
+
+
+def _merged(postings: Sequence[array]) -> Iterator[int]:
+    """Distinct document numbers of several sorted postings, ascending."""
+    last = -1
+    for doc in heapq.merge(*postings):
+        if doc != last:
+            last = doc
+            yield doc
+
+
+class LabelIndex:
+    """Search index over the labels of ``documents``."""
+
+    def __init__(self, documents: Iterable[Document]) -> None:
+        ranked = sorted(
+            enumerate(documents), key=lambda item: (normalize(item[1].label), item[0])
+        )
+        self.documents: List[Document] = [document for _, document in ranked]
+        #: Normalised labels, sorted: label-prefix matches are a contiguous range.
+        self.labels = [normalize(document.label) for document in self.documents]
+
+        grams: Dict[str, List[int]] = {}
+        postings: Dict[str, List[int]] = {}
+        for doc, label in enumerate(self.labels):
+            for gram in set(trigrams(label)):
+                grams.setdefault(gram, []).append(doc)
+            for token in set(words(label)):
+                postings.setdefault(token, []).append(doc)
+        self.trigrams = {gram: array("l", docs) for gram, docs in grams.items()}
+        self.words = WordTable(postings)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def tier(self, doc: int, query: str) -> int:
+        """0 whole label, 1 label prefix, 2 word prefix, 3 other substring."""
+        label = self.labels[doc]
+        if label == query:
+            return 0
+        if label.startswith(query):
+            return 1
+        at = label.find(query)
+        while at > 0:
+            if not _WORD_CHAR.match(label, at - 1):
+                return 2
+            at = label.find(query, at + 1)
+        return 3
+
+    def search(self, query: str, k: int = 15) -> List[Document]:
+        """Best ``k`` documents whose label matches ``query``."""
+        return [self.documents[doc] for doc in self.search_numbers(query, k)]
+
+    def search_numbers(self, query: str, k: int = 15) -> List[int]:
+        query = normalize(query)
+        if not query or k <= 0:
+            return []
+        labels = self.labels
+        lo = bisect.bisect_left(labels, query)
+        hi = bisect.bisect_left(labels, query + "\uffff", lo)
+        found = list(range(lo, min(hi, lo + k)))
+        if len(found) == k:
+            return found
+
+        if _WORD.fullmatch(query):
+            for doc in _merged(self.words.prefixed(query)):
+                if not lo <= doc < hi:
+                    found.append(doc)
+                    if len(found) == k:
+                        return found
+            if len(query) < GRAM:
+                return found
+            wanted = (3,)
+        elif len(query) < GRAM:
+            # Short queries with punctuation or spaces: too rare to index, scan.
+            matches = (doc for doc, label in enumerate(labels) if query in label)
+            return found + [doc for doc in matches if not lo <= doc < hi][: k - len(found)]
+        else:
+            wanted = (2, 3)
+
+        shortest = None
+        for gram in set(trigrams(query)):
+            docs = self.trigrams.get(gram)
+            if docs is None:
+                return found
+            if shortest is None or len(docs) < len(shortest):
+                shortest = docs
+        need = k - len(found)
+        tiers: Dict[int, List[int]] = {tier: [] for tier in wanted}
+        for doc in shortest:
+            if lo <= doc < hi or query not in labels[doc]:
+                continue
+            bucket = tiers.get(self.tier(doc, query))
+            if bucket is not None and len(bucket) < need:
+                bucket.append(doc)
+                if len(tiers[wanted[0]]) == need:
+                    break
+        for tier in wanted:
+            found.extend(tiers[tier][: k - len(found)])
+        return found
+
+    def to_json(self) -> Dict[str, Any]:
+        """Exported index for the page: documents and postings by number."""
+        return {
+            "docs": [[document.id, document.label] for document in self.documents],
+            "trigrams": {gram: list(docs) for gram, docs in sorted(self.trigrams.items())},
+            "words": self.words.to_json(),
+        }
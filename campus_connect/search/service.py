@@ -0,0 +1,166 @@
+"""Label search across the campus.
+
+:class:`SearchService` indexes every floor's data files once at start-up:
+the searchable, labelled nodes of ``data/<floor>_floor_nodes.json`` and the
+zones of ``data/<floor>_floor_zones.json``, each tagged with its floor. There
+is one :class:`~.index.LabelIndex` per floor and one over the whole campus,
+so a campus-wide query costs the same however many floors there are. Each
+index has a :class:`~.fuzzy.FuzzyIndex` beside it for typo-tolerant queries.
+Nodes and zones may carry a numeric ``popularity``, the prior that orders
+equally close fuzzy matches.
+
+Floors are the catalogue's (:data:`~campus_connect.floors.FLOORS`) followed
+by any other ``*_floor_nodes.json`` file found in ``data/``, so a new
+floor's rooms are searchable before it has a map.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ..floors import FLOORS, get_floor, load_json
+from ..spatial import FloorNodes
+from ..transform import display_nodes
+from .fuzzy import FuzzyIndex
+from .index import Document, LabelIndex
+
+logger = logging.getLogger(__name__)
+
+NODES_SUFFIX = "_floor_nodes.json"
+ZONES_SUFFIX = "_floor_zones.json"
+
+
+@dataclass(frozen=True)
+class FloorFiles:
+    """Paths (relative to the root) of one floor's data files."""
+
+    id: str
+    nodes: str
+    zones: Optional[str]
+
+
+def floor_files(root: Path) -> List[FloorFiles]:
+    """Data files of every floor: catalogue floors first, then the rest by name."""
+    catalogue = [floor.id for floor in FLOORS]
+    paths = (root / "data").glob(f"*{NODES_SUFFIX}")
+    names = [name for name in catalogue if (root / get_floor(name).nodes).is_file()]
+    names += sorted({path.name[: -len(NODES_SUFFIX)] for path in paths} - set(catalogue))
+    found = []
+    for name in names:
+        zones: Optional[str] = f"data/{name}{ZONES_SUFFIX}"
+        if not (root / zones).is_file():
+            zones = None
+        found.append(FloorFiles(name, f"data/{name}{NODES_SUFFIX}", zones))
+    return found
+
+
+def node_documents(floor_id: str, nodes: Iterable[Mapping[str, Any]]) -> List[Document]:
+    """Documents for the nodes the page lets users search: searchable, labelled."""
+    return [
+        Document(
+            floor_id,
+            node["id"],
+            node["label"],
+            node.get("type"),
+            popularity=float(node.get("popularity", 0.0)),
+        )
+        for node in nodes
+        if node.get("searchable") and node.get("label")
+    ]
+
+
+def zone_label(zone: Mapping[str, Any]) -> str:
+    """``name``, or the id title-cased as the info box shows it (``lab_1`` -> ``Lab 1``)."""
+    return zone.get("name") or zone["id"].replace("_", " ").title()
+
+
+def zone_documents(
+    floor_id: str,
+    zones: Sequence[Mapping[str, Any]],
+    entries: Mapping[str, str],
+    node_labels: Iterable[str],
+) -> List[Document]:
+    """Documents for zones whose label is not already a node label on the floor.
+
+    A zone's entry node is the one ``entries`` gives, else its first listed
+    member node.
+    """
+    taken = {label.lower() for label in node_labels}
+    documents = []
+    for zone in zones:
+        label = zone_label(zone)
+        if label.lower() in taken:
+            continue
+        entry = entries.get(zone["id"]) or next(iter(zone.get("nodes") or ()), None)
+        documents.append(
+            Document(
+                floor_id,
+                zone["id"],
+                label,
+                zone.get("category"),
+                "zone",
+                entry,
+                float(zone.get("popularity", 0.0)),
+            )
+        )
+    return documents
+
+
+def floor_documents(root: Path, files: FloorFiles) -> List[Document]:
+    nodes = load_json(root, files.nodes).get("nodes") or []
+    documents = node_documents(files.id, nodes)
+    if files.zones is not None:
+        zones = load_json(root, files.zones)
+        entries: Mapping[str, str] = {}
+        # Zone centroids are in the map's frame; floors without a map have none.
+        if files.id in {floor.id for floor in FLOORS}:
+            floor = get_floor(files.id)
+            shown = display_nodes(root, floor, nodes)
+            entries = FloorNodes.build(floor, shown).zone_entries(zones)
+        documents += zone_documents(
+            files.id, zones, entries, (document.label for document in documents)
+        )
+    return documents
+
+
+class SearchService:
+    def __init__(self, floors: Dict[str, LabelIndex], campus: LabelIndex) -> None:
+        self.floors = floors
+        self.campus = campus
+        self.fuzzy: Dict[Optional[str], FuzzyIndex] = {None: FuzzyIndex(campus)}
+        for floor_id, index in floors.items():
+            self.fuzzy[floor_id] = FuzzyIndex(index)
+
+    @classmethod
+    def load(cls, root: Path) -> "SearchService":
+        floors = {
+            files.id: LabelIndex(floor_documents(root, files)) for files in floor_files(root)
+        }
+        campus = LabelIndex(
+            document for index in floors.values() for document in index.documents
+        )
+        logger.info("search: %d places on %d floors", len(campus), len(floors))
+        return cls(floors, campus)
+
+    def index(self, floor_id: Optional[str] = None) -> Optional[LabelIndex]:
+        """The index of one floor, or of the whole campus without ``floor_id``."""
+        if floor_id is None:
+            return self.campus
+        return self.floors.get(floor_id)
+
+    def search(self, query: str, k: int = 15, floor_id: Optional[str] = None) -> List[Document]:
+        index = self.index(floor_id)
+        return [] if index is None else index.search(query, k)
+
+    def fuzzy_search(
+        self, query: str, k: int = 15, floor_id: Optional[str] = None
+    ) -> List[Tuple[Document, int]]:
+        """Best ``k`` ``(document, edit distance)`` pairs, tolerating typos."""
+        fuzzy = self.fuzzy.get(floor_id)
+        if fuzzy is None:
+            return []
+        documents = fuzzy.index.documents
+        return [(documents[doc], distance) for doc, distance in fuzzy.search(query, k)]
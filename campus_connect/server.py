@@ -0,0 +1,195 @@
+"""Asyncio HTTP/1.1 server for the campus map.
+
+Replaces ``python -m http.server``: connections are persistent, many clients
+are served concurrently on one event loop, and the number of open
+connections is bounded so a full lecture hall cannot exhaust the process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from http import HTTPStatus
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Pattern, Tuple
+
+from . import DEFAULT_ROOT
+from .bundle import install_bundles
+from .catalog import install_floor_manifest
+from .prefetch import install_hints
+from .protocol import ProtocolError, Request, Response, encode_response, read_request
+from .static import StaticFiles
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class CampusServer:
+    """Serve the campus map and its API over HTTP/1.1 with keep-alive.
+
+    ``max_connections`` bounds the number of connections being served at
+    once. Further connections wait up to ``queue_timeout`` seconds for a free
+    slot and are then answered with ``503``. Idle keep-alive connections are
+    closed after ``keepalive_timeout`` seconds so they do not hold slots.
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_ROOT,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        *,
+        max_connections: int = 1024,
+        keepalive_timeout: float = 15.0,
+        queue_timeout: float = 5.0,
+    ) -> None:
+        self.root = Path(root)
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.queue_timeout = queue_timeout
+        self.static = StaticFiles(self.root)
+        self._slots = asyncio.Semaphore(max_connections)
+        self._routes: List[Tuple[str, Pattern[str], Handler]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def route(self, method: str, pattern: str) -> Callable[[Handler], Handler]:
+        """Register ``handler`` for ``method`` requests whose path matches ``pattern``.
+
+        Named groups in the pattern are exposed as ``request.params``.
+        """
+
+        def register(handler: Handler) -> Handler:
+            self._routes.append((method, re.compile(pattern + r"\Z"), handler))
+            return handler
+
+        return register
+
+    async def start(self) -> None:
+        self.static.load()
+        install_bundles(self.static, self.root)
+        install_floor_manifest(self.static, self.root)
+        install_hints(self.static)
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        sockets = self._server.sockets or ()
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        logger.info("serving %s on http://%s:%d/", self.root, self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def dispatch(self, request: Request) -> Response:
+        allowed = set()
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if request.method == method or (request.method == "HEAD" and method == "GET"):
+                request.params = match.groupdict()
+                return await handler(request)
+            allowed.add(method)
+        if allowed:
+            response = Response.error(HTTPStatus.METHOD_NOT_ALLOWED)
+            response.headers["Allow"] = ", ".join(sorted(allowed))
+            return response
+
+        if request.method not in ("GET", "HEAD"):
+            response = Response.error(HTTPStatus.METHOD_NOT_ALLOWED)
+            response.headers["Allow"] = "GET, HEAD"
+            return response
+        response = self.static.respond(request.path, request.headers)
+        return response or Response.error(HTTPStatus.NOT_FOUND)
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            response = Response.error(HTTPStatus.SERVICE_UNAVAILABLE)
+            response.headers["Retry-After"] = "1"
+            writer.write(encode_response(response, keep_alive=False))
+            await self._close(writer)
+            return
+        try:
+            await self._serve_requests(reader, writer)
+        finally:
+            self._slots.release()
+            await self._close(writer)
+
+    async def _serve_requests(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        while True:
+            try:
+                request = await read_request(reader, self.keepalive_timeout)
+            except ProtocolError as exc:
+                writer.write(encode_response(Response.error(exc.status), keep_alive=False))
+                return
+            if request is None:
+                return
+
+            try:
+                response = await self.dispatch(request)
+            except Exception:
+                logger.exception("error handling %s %s", request.method, request.target)
+                response = Response.error(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+            keep_alive = request.keep_alive
+            writer.write(
+                encode_response(response, keep_alive=keep_alive, head_only=request.method == "HEAD")
+            )
+            logger.debug("%s %s -> %d", request.method, request.target, response.status)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return
+            if not keep_alive:
+                return
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter) -> None:
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def create_server(
+    root: Path = DEFAULT_ROOT, *, vertical_cost: Optional[float] = None, **options
+) -> CampusServer:
+    """Build a :class:`CampusServer` with the campus API routes registered.
+
+    ``vertical_cost`` overrides the cost of changing floor by stairs.
+    """
+    from . import api
+    from .routing import DEFAULT_VERTICAL_COST, RoutingEngine
+    from .search import SearchService
+    from .spatial import SpatialService
+
+    server = CampusServer(root, **options)
+    routing = RoutingEngine.load(
+        server.root,
+        vertical_cost=DEFAULT_VERTICAL_COST if vertical_cost is None else vertical_cost,
+    )
+    api.register(
+        server,
+        routing,
+        SpatialService.load(server.root),
+        SearchService.load(server.root),
+    )
+    return server
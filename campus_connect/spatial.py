@@ -0,0 +1,189 @@
+"""Nearest-node queries over each floor's searchable nodes.
+
+``findNearestNode()`` scans every node of the floor per zone click.
+:class:`KDTree` is a static 2-d tree stored implicitly in arrays: points are
+reordered so that every range's median sits at its midpoint, splitting on x
+and y alternately, so there are no node objects or child pointers. k-nearest
+and radius queries prune subtrees whose splitting plane is farther than the
+current bound.
+
+:class:`SpatialService` keeps a tree per floor, in the SVG frame the page
+draws in, and precomputes each zone's entry node: the searchable node
+nearest to the zone centroid, as ``setZoneAsDestination()`` picks it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .floors import FLOORS, Floor
+from .transform import load_display_nodes
+
+#: Leaves at most this size are scanned linearly.
+LEAF_SIZE = 8
+
+Predicate = Callable[[int], bool]
+
+
+class KDTree:
+    """Implicit 2-d tree over points numbered ``0..n-1``.
+
+    Query results are ``(distance, number)`` pairs; ties are broken by the
+    lower number, so with points numbered in file order the answer matches
+    a first-wins linear scan.
+    """
+
+    def __init__(self, xs: Sequence[float], ys: Sequence[float]) -> None:
+        self.order = array("l", range(len(xs)))
+        self.xs = array("d", xs)
+        self.ys = array("d", ys)
+        self._build(0, len(xs), 0)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _build(self, lo: int, hi: int, axis: int) -> None:
+        # Explicit stack: no recursion limit on degenerate inputs.
+        stack = [(lo, hi, axis)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            mid = (lo + hi) // 2
+            coord = self.xs if axis == 0 else self.ys
+            ordered = sorted(self.order[lo:hi], key=lambda point: (coord[point], point))
+            self.order[lo:hi] = array("l", ordered)
+            stack.append((lo, mid, 1 - axis))
+            stack.append((mid + 1, hi, 1 - axis))
+
+    def _search(
+        self, x: float, y: float, k: int, radius: float, predicate: Optional[Predicate]
+    ) -> List[Tuple[float, int]]:
+        order, xs, ys = self.order, self.xs, self.ys
+        limit = radius * radius
+        # Max-heap of the best k as (-d2, -number), so the worst is on top.
+        best: List[Tuple[float, int]] = []
+
+        def consider(point: int) -> None:
+            d2 = (xs[point] - x) ** 2 + (ys[point] - y) ** 2
+            if d2 > limit or (predicate is not None and not predicate(point)):
+                return
+            entry = (-d2, -point)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        # (lo, hi, axis, squared distance from the query to the range's side
+        # of the parent plane); a range is skipped once that exceeds the bound.
+        stack = [(0, len(order), 0, 0.0)]
+        while stack:
+            lo, hi, axis, gap = stack.pop()
+            if gap > (-best[0][0] if len(best) == k else limit):
+                continue
+            if hi - lo <= LEAF_SIZE:
+                for i in range(lo, hi):
+                    consider(order[i])
+                continue
+            mid = (lo + hi) // 2
+            point = order[mid]
+            consider(point)
+            delta = (x - xs[point]) if axis == 0 else (y - ys[point])
+            below, above = (lo, mid, 1 - axis), (mid + 1, hi, 1 - axis)
+            near, far = (below, above) if delta < 0 else (above, below)
+            # Far side first so the near side is searched first and tightens the bound.
+            stack.append((*far, delta * delta))
+            stack.append((*near, 0.0))
+        return sorted((math.sqrt(-d2), -number) for d2, number in best)
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int = 1,
+        *,
+        radius: float = math.inf,
+        predicate: Optional[Predicate] = None,
+    ) -> List[Tuple[float, int]]:
+        """Up to ``k`` closest points within ``radius``, nearest first."""
+        if k <= 0 or not len(self):
+            return []
+        return self._search(x, y, k, radius, predicate)
+
+    def within(
+        self, x: float, y: float, radius: float, *, predicate: Optional[Predicate] = None
+    ) -> List[Tuple[float, int]]:
+        """All points within ``radius``, nearest first."""
+        return self.nearest(x, y, len(self), radius=radius, predicate=predicate)
+
+
+@dataclass
+class FloorNodes:
+    """A floor's searchable nodes (first entry per id, in file order) and their tree."""
+
+    floor: Floor
+    nodes: List[Mapping[str, Any]]
+    tree: KDTree
+
+    @classmethod
+    def build(cls, floor: Floor, nodes: Iterable[Mapping[str, Any]]) -> "FloorNodes":
+        searchable, seen = [], set()
+        for node in nodes:
+            if node.get("searchable") and node["id"] not in seen:
+                seen.add(node["id"])
+                searchable.append(node)
+        tree = KDTree([float(n["x"]) for n in searchable], [float(n["y"]) for n in searchable])
+        return cls(floor, searchable, tree)
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int = 1,
+        *,
+        radius: float = math.inf,
+        types: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[float, Mapping[str, Any]]]:
+        """Up to ``k`` ``(distance, node)`` pairs, optionally of the given ``types``."""
+        predicate = None
+        if types is not None:
+            wanted = frozenset(types)
+            nodes = self.nodes
+            predicate = lambda number: nodes[number].get("type") in wanted  # noqa: E731
+        found = self.tree.nearest(x, y, k, radius=radius, predicate=predicate)
+        return [(distance, self.nodes[number]) for distance, number in found]
+
+    def zone_entries(self, zones: Iterable[Mapping[str, Any]]) -> Dict[str, str]:
+        """Zone id to the id of the searchable node nearest its centroid."""
+        entries = {}
+        for zone in zones:
+            if "centroid_x" not in zone:
+                continue
+            found = self.nearest(float(zone["centroid_x"]), float(zone["centroid_y"]))
+            if found:
+                entries[zone["id"]] = found[0][1]["id"]
+        return entries
+
+
+class SpatialService:
+    """Per-floor nearest-node trees, in the SVG frame."""
+
+    def __init__(self, floors: Dict[str, FloorNodes]) -> None:
+        self.floors = floors
+
+    @classmethod
+    def load(cls, root: Path) -> "SpatialService":
+        floors = {}
+        for floor in FLOORS:
+            nodes, _ = load_display_nodes(root, floor)
+            floors[floor.id] = FloorNodes.build(floor, nodes)
+        return cls(floors)
+
+    def floor(self, floor_id: str) -> Optional[FloorNodes]:
+        return self.floors.get(floor_id)
+
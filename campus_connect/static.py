@@ -0,0 +1,258 @@
+"""In-memory table of the static files that make up the campus map."""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import mimetypes
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+from .assets import (
+    FINGERPRINT_PATTERNS,
+    IMMUTABLE,
+    MANIFEST_FILE,
+    content_hash,
+    encode_manifest,
+    hashed_name,
+)
+from .protocol import Response
+
+logger = logging.getLogger(__name__)
+
+#: Page served for ``/``.
+INDEX_FILE = "campus-connect-merged.html"
+
+#: Glob patterns, relative to the root, of everything the browser may request.
+STATIC_PATTERNS = (
+    INDEX_FILE,
+    "floors/*.svg",
+    "data/*.json",
+    "assets/*",
+)
+
+#: Precompressed sibling suffixes, in server preference order.
+COMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_SIBLING_SUFFIXES = frozenset(COMPRESSED_SUFFIXES.values())
+
+#: Cache policy for URLs whose content may change: always revalidate.
+REVALIDATE = "no-cache"
+
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+}
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    url: str
+    path: Optional[Path]
+    body: bytes
+    content_type: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    digest: str = ""
+    cache_control: str = REVALIDATE
+    #: Further headers sent with every response, such as ``Link`` hints.
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+def content_type_for(path: Path) -> str:
+    known = _CONTENT_TYPES.get(path.suffix.lower())
+    if known:
+        return known
+    guessed, _ = mimetypes.guess_type(path.name)
+    return guessed or "application/octet-stream"
+
+
+def iter_static_paths(root: Path) -> Iterator[Path]:
+    """Yield every file under ``root`` matched by :data:`STATIC_PATTERNS`."""
+    for pattern in STATIC_PATTERNS:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file() and path.suffix not in _SIBLING_SUFFIXES:
+                yield path
+
+
+def load_variants(path: Path) -> Dict[str, bytes]:
+    """Read the precompressed siblings of ``path`` that are not older than it."""
+    mtime = path.stat().st_mtime
+    variants = {}
+    for encoding, suffix in COMPRESSED_SUFFIXES.items():
+        sibling = path.with_name(path.name + suffix)
+        if sibling.is_file() and sibling.stat().st_mtime >= mtime:
+            variants[encoding] = sibling.read_bytes()
+    return variants
+
+
+@lru_cache(maxsize=256)
+def preferred_encodings(accept_encoding: str) -> Tuple[str, ...]:
+    """Content codings acceptable per ``Accept-Encoding``, best first.
+
+    Ties are broken by :data:`COMPRESSED_SUFFIXES` order. Results are cached
+    since browsers send only a handful of distinct header values.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+    wildcard = weights.get("*", 0.0)
+    ranked = [
+        (weights.get(coding, wildcard), -order, coding)
+        for order, coding in enumerate(COMPRESSED_SUFFIXES)
+    ]
+    return tuple(coding for q, _, coding in sorted(ranked, reverse=True) if q > 0)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class StaticFiles:
+    """Serves the page, floor plans, data files and icons from memory.
+
+    Everything is read once at start-up; the whole set is a couple of
+    megabytes, so serving from memory avoids a disk read per request.
+    Files matched by :data:`~campus_connect.assets.FINGERPRINT_PATTERNS` are
+    also published under the content-hashed URLs listed in
+    ``/asset-manifest.json``.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.files: Dict[str, StaticFile] = {}
+        self.manifest: Dict[str, str] = {}
+
+    def load(self) -> None:
+        self.files = {}
+        self.manifest = {}
+        fingerprinted = {
+            path for pattern in FINGERPRINT_PATTERNS for path in self.root.glob(pattern)
+        }
+        for path in iter_static_paths(self.root):
+            self.add(
+                path.relative_to(self.root).as_posix(),
+                path.read_bytes(),
+                content_type_for(path),
+                load_variants(path),
+                path=path,
+                fingerprint=path in fingerprinted,
+            )
+        if "/" + INDEX_FILE in self.files:
+            self.files["/"] = self.files["/" + INDEX_FILE]
+        compressed = sum(1 for entry in self.files.values() if entry.variants)
+        logger.info(
+            "loaded %d static urls (%d precompressed, %d fingerprinted) from %s",
+            len(self.files),
+            compressed,
+            len(self.manifest),
+            self.root,
+        )
+
+    def add(
+        self,
+        logical: str,
+        body: bytes,
+        content_type: str,
+        variants: Optional[Dict[str, bytes]] = None,
+        *,
+        path: Optional[Path] = None,
+        fingerprint: bool = False,
+        cache_control: str = REVALIDATE,
+    ) -> StaticFile:
+        """Publish ``body`` at ``/<logical>``.
+
+        With ``fingerprint`` the body is also published under its
+        content-hashed URL and listed in the asset manifest.
+        """
+        entry = StaticFile(
+            "/" + logical,
+            path,
+            body,
+            content_type,
+            variants or {},
+            content_hash(body),
+            cache_control,
+        )
+        self.files[entry.url] = entry
+        if fingerprint:
+            self.manifest[logical] = hashed_name(logical, entry.digest)
+            alias = dataclasses.replace(
+                entry, url="/" + self.manifest[logical], cache_control=IMMUTABLE
+            )
+            self.files[alias.url] = alias
+            self._publish_manifest()
+        return entry
+
+    def set_headers(self, logical: str, headers: Mapping[str, str]) -> None:
+        """Send ``headers`` with ``/<logical>`` and its content-hashed URL."""
+        urls = ["/" + logical]
+        if logical in self.manifest:
+            urls.append("/" + self.manifest[logical])
+        for url in urls:
+            self.files[url] = dataclasses.replace(self.files[url], headers=dict(headers))
+
+    def _publish_manifest(self) -> None:
+        body = encode_manifest(self.manifest)
+        url = "/" + MANIFEST_FILE
+        self.files[url] = StaticFile(url, None, body, "application/json", digest=content_hash(body))
+
+    def lookup(self, url: str) -> Optional[StaticFile]:
+        return self.files.get(url)
+
+    def respond(self, url: str, headers: Mapping[str, str]) -> Optional[Response]:
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        return file_response(entry, headers)
+
+
+def file_response(entry: StaticFile, headers: Mapping[str, str]) -> Response:
+    """Answer with the best precompressed variant the client accepts.
+
+    Each encoding gets its own strong ETag, and a matching ``If-None-Match``
+    yields ``304 Not Modified``.
+    """
+    body, etag = entry.body, entry.etag
+    reply_headers = {
+        "Content-Type": entry.content_type,
+        "Cache-Control": entry.cache_control,
+        **entry.headers,
+    }
+    if entry.variants:
+        reply_headers["Vary"] = "Accept-Encoding"
+        for encoding in preferred_encodings(headers.get("accept-encoding", "")):
+            if encoding in entry.variants:
+                reply_headers["Content-Encoding"] = encoding
+                body = entry.variants[encoding]
+                etag = f'"{entry.digest}-{encoding}"'
+                break
+    reply_headers["ETag"] = etag
+    if etag_matches(headers.get("if-none-match", ""), etag):
+        return Response(HTTPStatus.NOT_MODIFIED.value, b"", reply_headers)
+    return Response(200, body, reply_headers)
@@ -0,0 +1,411 @@
+"""Reading and writing SVG path data and transforms.
+
+Path data is parsed into absolute segments, ``(command, numbers)`` pairs with
+an upper-case command (``M L H V C S Q T A Z``) and its coordinates in user
+space; relative commands and implicit repetitions are resolved. A segment
+list can be written back with :func:`format_path`, the shortest form this
+module knows: each segment relative or absolute, whichever is shorter, with
+repeated commands and redundant separators left out.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+Segment = Tuple[str, Tuple[float, ...]]
+Point = Tuple[float, float]
+BBox = Tuple[float, float, float, float]
+#: Affine ``(a, b, c, d, e, f)``: ``x' = a x + c y + e``, ``y' = b x + d y + f``.
+Matrix = Tuple[float, float, float, float, float, float]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+#: Numbers taken by each command.
+ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_SEPARATORS = re.compile(r"[\s,]*")
+_COMMAND = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]")
+
+
+def local_name(tag: str) -> str:
+    """``{http://www.w3.org/2000/svg}path`` -> ``path``."""
+    return tag.rpartition("}")[2]
+
+
+class PathError(ValueError):
+    """Malformed path data."""
+
+
+def _tokens(data: str) -> Iterator[Tuple[str, List[float]]]:
+    """``(command, numbers)`` as written, one per command letter."""
+    at = _SEPARATORS.match(data).end()
+    while at < len(data):
+        command = _COMMAND.match(data, at)
+        if command is None:
+            raise PathError(f"expected a command at {at} in {data[:40]!r}")
+        letter = command.group()
+        at = _SEPARATORS.match(data, command.end()).end()
+        numbers: List[float] = []
+        index = 0
+        while at < len(data) and not _COMMAND.match(data, at):
+            # Arc flags are single digits and may be written without separators.
+            if letter in "Aa" and index % 7 in (3, 4) and data[at] in "01":
+                numbers.append(float(data[at]))
+                at += 1
+            else:
+                number = _NUMBER.match(data, at)
+                if number is None:
+                    raise PathError(f"bad number at {at} in {data[:40]!r}")
+                numbers.append(float(number.group()))
+                at = number.end()
+            index += 1
+            at = _SEPARATORS.match(data, at).end()
+        yield letter, numbers
+
+
+def parse_path(data: str) -> List[Segment]:
+    """Absolute segments of the path data ``data``."""
+    segments: List[Segment] = []
+    x = y = start_x = start_y = 0.0
+    for letter, numbers in _tokens(data):
+        command = letter.upper()
+        relative = letter != command
+        arity = ARITY[command]
+        if arity == 0:
+            if numbers:
+                raise PathError("Z takes no numbers")
+            segments.append(("Z", ()))
+            x, y = start_x, start_y
+            continue
+        if not numbers or len(numbers) % arity:
+            raise PathError(f"{letter} needs a multiple of {arity} numbers")
+        for group in range(0, len(numbers), arity):
+            args = numbers[group : group + arity]
+            if command == "H":
+                absolute = (args[0] + x if relative else args[0],)
+                x = absolute[0]
+            elif command == "V":
+                absolute = (args[0] + y if relative else args[0],)
+                y = absolute[0]
+            elif command == "A":
+                end_x = args[5] + x if relative else args[5]
+                end_y = args[6] + y if relative else args[6]
+                absolute = (*args[:5], end_x, end_y)
+                x, y = end_x, end_y
+            else:
+                absolute = tuple(
+                    value + (x if i % 2 == 0 else y) if relative else value
+                    for i, value in enumerate(args)
+                )
+                x, y = absolute[-2], absolute[-1]
+            # Pairs after a moveto are implicit linetos.
+            segments.append(("L" if command == "M" and group else command, absolute))
+            if command == "M" and not group:
+                start_x, start_y = x, y
+    return segments
+
+
+def end_points(segments: Sequence[Segment]) -> Iterator[Tuple[Point, Point]]:
+    """``(current point before, current point after)`` of each segment."""
+    x = y = start_x = start_y = 0.0
+    for command, args in segments:
+        before = (x, y)
+        if command == "Z":
+            x, y = start_x, start_y
+        elif command == "H":
+            x = args[0]
+        elif command == "V":
+            y = args[0]
+        else:
+            x, y = args[-2], args[-1]
+            if command == "M":
+                start_x, start_y = x, y
+        yield before, (x, y)
+
+
+def subpaths(segments: Sequence[Segment]) -> List[List[Segment]]:
+    """``segments`` split before every ``M``."""
+    pieces: List[List[Segment]] = []
+    for segment in segments:
+        if segment[0] == "M" or not pieces:
+            pieces.append([])
+        pieces[-1].append(segment)
+    return pieces
+
+
+def path_bbox(segments: Sequence[Segment]) -> Optional[BBox]:
+    """Box containing the path (control points included), or ``None`` if empty."""
+    xs: List[float] = []
+    ys: List[float] = []
+    for (command, args), (before, after) in zip(segments, end_points(segments)):
+        if command == "A":
+            # The arc stays within one ellipse diameter of its start.
+            reach = 2 * max(abs(args[0]), abs(args[1]), math.dist(before, after) / 2)
+            xs += [before[0] - reach, before[0] + reach]
+            ys += [before[1] - reach, before[1] + reach]
+        elif command in "CSQT":
+            xs += args[0::2]
+            ys += args[1::2]
+        xs.append(after[0])
+        ys.append(after[1])
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _bezier(points: Sequence[Point], t: float) -> Point:
+    while len(points) > 1:
+        points = [
+            (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+            for a, b in zip(points, points[1:])
+        ]
+    return points[0]
+
+
+def sample_path(segments: Sequence[Segment], steps: int = 4, *, lines: bool = True) -> List[Point]:
+    """Points along the path: every segment at ``steps`` even parameter steps.
+
+    Smooth curves (``S``, ``T``) reflect the previous control point; arcs are
+    sampled at their end points only, and so are straight segments unless
+    ``lines`` is true.
+    """
+    found: List[Point] = []
+    control: Optional[Point] = None
+    previous = ""
+    for (command, args), (before, after) in zip(segments, end_points(segments)):
+        if command in "CS":
+            first = (
+                (2 * before[0] - control[0], 2 * before[1] - control[1])
+                if command == "S" and control is not None and previous in "CS"
+                else before
+            )
+            controls = [first] if command == "S" else [(args[0], args[1])]
+            controls.append((args[-4], args[-3]))
+            curve = [before, *controls, after]
+            control = controls[-1]
+        elif command in "QT":
+            if command == "T":
+                reflected = control is not None and previous in "QT"
+                control = (
+                    (2 * before[0] - control[0], 2 * before[1] - control[1])
+                    if reflected
+                    else before
+                )
+            else:
+                control = (args[0], args[1])
+            curve = [before, control, after]
+        else:
+            curve = [before, after]
+            control = None
+        previous = command
+        if command == "M":
+            found.append(after)
+            continue
+        if command == "A" or (not lines and command in "LHVZ"):
+            found += [before, after]
+            continue
+        found += [_bezier(curve, step / steps) for step in range(steps + 1)]
+    return found
+
+
+def _format_number(value: int, precision: int) -> str:
+    """Fixed-point ``value`` (units of ``10**-precision``), shortest form."""
+    sign = "-" if value < 0 else ""
+    digits = str(abs(value)).rjust(precision + 1, "0")
+    whole, fraction = digits[: len(digits) - precision], digits[len(digits) - precision :]
+    fraction = fraction.rstrip("0")
+    if not fraction:
+        return sign + whole
+    return f"{sign}{'' if whole == '0' else whole}.{fraction}"
+
+
+class _PathWriter:
+    """Path data with the fewest separators: none after a command letter,
+    before a ``-``, or before a ``.`` following a number that has one."""
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.letter = ""
+        self.number = ""
+
+    def command(self, letter: str) -> None:
+        self.parts.append(letter)
+        self.letter, self.number = letter, ""
+
+    def numbers(self, numbers: Sequence[str]) -> None:
+        for number in numbers:
+            self.parts.append(_separator(self.number, number) + number)
+            self.number = number
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _separator(previous: str, number: str) -> str:
+    if not previous or number.startswith("-"):
+        return ""
+    if number.startswith(".") and "." in previous:
+        return ""
+    return " "
+
+
+def _length(numbers: Sequence[str]) -> int:
+    return sum(len(_separator(a, b)) + len(b) for a, b in zip(["", *numbers], numbers))
+
+
+def format_path(segments: Sequence[Segment], precision: int = 1) -> str:
+    """Shortest path data for ``segments``, coordinates rounded to ``precision`` decimals.
+
+    Coordinates are rounded to a fixed-point grid before relative offsets are
+    taken, so rounding errors never accumulate along a path. Linetos along an
+    axis become ``H``/``V``.
+    """
+    scale = 10**precision
+    writer = _PathWriter()
+    x = y = start_x = start_y = 0
+    for command, args in segments:
+        if command == "Z":
+            if writer.letter != "z":
+                writer.command("z")
+            x, y = start_x, start_y
+            continue
+        if command == "H":
+            values = [round(args[0] * scale), y]
+        elif command == "V":
+            values = [x, round(args[0] * scale)]
+        else:
+            values = [round(value * scale) for value in args]
+        if command == "A":
+            # Flags are not coordinates.
+            values[3], values[4] = int(args[3]), int(args[4])
+        if command in "HV":
+            command = "L"
+        end_x, end_y = values[-2], values[-1]
+        if command == "L" and end_x == x and end_y != y:
+            command, values = "V", [end_y]
+        elif command == "L" and end_y == y and end_x != x:
+            command, values = "H", [end_x]
+
+        absolute = _numbers(command, values, 0, 0, precision)
+        relative = _numbers(command, values, x, y, precision)
+        letter, numbers = command, absolute
+        if _length(relative) <= _length(absolute):
+            letter, numbers = command.lower(), relative
+        # A repeated command letter may be left out, except for a moveto
+        # (whose repetitions are linetos).
+        if letter != writer.letter or letter in "Mm":
+            writer.command(letter)
+        writer.numbers(numbers)
+
+        if command == "H":
+            x = end_x
+        elif command == "V":
+            y = end_y
+        else:
+            x, y = end_x, end_y
+        if command == "M":
+            start_x, start_y = x, y
+    return writer.text()
+
+
+def _numbers(command: str, values: Sequence[int], x: int, y: int, precision: int) -> List[str]:
+    if command == "H":
+        offsets = [x]
+    elif command == "V":
+        offsets = [y]
+    elif command == "A":
+        offsets = [0, 0, 0, 0, 0, x, y]
+    else:
+        offsets = [x, y] * (len(values) // 2)
+    numbers = []
+    for i, (value, offset) in enumerate(zip(values, offsets)):
+        if command == "A" and i in (3, 4):
+            numbers.append(str(value))
+        else:
+            numbers.append(_format_number(value - offset, precision))
+    return numbers
+
+
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+
+def multiply(m: Matrix, n: Matrix) -> Matrix:
+    """``m`` applied after ``n``."""
+    a, b, c, d, e, f = m
+    p, q, r, s, t, u = n
+    return (
+        a * p + c * q,
+        b * p + d * q,
+        a * r + c * s,
+        b * r + d * s,
+        a * t + c * u + e,
+        b * t + d * u + f,
+    )
+
+
+def invert(m: Matrix) -> Matrix:
+    """The matrix undoing ``m``; raises ``ValueError`` if ``m`` is singular."""
+    a, b, c, d, e, f = m
+    det = a * d - b * c
+    if det == 0:
+        raise ValueError(f"singular matrix {m!r}")
+    return (d / det, -b / det, -c / det, a / det, (c * f - d * e) / det, (b * e - a * f) / det)
+
+
+def parse_transform(text: Optional[str]) -> Matrix:
+    """Matrix of an SVG ``transform`` attribute (identity for ``None``)."""
+    matrix = IDENTITY
+    if not text:
+        return matrix
+    for name, raw in _TRANSFORM.findall(text):
+        values = [float(v) for v in _NUMBER.findall(raw)]
+        if name == "matrix":
+            step = tuple(values)
+        elif name == "translate":
+            step = (1, 0, 0, 1, values[0], values[1] if len(values) > 1 else 0)
+        elif name == "scale":
+            sy = values[1] if len(values) > 1 else values[0]
+            step = (values[0], 0, 0, sy, 0, 0)
+        elif name == "rotate":
+            angle = math.radians(values[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0, 0)
+            if len(values) == 3:
+                cx, cy = values[1], values[2]
+                step = multiply((1, 0, 0, 1, cx, cy), multiply(step, (1, 0, 0, 1, -cx, -cy)))
+        elif name == "skewX":
+            step = (1, 0, math.tan(math.radians(values[0])), 1, 0, 0)
+        else:
+            step = (1, math.tan(math.radians(values[0])), 0, 1, 0, 0)
+        if len(step) != 6:
+            raise ValueError(f"bad transform {text!r}")
+        matrix = multiply(matrix, step)  # type: ignore[arg-type]
+    return matrix
+
+
+def transform_point(matrix: Matrix, point: Point) -> Point:
+    a, b, c, d, e, f = matrix
+    x, y = point
+    return a * x + c * y + e, b * x + d * y + f
+
+
+def transform_bbox(matrix: Matrix, box: BBox) -> BBox:
+    """Box containing ``box`` mapped through ``matrix``."""
+    corners = [(box[0], box[1]), (box[2], box[1]), (box[0], box[3]), (box[2], box[3])]
+    xs, ys = zip(*(transform_point(matrix, corner) for corner in corners))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def intersect(a: BBox, b: BBox) -> Optional[BBox]:
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    return box if box[0] <= box[2] and box[1] <= box[3] else None
+
+
+def grow(box: BBox, by: float) -> BBox:
+    return box[0] - by, box[1] - by, box[2] + by, box[3] + by
@@ -0,0 +1,703 @@
+"""Build step writing optimized floor plans.
+
+The page injects a floor's whole SVG with ``container.innerHTML``, so every
+element and every digit of path data costs parse and layout time on phones.
+:func:`optimize` rewrites a plan without changing what it draws:
+
+* path data is parsed and written back in its shortest form, coordinates
+  rounded to :data:`PRECISION` decimals (:func:`.svg.format_path`), and
+  shape coordinates are rounded the same way;
+* consecutive sibling paths of the same style become one path, unless they
+  are painted with a fill and overlap (merging could change their winding
+  or paint order); this saves elements, not path commands;
+* shapes that paint nothing (no fill and no stroke, zero opacity, hidden)
+  and shapes entirely outside the viewport or their clip or mask region
+  are dropped, then groups left empty;
+* presentation attributes equal to the inherited value, stroke attributes
+  of unstroked shapes, editor metadata and whitespace are dropped.
+
+Definitions (``defs``, clip paths, masks, patterns) are copied unchanged.
+Output is deterministic: the same input always gives the same bytes.
+
+:func:`verify` is the gate on every build: it samples the visible geometry
+of both documents, grouped by computed paint style, and fails if any sample
+of one lies farther than the rounding tolerance from the other.
+:func:`check_floors` runs it on every plan without writing anything, for
+``python -m campus_connect check-svg``.
+
+Optimized plans are written to ``build/floors/`` with a JSON report; floor
+bundles embed them in place of the originals while they are up to date.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .assets import BUILD_DIR
+from .floors import FLOORS, Floor
+from .report import table
+from .svg import (
+    IDENTITY,
+    SVG_NS,
+    XLINK_NS,
+    BBox,
+    Matrix,
+    Point,
+    Segment,
+    format_path,
+    grow,
+    intersect,
+    local_name,
+    multiply,
+    parse_path,
+    parse_transform,
+    path_bbox,
+    sample_path,
+    transform_bbox,
+)
+
+#: Decimals kept in coordinates; user units are screen pixels at 1:1 zoom.
+PRECISION = 1
+
+#: Decimals kept in stroke widths.
+STYLE_DECIMALS = 3
+
+#: Directory, relative to the root, receiving optimized plans.
+OUTPUT_DIR = f"{BUILD_DIR}/floors"
+REPORT_FILE = "report.json"
+
+#: Inherited presentation attributes and their initial values.
+INHERITED = {
+    "fill": "black",
+    "fill-opacity": "1",
+    "fill-rule": "nonzero",
+    "stroke": "none",
+    "stroke-dasharray": "none",
+    "stroke-dashoffset": "0",
+    "stroke-linecap": "butt",
+    "stroke-linejoin": "miter",
+    "stroke-miterlimit": "4",
+    "stroke-opacity": "1",
+    "stroke-width": "1",
+    "visibility": "visible",
+}
+
+#: Attributes meaningless on a shape that has no stroke.
+STROKE_ATTRIBUTES = frozenset(name for name in INHERITED if name.startswith("stroke-"))
+
+#: Elements whose content is only drawn through a reference; left unchanged.
+DEFINITIONS = frozenset(
+    (
+        "defs",
+        "clipPath",
+        "filter",
+        "linearGradient",
+        "marker",
+        "mask",
+        "pattern",
+        "radialGradient",
+        "symbol",
+    )
+)
+
+#: Shapes this module reads the geometry of.
+SHAPES = frozenset(("path", "rect", "line"))
+
+#: Coordinate attributes rounded to :data:`PRECISION`.
+COORDINATES = {
+    "rect": ("x", "y", "width", "height", "rx", "ry"),
+    "line": ("x1", "y1", "x2", "y2"),
+}
+
+_XLINK = f"{{{XLINK_NS}}}"
+
+
+def attribute_number(value: Optional[str], default: float = 0.0) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value.strip().removesuffix("px"))
+    except ValueError:
+        return default
+
+
+def _round(value: float, decimals: int) -> str:
+    text = f"{value:.{decimals}f}".rstrip("0").rstrip(".")
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return "0" if text in ("", "-0", "-") else text
+
+
+def reference(value: Optional[str]) -> Optional[str]:
+    """``url(#clip0)`` -> ``clip0``."""
+    if value and value.startswith("url(#") and value.endswith(")"):
+        return value[5:-1]
+    return None
+
+
+def _paints(value: str) -> bool:
+    return value != "none"
+
+
+def _opaque(style: Mapping[str, str], element: ET.Element) -> bool:
+    return all(
+        attribute_number(value, 1.0) >= 1.0
+        for value in (
+            style["fill-opacity"],
+            style["stroke-opacity"],
+            element.get("opacity"),
+        )
+        if value is not None
+    )
+
+
+# --- geometry --------------------------------------------------------------
+
+
+def shape_segments(element: ET.Element) -> List[Segment]:
+    """Outline of a ``path``, ``rect`` or ``line`` as absolute path segments."""
+    name = local_name(element.tag)
+    if name == "path":
+        return parse_path(element.get("d", ""))
+    if name == "line":
+        return [
+            ("M", (attribute_number(element.get("x1")), attribute_number(element.get("y1")))),
+            ("L", (attribute_number(element.get("x2")), attribute_number(element.get("y2")))),
+        ]
+    x, y = attribute_number(element.get("x")), attribute_number(element.get("y"))
+    width, height = attribute_number(element.get("width")), attribute_number(element.get("height"))
+    if width <= 0 or height <= 0:
+        return []
+    # Rounded corners stay inside the box; sampling them as square is close enough.
+    return [
+        ("M", (x, y)),
+        ("H", (x + width,)),
+        ("V", (y + height,)),
+        ("H", (x,)),
+        ("Z", ()),
+    ]
+
+
+def paint_reach(style: Mapping[str, str]) -> float:
+    """How far paint may extend beyond a shape's outline."""
+    if not _paints(style["stroke"]):
+        return 0.0
+    # Square caps and miter joins reach past half the width; this bounds both.
+    width = attribute_number(style["stroke-width"], 1.0)
+    return width * max(1.0, attribute_number(style["stroke-miterlimit"], 4))
+
+
+class Document:
+    """Parsed plan with its ``id`` table."""
+
+    def __init__(self, text: str) -> None:
+        self.root = ET.fromstring(text)
+        self.ids = {element.get("id"): element for element in self.root.iter() if element.get("id")}
+
+    def viewport(self) -> Optional[BBox]:
+        view_box = self.root.get("viewBox")
+        if view_box:
+            x, y, width, height = (float(v) for v in view_box.replace(",", " ").split())
+            return x, y, x + width, y + height
+        if self.root.get("width") and self.root.get("height"):
+            width = attribute_number(self.root.get("width"))
+            return 0.0, 0.0, width, attribute_number(self.root.get("height"))
+        return None
+
+    def region(self, element: ET.Element, region: Optional[BBox]) -> Optional[BBox]:
+        """``region`` narrowed by the element's clip path and mask, where known.
+
+        A clip path made of shapes clips to (at most) their boxes; a mask with
+        ``maskUnits="userSpaceOnUse"`` to its ``x``/``y``/``width``/``height``.
+        Anything else leaves ``region`` as it is.
+        """
+        if region is None:
+            return None
+        clip = self.ids.get(reference(element.get("clip-path")))
+        if clip is not None and clip.get("clipPathUnits", "userSpaceOnUse") == "userSpaceOnUse":
+            boxes = []
+            for child in clip:
+                if local_name(child.tag) not in SHAPES:
+                    boxes = []
+                    break
+                box = path_bbox(shape_segments(child))
+                if box is not None:
+                    matrix = multiply(
+                        parse_transform(clip.get("transform")),
+                        parse_transform(child.get("transform")),
+                    )
+                    boxes.append(transform_bbox(matrix, box))
+            if boxes:
+                union = (
+                    min(b[0] for b in boxes),
+                    min(b[1] for b in boxes),
+                    max(b[2] for b in boxes),
+                    max(b[3] for b in boxes),
+                )
+                region = intersect(region, union) or (0.0, 0.0, -1.0, -1.0)
+        mask = self.ids.get(reference(element.get("mask")))
+        if mask is not None and mask.get("maskUnits") == "userSpaceOnUse":
+            x, y = attribute_number(mask.get("x")), attribute_number(mask.get("y"))
+            box = (
+                x,
+                y,
+                x + attribute_number(mask.get("width")),
+                y + attribute_number(mask.get("height")),
+            )
+            region = intersect(region, box) or (0.0, 0.0, -1.0, -1.0)
+        return region
+
+
+def _computed(style: Mapping[str, str], element: ET.Element) -> Dict[str, str]:
+    computed = dict(style)
+    for name in INHERITED:
+        value = element.get(name)
+        if value is not None and value != "inherit":
+            computed[name] = value
+    return computed
+
+
+@dataclass
+class Visit:
+    """An element of the rendered tree with its context."""
+
+    element: ET.Element
+    parent: Optional[ET.Element]
+    style: Dict[str, str]
+    inherited: Dict[str, str]
+    #: Visible region in the element's user space; ``None`` if unknown.
+    region: Optional[BBox]
+    matrix: Matrix
+
+
+def rendered(document: Document) -> Iterator[Visit]:
+    """Rendered elements in document order, definitions not descended into."""
+    stack = [
+        Visit(
+            document.root,
+            None,
+            _computed(INHERITED, document.root),
+            dict(INHERITED),
+            document.viewport(),
+            IDENTITY,
+        )
+    ]
+    while stack:
+        visit = stack.pop()
+        yield visit
+        element = visit.element
+        if local_name(element.tag) in DEFINITIONS or element.get("display") == "none":
+            continue
+        for child in reversed(list(element)):
+            region = visit.region
+            matrix = multiply(visit.matrix, parse_transform(child.get("transform")))
+            if child.get("transform"):
+                # Regions are kept in user space; a transform loses track of them.
+                region = None
+            region = document.region(child, region)
+            stack.append(
+                Visit(child, element, _computed(visit.style, child), visit.style, region, matrix)
+            )
+
+
+def _style_key(style: Mapping[str, str], element: ET.Element) -> Tuple[str, ...]:
+    stroked = _paints(style["stroke"])
+    return (
+        style["fill"],
+        style["fill-opacity"],
+        style["fill-rule"] if _paints(style["fill"]) else "",
+        style["stroke"],
+        *(
+            (
+                _round(attribute_number(style["stroke-width"], 1.0), STYLE_DECIMALS),
+                style["stroke-linecap"],
+                style["stroke-linejoin"],
+                style["stroke-opacity"],
+                style["stroke-dasharray"],
+            )
+            if stroked
+            else ()
+        ),
+        element.get("opacity", "1"),
+    )
+
+
+def invisible(style: Mapping[str, str], element: ET.Element) -> bool:
+    stroked = _paints(style["stroke"]) and attribute_number(style["stroke-width"], 1.0) > 0
+    return (
+        (not _paints(style["fill"]) and not stroked)
+        or style["visibility"] in ("hidden", "collapse")
+        or element.get("display") == "none"
+        or attribute_number(element.get("opacity"), 1.0) <= 0
+    )
+
+
+def _outside(segments: Sequence[Segment], style: Mapping[str, str], region: BBox) -> bool:
+    box = path_bbox(segments)
+    return box is None or intersect(grow(box, paint_reach(style)), region) is None
+
+
+# --- optimizer -------------------------------------------------------------
+
+
+@dataclass
+class Stats:
+    bytes: int
+    elements: int
+    commands: int
+
+
+def stats(text: str) -> Stats:
+    """Size, element count and path command count of an SVG document."""
+    root = ET.fromstring(text)
+    elements = sum(1 for _ in root.iter())
+    commands = sum(
+        len(parse_path(element.get("d", "")))
+        for element in root.iter()
+        if local_name(element.tag) == "path"
+    )
+    return Stats(len(text.encode("utf-8")), elements, commands)
+
+
+def optimize(text: str, precision: int = PRECISION) -> str:
+    """The optimized form of the SVG document ``text``."""
+    document = Document(text)
+    segments: Dict[int, List[Segment]] = {}
+    dropped = []
+    for visit in rendered(document):
+        element = visit.element
+        name = local_name(element.tag)
+        if visit.parent is None:
+            continue
+        if not element.tag.startswith(f"{{{SVG_NS}}}") or name == "metadata":
+            dropped.append(visit)
+            continue
+        if local_name(visit.parent.tag) in DEFINITIONS:
+            continue
+        if name in SHAPES:
+            outline = shape_segments(element)
+            if invisible(visit.style, element) or (
+                visit.region is not None and _outside(outline, visit.style, visit.region)
+            ):
+                dropped.append(visit)
+                continue
+            segments[id(element)] = outline
+            _round_shape(element, precision)
+        if name not in DEFINITIONS and element.get("style") is None:
+            _drop_redundant(element, visit.style, visit.inherited)
+    for visit in dropped:
+        visit.parent.remove(visit.element)
+
+    _drop_empty_groups(document.root)
+    for visit in list(rendered(document)):
+        element = visit.element
+        if local_name(element.tag) in DEFINITIONS or len(element) < 2:
+            continue
+        _merge_paths(element, segments, visit.style)
+    for element in document.root.iter():
+        outline = segments.get(id(element))
+        if outline is not None and local_name(element.tag) == "path":
+            element.set("d", format_path(outline, precision))
+    return serialize(document.root)
+
+
+def _round_shape(element: ET.Element, precision: int) -> None:
+    for attribute in COORDINATES.get(local_name(element.tag), ()):
+        if element.get(attribute) is not None:
+            element.set(attribute, _round(attribute_number(element.get(attribute)), precision))
+    if element.get("stroke-width") is not None:
+        width = attribute_number(element.get("stroke-width"), 1.0)
+        element.set("stroke-width", _round(width, STYLE_DECIMALS))
+
+
+def _drop_redundant(
+    element: ET.Element, style: Mapping[str, str], inherited: Mapping[str, str]
+) -> None:
+    shape = local_name(element.tag) in SHAPES
+    for name in list(element.attrib):
+        if name.startswith(_XLINK) or "}" in name:
+            if not name.startswith(_XLINK):
+                del element.attrib[name]
+            continue
+        value = element.get(name)
+        if name in INHERITED and value == inherited[name]:
+            del element.attrib[name]
+        elif shape and name in STROKE_ATTRIBUTES and not _paints(style["stroke"]):
+            del element.attrib[name]
+        elif shape and name in ("fill-rule", "fill-opacity") and not _paints(style["fill"]):
+            del element.attrib[name]
+
+
+def _drop_empty_groups(root: ET.Element) -> None:
+    changed = True
+    while changed:
+        changed = False
+        for parent in root.iter():
+            for child in list(parent):
+                if (
+                    local_name(child.tag) == "g"
+                    and len(child) == 0
+                    and not (child.text or "").strip()
+                    and child.get("id") is None
+                ):
+                    parent.remove(child)
+                    changed = True
+
+
+#: Attributes that make a path unsafe to merge: references, per-element
+#: compositing, and markers (drawn per path, not per subpath).
+_UNMERGEABLE = (
+    "id",
+    "class",
+    "style",
+    "transform",
+    "opacity",
+    "marker",
+    "marker-start",
+    "marker-mid",
+    "marker-end",
+)
+
+
+def _mergeable(element: ET.Element) -> bool:
+    return local_name(element.tag) == "path" and not any(
+        name in element.attrib for name in _UNMERGEABLE
+    )
+
+
+def _merge_paths(
+    parent: ET.Element, segments: Dict[int, List[Segment]], style: Mapping[str, str]
+) -> None:
+    """Merge runs of consecutive same-style paths of ``parent``."""
+    children = list(parent)
+    run: List[ET.Element] = []
+    boxes: List[BBox] = []
+
+    def flush() -> None:
+        if len(run) > 1:
+            head = run[0]
+            for other in run[1:]:
+                segments[id(head)] = segments[id(head)] + segments.pop(id(other))
+                parent.remove(other)
+        run.clear()
+        boxes.clear()
+
+    for child in children:
+        outline = segments.get(id(child))
+        if outline is None or not _mergeable(child):
+            flush()
+            continue
+        computed = _computed(style, child)
+        filled = _paints(computed["fill"])
+        box = path_bbox(outline)
+        if box is None or not _opaque(computed, child):
+            flush()
+            continue
+        box = grow(box, paint_reach(computed))
+        if run and (
+            dict(child.attrib, d="") != dict(run[0].attrib, d="")
+            or (filled and any(intersect(box, other) for other in boxes))
+        ):
+            flush()
+        run.append(child)
+        boxes.append(box)
+    flush()
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    )
+
+
+def _qualified(name: str) -> str:
+    if name.startswith(_XLINK):
+        return "xlink:" + name[len(_XLINK):]
+    return local_name(name)
+
+
+def serialize(root: ET.Element) -> str:
+    """Compact markup: SVG namespace unprefixed, whitespace between elements dropped."""
+    uses_xlink = any(name.startswith(_XLINK) for element in root.iter() for name in element.attrib)
+    parts: List[str] = []
+
+    def write(element: ET.Element, top: bool) -> None:
+        attributes = [(_qualified(name), value) for name, value in element.attrib.items()]
+        if top:
+            attributes.insert(0, ("xmlns", SVG_NS))
+            if uses_xlink:
+                attributes.insert(1, ("xmlns:xlink", XLINK_NS))
+        parts.append("<" + local_name(element.tag))
+        parts.extend(f' {name}="{_escape(value)}"' for name, value in attributes)
+        text = element.text if element.text and element.text.strip() else ""
+        if not len(element) and not text:
+            parts.append("/>")
+        else:
+            parts.append(">" + _escape(text))
+            for child in element:
+                write(child, False)
+                if child.tail and child.tail.strip():
+                    parts.append(_escape(child.tail))
+            parts.append(f"</{local_name(element.tag)}>")
+
+    write(root, True)
+    return "".join(parts) + "\n"
+
+
+# --- verification ------------------------------------------------------------
+
+
+def _samples(text: str) -> Tuple[Dict[Tuple[str, ...], List[Point]], List[str]]:
+    """Visible sample points by paint style, and the other rendered elements."""
+    document = Document(text)
+    points: Dict[Tuple[str, ...], List[Point]] = {}
+    others: List[str] = []
+    for visit in rendered(document):
+        element = visit.element
+        name = local_name(element.tag)
+        if visit.parent is None or local_name(visit.parent.tag) in DEFINITIONS:
+            continue
+        if name in DEFINITIONS:
+            others.append(serialize(element))
+            continue
+        if name not in SHAPES:
+            if name not in ("g", "svg"):
+                others.append(serialize(element))
+            continue
+        if invisible(visit.style, element):
+            continue
+        region = visit.region
+        if region is not None:
+            region = grow(region, paint_reach(visit.style))
+        a, b, c, d, e, f = visit.matrix
+        found = points.setdefault(_style_key(visit.style, element), [])
+        for x, y in sample_path(shape_segments(element)):
+            if region is None or (region[0] <= x <= region[2] and region[1] <= y <= region[3]):
+                found.append((a * x + c * y + e, b * x + d * y + f))
+    return points, others
+
+
+def _uncovered(points: Sequence[Point], near: Sequence[Point], tolerance: float) -> int:
+    """How many of ``points`` have no point of ``near`` within ``tolerance``."""
+    cells: Dict[Tuple[int, int], List[Point]] = {}
+    for x, y in near:
+        cells.setdefault((math.floor(x / tolerance), math.floor(y / tolerance)), []).append((x, y))
+    missing = 0
+    for x, y in points:
+        cx, cy = math.floor(x / tolerance), math.floor(y / tolerance)
+        if not any(
+            math.dist((x, y), other) <= tolerance
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            for other in cells.get((cx + dx, cy + dy), ())
+        ):
+            missing += 1
+    return missing
+
+
+def verify(original: str, optimized: str, precision: int = PRECISION) -> List[str]:
+    """Differences between what two documents draw; empty when equivalent.
+
+    Rounding moves a coordinate by at most half a unit of the last kept
+    decimal, so every visible sample must have a counterpart within
+    ``10 ** -precision``. Definitions and non-shape elements must match.
+    """
+    tolerance = 10.0**-precision
+    before, before_others = _samples(original)
+    after, after_others = _samples(optimized)
+    problems = []
+    for key in sorted(set(before) | set(after)):
+        lost = _uncovered(before.get(key, []), after.get(key, []), tolerance)
+        added = _uncovered(after.get(key, []), before.get(key, []), tolerance)
+        if lost or added:
+            problems.append(f"style {'/'.join(key)}: {lost} points lost, {added} added")
+    if sorted(before_others) != sorted(after_others):
+        problems.append("definitions or non-shape elements differ")
+    return problems
+
+
+# --- build stage -------------------------------------------------------------
+
+
+def optimized_path(root: Path, floor: Floor) -> Path:
+    return root / OUTPUT_DIR / Path(floor.svg).name
+
+
+def floor_svg(root: Path, floor: Floor) -> str:
+    """The floor's optimized plan if it is up to date, else the original."""
+    source = root / floor.svg
+    built = optimized_path(root, floor)
+    if built.is_file() and built.stat().st_mtime >= source.stat().st_mtime:
+        return built.read_text(encoding="utf-8")
+    return source.read_text(encoding="utf-8")
+
+
+@dataclass
+class Result:
+    floor: str
+    before: Stats
+    after: Stats
+
+
+class VerificationError(RuntimeError):
+    """An optimized plan does not draw the same as its original."""
+
+
+def _optimize_floor(root: Path, floor: Floor, precision: int) -> Tuple[str, Result]:
+    original = (root / floor.svg).read_text(encoding="utf-8")
+    optimized = optimize(original, precision)
+    problems = verify(original, optimized, precision)
+    if problems:
+        raise VerificationError(f"{floor.svg}: " + "; ".join(problems))
+    return optimized, Result(floor.id, stats(original), stats(optimized))
+
+
+def check_floors(root: Path, precision: int = PRECISION) -> List[Result]:
+    """Optimize and verify every floor plan in memory, writing nothing."""
+    return [_optimize_floor(root, floor, precision)[1] for floor in FLOORS]
+
+
+def optimize_floors(root: Path, precision: int = PRECISION) -> List[Result]:
+    """Optimize and verify every floor plan, writing them and a report."""
+    target = root / OUTPUT_DIR
+    target.mkdir(parents=True, exist_ok=True)
+    results = []
+    for floor in FLOORS:
+        optimized, result = _optimize_floor(root, floor, precision)
+        optimized_path(root, floor).write_text(optimized, encoding="utf-8")
+        results.append(result)
+    report = {"precision": precision, "floors": [asdict(result) for result in results]}
+    (target / REPORT_FILE).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return results
+
+
+def _change(before: int, after: int) -> str:
+    return f"{before} -> {after} ({100.0 * (before - after) / before:.0f}%)"
+
+
+def format_report(results: Sequence[Result], written: bool = True) -> str:
+    header = ["floor", "bytes", "elements", "path commands"]
+    rows = []
+    for result in results:
+        before, after = result.before, result.after
+        rows.append(
+            [
+                result.floor,
+                _change(before.bytes, after.bytes),
+                _change(before.elements, after.elements),
+                _change(before.commands, after.commands),
+            ]
+        )
+    lines = table(header, rows)
+    if written:
+        lines.append(f"geometry verified; wrote {OUTPUT_DIR}/ and {OUTPUT_DIR}/{REPORT_FILE}")
+    else:
+        lines.append("geometry verified; nothing written")
+    return "\n".join(lines)
@@ -0,0 +1,559 @@
+"""Vector tile pyramid of the floor plans.
+
+The page used to inject a floor's whole plan and pan/zoom it, although a
+phone shows a small part of it at a time. A :class:`Pyramid` cuts a plan
+into a quadtree of standalone SVG tiles: level ``z`` splits the square
+covering the view box into ``2**z`` by ``2**z`` tiles, and only tiles that
+overlap the view box exist.
+
+Shapes go to every tile their painted box overlaps; the tile's own view
+box clips them. Stroked paths are split into subpaths first, so a tile
+holds only the wall runs that cross it. Below the deepest level geometry is
+simplified for a tile drawn at most :data:`TILE_PIXELS` wide (the page
+picks the coarsest level that is not enlarged beyond that): polylines are
+reduced with Douglas-Peucker to a pixel (curves are flattened first),
+subpaths and shapes smaller than that are dropped, and coordinates are
+rounded to whole units once a pixel spans one. Groups (with their
+clip paths, masks and transforms) and the definitions a tile uses are
+copied into it.
+
+The server publishes tiles at ``/tiles/<floor>/<z>/<x>/<y>.svg``; the page
+asks for them with the plan's content hash as ``?v=``, so they are cached as
+immutable. Floor bundles then carry a shell SVG (the plan's root element
+with an empty ``#map-tiles`` layer) and the pyramid's :meth:`~Pyramid.metadata`
+instead of the whole plan.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import shutil
+import xml.etree.ElementTree as ET
+from copy import deepcopy
+from dataclasses import dataclass, field
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .assets import BUILD_DIR, IMMUTABLE, content_hash
+from .compress import CompressionResult, available_encoders, precompress
+from .floors import FLOORS, Floor, get_floor
+from .report import table
+from .static import COMPRESSED_SUFFIXES, StaticFiles, load_variants
+from .svg import (
+    IDENTITY,
+    SVG_NS,
+    BBox,
+    Point,
+    Segment,
+    format_path,
+    grow,
+    intersect,
+    local_name,
+    path_bbox,
+    sample_path,
+    subpaths,
+    transform_bbox,
+)
+from .svgopt import (
+    DEFINITIONS,
+    PRECISION,
+    SHAPES,
+    Document,
+    attribute_number,
+    invisible,
+    paint_reach,
+    rendered,
+    floor_svg,
+    serialize,
+    shape_segments,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Widest a tile is drawn, in CSS pixels; sets the simplification.
+TILE_PIXELS = 512
+
+#: Deepest level; its tiles keep full detail.
+MAX_ZOOM = 4
+
+#: Points per curve when flattening for simplification.
+CURVE_STEPS = 8
+
+#: Id of the layer the page fills with tile images.
+TILE_LAYER = "map-tiles"
+
+#: Where ``python -m campus_connect build`` writes the tiles, one directory per floor.
+OUTPUT_DIR = f"{BUILD_DIR}/tiles"
+
+#: File in a floor's tile directory holding the plan hash they were rendered from.
+VERSION_FILE = "version"
+
+#: Root attributes that describe the canvas rather than paint.
+_CANVAS = ("width", "height", "viewBox")
+
+_URL = re.compile(r"url\(#([^)]+)\)")
+
+
+def tile_url(floor_id: str, z: int, x: int, y: int) -> str:
+    """Logical path (without leading slash) of a tile."""
+    return f"tiles/{floor_id}/{z}/{x}/{y}.svg"
+
+
+def simplify(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """Douglas-Peucker: the fewest of ``points`` within ``tolerance`` of the polyline."""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = points[first], points[last]
+        length = math.hypot(bx - ax, by - ay)
+        farthest, index = -1.0, -1
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length:
+                distance = abs((bx - ax) * (ay - py) - (ax - px) * (by - ay)) / length
+            else:
+                distance = math.hypot(px - ax, py - ay)
+            if distance > farthest:
+                farthest, index = distance, i
+        if farthest > tolerance:
+            keep[index] = True
+            stack += [(first, index), (index, last)]
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _polyline(segments: Sequence[Segment]) -> Optional[Tuple[List[Point], bool]]:
+    """Vertices (curves flattened) and closedness of a subpath without arcs."""
+    if any(command == "A" for command, _ in segments):
+        return None
+    points: List[Point] = []
+    for point in sample_path(segments, CURVE_STEPS):
+        if not points or point != points[-1]:
+            points.append(point)
+    return points, any(command == "Z" for command, _ in segments)
+
+
+def _simplified(segments: Sequence[Segment], tolerance: float) -> List[Segment]:
+    """``segments`` without subpaths smaller than ``tolerance``, the rest simplified."""
+    simple: List[Segment] = []
+    for subpath in subpaths(segments):
+        box = path_bbox(subpath)
+        if box is not None and math.hypot(box[2] - box[0], box[3] - box[1]) < tolerance:
+            continue
+        found = _polyline(subpath)
+        if found is None:
+            simple += subpath
+            continue
+        points, closed = found
+        if closed and points[0] != points[-1]:
+            # Anchor the ring at its start so the closing edge is kept.
+            points = points + [points[0]]
+        points = simplify(points, tolerance)
+        simple.append(("M", points[0]))
+        simple += [("L", point) for point in points[1:]]
+        if closed:
+            simple.append(("Z", ()))
+    return simple
+
+
+def _islands(segments: Sequence[Segment]) -> List[List[Segment]]:
+    """Subpaths of a filled path, joined where their boxes overlap.
+
+    Subpaths of different islands cannot cover each other, so drawing the
+    islands apart keeps the fill rule's holes and overlaps.
+    """
+    islands: List[Tuple[BBox, List[Segment]]] = []
+    for subpath in subpaths(segments):
+        box = path_bbox(subpath)
+        if box is None:
+            continue
+        joined: List[Segment] = []
+        apart = []
+        for other, members in islands:
+            if intersect(box, other) is None:
+                apart.append((other, members))
+            else:
+                box = (
+                    min(box[0], other[0]),
+                    min(box[1], other[1]),
+                    max(box[2], other[2]),
+                    max(box[3], other[3]),
+                )
+                joined += members
+        islands = apart + [(box, joined + subpath)]
+    return [members for _, members in islands]
+
+
+@dataclass
+class Piece:
+    """Geometry of one shape (or one subpath of a stroked path) and its box."""
+
+    segments: List[Segment]
+    #: Painted box in the plan's coordinates; ``None`` if unknown (drawn everywhere).
+    box: Optional[BBox]
+    #: Box diagonal in the shape's own units, for dropping sub-pixel detail.
+    size: float
+
+
+@dataclass
+class Feature:
+    """A drawn element of the plan, the groups around it and its pieces."""
+
+    element: ET.Element
+    groups: Tuple[ET.Element, ...]
+    pieces: List[Piece]
+    #: Whether the pieces can be simplified in place (no transform).
+    plain: bool
+
+
+@dataclass
+class Pyramid:
+    """Tiles of one floor plan."""
+
+    floor: str
+    document: Document
+    features: List[Feature]
+    #: ``(min_x, min_y, max_x, max_y)`` of the plan's view box.
+    view: BBox
+    max_zoom: int = MAX_ZOOM
+    version: str = ""
+    #: Per level, tile ``(x, y)`` to its ``(feature, piece)`` numbers in drawing order.
+    levels: List[Dict[Tuple[int, int], List[Tuple[int, int]]]] = field(default_factory=list)
+    #: Simplified pieces by ``(z, feature, piece)``; a piece is in several tiles.
+    _simple: Dict[Tuple[int, int, int], List[Segment]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, floor: Floor, text: str, max_zoom: int = MAX_ZOOM) -> "Pyramid":
+        document = Document(text)
+        view = document.viewport()
+        if view is None:
+            raise ValueError(f"{floor.svg}: plan has no view box")
+        # Tiles change with the plan and with how it is cut.
+        version = content_hash(f"{TILE_PIXELS} {max_zoom}\n{text}".encode("utf-8"))
+        pyramid = cls(floor.id, document, _features(document), view, max_zoom, version)
+        pyramid._index()
+        return pyramid
+
+    @property
+    def extent(self) -> float:
+        """Side of the square the pyramid covers."""
+        return max(self.view[2] - self.view[0], self.view[3] - self.view[1])
+
+    def side(self, z: int) -> float:
+        return self.extent / 2**z
+
+    def columns(self, z: int) -> Tuple[int, int]:
+        """Number of tiles across and down at level ``z``."""
+        side = self.side(z)
+        width, height = self.view[2] - self.view[0], self.view[3] - self.view[1]
+        return max(1, math.ceil(width / side - 1e-9)), max(1, math.ceil(height / side - 1e-9))
+
+    def tile_box(self, z: int, x: int, y: int) -> BBox:
+        side = self.side(z)
+        left, top = self.view[0] + x * side, self.view[1] + y * side
+        return left, top, left + side, top + side
+
+    def tiles(self) -> Iterator[Tuple[int, int, int]]:
+        for z in range(self.max_zoom + 1):
+            columns, rows = self.columns(z)
+            for x in range(columns):
+                for y in range(rows):
+                    yield z, x, y
+
+    def _index(self) -> None:
+        self.levels = []
+        for z in range(self.max_zoom + 1):
+            side = self.side(z)
+            columns, rows = self.columns(z)
+            cells: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+            for number, feature in enumerate(self.features):
+                for part, piece in enumerate(feature.pieces):
+                    if piece.box is None:
+                        xs, ys = range(columns), range(rows)
+                    else:
+                        xs = range(
+                            max(0, math.floor((piece.box[0] - self.view[0]) / side)),
+                            min(columns - 1, math.floor((piece.box[2] - self.view[0]) / side)) + 1,
+                        )
+                        ys = range(
+                            max(0, math.floor((piece.box[1] - self.view[1]) / side)),
+                            min(rows - 1, math.floor((piece.box[3] - self.view[1]) / side)) + 1,
+                        )
+                    for x in xs:
+                        for y in ys:
+                            cells.setdefault((x, y), []).append((number, part))
+            self.levels.append(cells)
+
+    def render(self, z: int, x: int, y: int) -> str:
+        """The tile's SVG document."""
+        columns, rows = self.columns(z)
+        if not (0 <= z <= self.max_zoom and 0 <= x < columns and 0 <= y < rows):
+            raise KeyError((z, x, y))
+        side = self.side(z)
+        left, top, _, _ = self.tile_box(z, x, y)
+        deepest = z == self.max_zoom
+        tolerance = 0.0 if deepest else side / TILE_PIXELS
+        precision = PRECISION if tolerance < 1 else 0
+
+        root = ET.Element(self.document.root.tag, self._paint())
+        root.set("width", str(TILE_PIXELS))
+        root.set("height", str(TILE_PIXELS))
+        root.set("viewBox", " ".join(_coordinate(v) for v in (left, top, side, side)))
+        defs = ET.SubElement(root, f"{{{SVG_NS}}}defs")
+        opened: List[Tuple[ET.Element, ET.Element]] = []
+        entries = self.levels[z].get((x, y), [])
+        for number, parts in groupby(entries, key=lambda entry: entry[0]):
+            feature = self.features[number]
+            element = self._element(z, number, [part for _, part in parts], tolerance, precision)
+            if element is None:
+                continue
+            # Reopen only the groups that differ from the previous shape's.
+            depth = 0
+            while (
+                depth < len(opened)
+                and depth < len(feature.groups)
+                and opened[depth][0] is feature.groups[depth]
+            ):
+                depth += 1
+            del opened[depth:]
+            for group in feature.groups[depth:]:
+                parent = opened[-1][1] if opened else root
+                copy = ET.SubElement(parent, group.tag, dict(group.attrib))
+                opened.append((group, copy))
+            (opened[-1][1] if opened else root).append(element)
+        for definition in self._definitions(root):
+            defs.append(definition)
+        if not len(defs):
+            root.remove(defs)
+        return serialize(root)
+
+    def _element(
+        self, z: int, number: int, parts: Sequence[int], tolerance: float, precision: int
+    ) -> Optional[ET.Element]:
+        feature = self.features[number]
+        element = feature.element
+        if local_name(element.tag) != "path":
+            if feature.pieces[parts[0]].size < tolerance:
+                return None
+            return deepcopy(element)
+        segments: List[Segment] = []
+        for part in parts:
+            piece = feature.pieces[part]
+            if piece.size < tolerance:
+                continue
+            if not tolerance or not feature.plain:
+                segments += piece.segments
+                continue
+            key = (z, number, part)
+            if key not in self._simple:
+                self._simple[key] = _simplified(piece.segments, tolerance)
+            segments += self._simple[key]
+        if not segments:
+            return None
+        copy = ET.Element(element.tag, dict(element.attrib))
+        copy.extend(deepcopy(child) for child in element)
+        copy.set("d", format_path(segments, precision))
+        return copy
+
+    def _paint(self) -> Dict[str, str]:
+        return {k: v for k, v in self.document.root.attrib.items() if k not in _CANVAS}
+
+    def _definitions(self, tile: ET.Element) -> List[ET.Element]:
+        """Elements referenced (directly or through each other) by ``tile``, in file order."""
+        wanted: Set[str] = set()
+        pending = [tile]
+        while pending:
+            for node in pending.pop().iter():
+                for value in node.attrib.values():
+                    names = _URL.findall(value)
+                    if value.startswith("#"):
+                        names.append(value[1:])
+                    for name in names:
+                        target = self.document.ids.get(name)
+                        if target is not None and name not in wanted:
+                            wanted.add(name)
+                            pending.append(target)
+        found: List[ET.Element] = []
+        inside: Set[int] = set()
+        for name, element in self.document.ids.items():
+            if name in wanted and id(element) not in inside:
+                # A definition nested in another comes with it.
+                found.append(element)
+                inside.update(id(node) for node in element.iter())
+        return found
+
+    def shell(self) -> str:
+        """The plan's root element around an empty tile layer."""
+        root = ET.Element(self.document.root.tag, dict(self.document.root.attrib))
+        ET.SubElement(root, f"{{{SVG_NS}}}g", {"id": TILE_LAYER})
+        return serialize(root)
+
+    def metadata(self) -> Dict[str, Any]:
+        """What the page needs to pick and place tiles."""
+        return {
+            "url": f"tiles/{self.floor}/{{z}}/{{x}}/{{y}}.svg?v={self.version}",
+            "origin": [self.view[0], self.view[1]],
+            "size": [self.view[2] - self.view[0], self.view[3] - self.view[1]],
+            "extent": self.extent,
+            "max_zoom": self.max_zoom,
+            "pixels": TILE_PIXELS,
+        }
+
+
+def _coordinate(value: float) -> str:
+    return f"{value:.{PRECISION}f}".rstrip("0").rstrip(".")
+
+
+def _features(document: Document) -> List[Feature]:
+    parents = {child: parent for parent in document.root.iter() for child in parent}
+    features = []
+    for visit in rendered(document):
+        element = visit.element
+        name = local_name(element.tag)
+        if visit.parent is None or name in DEFINITIONS or name in ("g", "svg"):
+            continue
+        if name in SHAPES and invisible(visit.style, element):
+            continue
+        groups = []
+        parent = visit.parent
+        while parent is not None and parent is not document.root:
+            groups.append(parent)
+            parent = parents.get(parent)
+        plain = visit.matrix == IDENTITY
+        reach = paint_reach(visit.style)
+        pieces = []
+        if name in SHAPES:
+            segments = shape_segments(element)
+            filled = visit.style["fill"] != "none"
+            if name != "path":
+                parts = [segments]
+            else:
+                parts = _islands(segments) if filled else subpaths(segments)
+            for subpath in parts:
+                box = path_bbox(subpath)
+                if box is None:
+                    continue
+                size = math.hypot(box[2] - box[0], box[3] - box[1])
+                pieces.append(Piece(subpath, grow(transform_bbox(visit.matrix, box), reach), size))
+        else:
+            box = None
+            if element.get("width") is not None and element.get("height") is not None:
+                left = attribute_number(element.get("x"))
+                top = attribute_number(element.get("y"))
+                box = transform_bbox(
+                    visit.matrix,
+                    (
+                        left,
+                        top,
+                        left + attribute_number(element.get("width")),
+                        top + attribute_number(element.get("height")),
+                    ),
+                )
+            pieces.append(Piece([], box, math.inf))
+        if pieces:
+            features.append(Feature(element, tuple(reversed(groups)), pieces, plain))
+    return features
+
+
+def tile_dir(root: Path, floor_id: str) -> Path:
+    return root / OUTPUT_DIR / floor_id
+
+
+def tile_path(root: Path, floor_id: str, z: int, x: int, y: int) -> Path:
+    return tile_dir(root, floor_id) / str(z) / str(x) / f"{y}.svg"
+
+
+def built_version(root: Path, floor_id: str) -> Optional[str]:
+    """Plan hash the floor's written tiles were rendered from, if any."""
+    marker = tile_dir(root, floor_id) / VERSION_FILE
+    return marker.read_text(encoding="utf-8").strip() if marker.is_file() else None
+
+
+def write_tiles(root: Path, pyramid: Pyramid) -> List[CompressionResult]:
+    """Render and precompress every tile of ``pyramid`` under :data:`OUTPUT_DIR`.
+
+    Tiles already written from the same plan are reused.
+    """
+    target = tile_dir(root, pyramid.floor)
+    if built_version(root, pyramid.floor) != pyramid.version:
+        shutil.rmtree(target, ignore_errors=True)
+        for z, x, y in pyramid.tiles():
+            path = tile_path(root, pyramid.floor, z, x, y)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(pyramid.render(z, x, y), encoding="utf-8")
+    results = precompress(tile_path(root, pyramid.floor, *tile) for tile in pyramid.tiles())
+    # Written last, so an interrupted build is redone.
+    (target / VERSION_FILE).write_text(pyramid.version + "\n", encoding="utf-8")
+    return results
+
+
+def write_floor_tiles(root: Path) -> Dict[str, List[CompressionResult]]:
+    """Write the tiles of every floor, from its optimized plan when that is built."""
+    return {
+        floor.id: write_tiles(root, Pyramid.build(floor, floor_svg(root, floor)))
+        for floor in FLOORS
+    }
+
+
+def format_report(root: Path, results: Dict[str, List[CompressionResult]]) -> str:
+    """Bytes per level of each floor's tiles, next to the whole plan's."""
+    encoders = available_encoders()
+    encodings = [enc for enc in COMPRESSED_SUFFIXES if enc in encoders]
+    header = ["floor", "level", "tiles", "bytes"] + encodings
+    rows = []
+    for floor, found in results.items():
+        plan = floor_svg(root, get_floor(floor)).encode("utf-8")
+        sizes = [str(len(encoders[enc](plan))) for enc in encodings]
+        rows.append([floor, "plan", "1", str(len(plan))] + sizes)
+        # Tiles are listed level by level; a tile's level is its grandparent directory.
+        for z, level in groupby(found, key=lambda result: result.path.parent.parent.name):
+            level = list(level)
+            sizes = [
+                str(sum(result.sizes.get(enc, result.original) for result in level))
+                for enc in encodings
+            ]
+            original = sum(result.original for result in level)
+            rows.append([floor, z, str(len(level)), str(original)] + sizes)
+    lines = table(header, rows)
+    lines.append(f"wrote {OUTPUT_DIR}/")
+    return "\n".join(lines)
+
+
+def install_tiles(static: StaticFiles, root: Path, pyramid: Pyramid) -> int:
+    """Publish every tile of ``pyramid``; returns the count.
+
+    Tiles written by the build are read with their precompressed siblings;
+    otherwise they are rendered here and only gzipped, since brotli at the
+    highest quality takes several seconds per floor.
+    """
+    built = built_version(root, pyramid.floor) == pyramid.version
+    if not built:
+        logger.info(
+            "tiles of %s are not built; rendering them (run `python -m campus_connect build`)",
+            pyramid.floor,
+        )
+    gzip = available_encoders()["gzip"]
+    count = 0
+    for z, x, y in pyramid.tiles():
+        if built:
+            path = tile_path(root, pyramid.floor, z, x, y)
+            body, variants = path.read_bytes(), load_variants(path)
+        else:
+            body = pyramid.render(z, x, y).encode("utf-8")
+            compressed = gzip(body)
+            variants = {"gzip": compressed} if len(compressed) < len(body) else {}
+        static.add(
+            tile_url(pyramid.floor, z, x, y),
+            body,
+            "image/svg+xml",
+            variants,
+            cache_control=IMMUTABLE,
+        )
+        count += 1
+    return count
@@ -0,0 +1,221 @@
+"""Node coordinates in the frame of the floor plans.
+
+The nodes files are stored in their plans' frame. The second floor's were
+taken from its plan turned half a turn, and the page used to map every node
+through ``8830 - x, 6238 - y`` on each load; they have since been turned in
+the file itself, like the third floor's. :attr:`Floor.rotation
+<campus_connect.floors.Floor.rotation>` records the turn of a floor whose
+nodes are drawn turned from its plan, and :func:`plan_matrix` makes it an
+affine matrix about the centre of the plan's ``viewBox``, so the plan's size
+is never written down twice.
+
+The ``transform`` build stage maps every nodes file through its matrix and
+writes it to :data:`OUTPUT_DIR`. The server publishes those files, and the
+bundles and packs built from them, under the nodes files' own URLs; the
+page uses what it receives as is. Zones need no matrix: the ``zones``
+stage extracts them from the plan in its own frame. With ``numpy``
+installed the coordinates are mapped as arrays.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .assets import BUILD_DIR
+from .compress import CompressionResult, available_encoders, precompress, sibling
+from .floors import FLOORS, Floor, Graph, load_json, load_nodes
+from .report import table
+from .static import COMPRESSED_SUFFIXES, StaticFiles, load_variants
+from .svg import IDENTITY, Matrix, invert, parse_transform
+
+logger = logging.getLogger(__name__)
+
+#: Directory, relative to the root, receiving the transformed nodes files.
+OUTPUT_DIR = f"{BUILD_DIR}/nodes"
+
+#: Bytes read from the top of a plan to find its root element.
+HEAD_BYTES = 4096
+
+_ROOT = re.compile(r"<svg\b[^>]*>", re.S)
+_ATTRIBUTE = r'\b{}\s*=\s*["\']([^"\']*)["\']'
+
+#: ``(x, y, width, height)`` of a plan's ``viewBox``.
+ViewBox = Tuple[float, float, float, float]
+
+
+def view_box(text: str) -> ViewBox:
+    """The ``viewBox`` of the plan starting with ``text``, else its ``width``/``height``."""
+    found = _ROOT.search(text)
+    if found is None:
+        raise ValueError("no <svg> element")
+    tag = found.group(0)
+    box = re.search(_ATTRIBUTE.format("viewBox"), tag)
+    if box is not None:
+        x, y, width, height = (float(v) for v in box.group(1).replace(",", " ").split())
+        return x, y, width, height
+    sizes = [re.search(_ATTRIBUTE.format(name), tag) for name in ("width", "height")]
+    if None in sizes:
+        raise ValueError("<svg> has neither a viewBox nor a width and height")
+    width, height = (float(re.match(r"[\d.]+", size.group(1)).group(0)) for size in sizes)
+    return 0.0, 0.0, width, height
+
+
+def floor_matrix(floor: Floor, box: ViewBox) -> Matrix:
+    """The matrix taking ``floor``'s node coordinates to its plan's frame."""
+    if not floor.rotation:
+        return IDENTITY
+    x, y, width, height = box
+    matrix = parse_transform(f"rotate({floor.rotation} {x + width / 2} {y + height / 2})")
+    # Quarter turns come out exact instead of off by 1e-13, and without -0.
+    return tuple(round(value, 9) + 0.0 for value in matrix)  # type: ignore[return-value]
+
+
+def plan_box(root: Path, floor: Floor) -> ViewBox:
+    with open(root / floor.svg, encoding="utf-8", errors="replace") as fh:
+        return view_box(fh.read(HEAD_BYTES))
+
+
+def plan_matrix(root: Path, floor: Floor) -> Matrix:
+    if not floor.rotation:
+        return IDENTITY
+    return floor_matrix(floor, plan_box(root, floor))
+
+
+def apply(matrix: Matrix, nodes: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """``nodes`` with their ``x``/``y`` mapped through ``matrix``."""
+    if matrix == IDENTITY:
+        return list(nodes)  # type: ignore[arg-type]
+    a, b, c, d, e, f = matrix
+    if np is not None:
+        points = np.array([(node["x"], node["y"]) for node in nodes], dtype=np.float64)
+        points = points.reshape(-1, 2) @ np.array([[a, b], [c, d]]) + (e, f)
+        mapped = points.tolist()
+    else:
+        mapped = [(a * n["x"] + c * n["y"] + e, b * n["x"] + d * n["y"] + f) for n in nodes]
+    return [{**node, "x": x, "y": y} for node, (x, y) in zip(nodes, mapped)]
+
+
+def display_nodes(
+    root: Path, floor: Floor, nodes: Sequence[Mapping[str, Any]]
+) -> List[Dict[str, Any]]:
+    """``nodes`` of ``floor`` in its plan's frame, as the page draws them."""
+    return apply(plan_matrix(root, floor), nodes)
+
+
+def raw_nodes(
+    root: Path, floor: Floor, nodes: Sequence[Mapping[str, Any]]
+) -> List[Dict[str, Any]]:
+    """``nodes`` in the plan's frame taken back to the nodes file's."""
+    return apply(invert(plan_matrix(root, floor)), nodes)
+
+
+def output_path(root: Path, floor: Floor) -> Path:
+    return root / OUTPUT_DIR / Path(floor.nodes).name
+
+
+def built_nodes(root: Path, floor: Floor) -> Optional[Path]:
+    """The file the build wrote for ``floor`` if it is newer than the nodes file and plan."""
+    path = output_path(root, floor)
+    if not path.is_file():
+        return None
+    mtime = path.stat().st_mtime
+    sources = (root / floor.nodes, root / floor.svg)
+    return path if all(mtime >= source.stat().st_mtime for source in sources) else None
+
+
+def load_display_nodes(root: Path, floor: Floor) -> Tuple[List[Dict[str, Any]], Graph]:
+    """:func:`~campus_connect.floors.load_nodes` in the plan's frame.
+
+    Reads the file the build wrote when it is up to date, else maps the
+    nodes here.
+    """
+    path = built_nodes(root, floor)
+    if path is not None:
+        data = load_json(root, path.relative_to(root).as_posix())
+        return data["nodes"], data["graph"]
+    nodes, graph = load_nodes(root, floor)
+    return display_nodes(root, floor, nodes), graph
+
+
+def encode_nodes(nodes: Sequence[Mapping[str, Any]], graph: Graph) -> bytes:
+    data = {"nodes": nodes, "graph": graph}
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@dataclass
+class Result:
+    floor: str
+    box: ViewBox
+    matrix: Matrix
+    nodes: int
+    #: Whether the file was rewritten.
+    changed: bool
+    #: Its precompressed siblings.
+    written: CompressionResult
+
+
+def transform_floors(root: Path, floors: Optional[Sequence[Floor]] = None) -> List[Result]:
+    """Write every floor's nodes file in its plan's frame under :data:`OUTPUT_DIR`."""
+    (root / OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    results = []
+    for floor in floors or FLOORS:
+        box = plan_box(root, floor)
+        matrix = floor_matrix(floor, box)
+        nodes, graph = load_nodes(root, floor)
+        body = encode_nodes(apply(matrix, nodes), graph)
+        target = output_path(root, floor)
+        changed = built_nodes(root, floor) is None or target.read_bytes() != body
+        if changed:
+            target.write_bytes(body)
+            for encoding in COMPRESSED_SUFFIXES:
+                sibling(target, encoding).unlink(missing_ok=True)
+        [written] = precompress([target])
+        results.append(Result(floor.id, box, matrix, len(nodes), changed, written))
+    return results
+
+
+def _format_matrix(matrix: Matrix) -> str:
+    if matrix == IDENTITY:
+        return "identity"
+    return "matrix(" + " ".join(f"{value:g}" for value in matrix) + ")"
+
+
+def format_report(results: Sequence[Result]) -> str:
+    header = ["floor", "viewBox", "nodes", "matrix", "file"]
+    rows = []
+    for result in results:
+        box = " ".join(f"{value:g}" for value in result.box)
+        status = "written" if result.changed else "unchanged"
+        rows.append([result.floor, box, str(result.nodes), _format_matrix(result.matrix), status])
+    lines = table(header, rows)
+    lines.append(f"wrote {OUTPUT_DIR}/")
+    return "\n".join(lines)
+
+
+def install_nodes(static: StaticFiles, root: Path) -> None:
+    """Publish every floor's nodes in its plan's frame at the nodes file's URL.
+
+    Files written by the build are served with their precompressed
+    siblings; otherwise the nodes are mapped here and only gzipped.
+    """
+    gzip = available_encoders()["gzip"]
+    for floor in FLOORS:
+        path = built_nodes(root, floor)
+        if path is not None:
+            body, variants = path.read_bytes(), load_variants(path)
+        else:
+            body = encode_nodes(*load_display_nodes(root, floor))
+            compressed = gzip(body)
+            variants = {"gzip": compressed} if len(compressed) < len(body) else {}
+        static.add(floor.nodes, body, "application/json", variants, fingerprint=True)
+        logger.info("nodes %s: %d bytes in the plan's frame", floor.id, len(body))
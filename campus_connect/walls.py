@@ -0,0 +1,266 @@
+"""Wall-crossing check of the navigation graphs.
+
+Routes are drawn as straight lines between graph nodes, so an edge of a
+floor's ``graph`` that cuts through a ``#808080`` wall draws (and costs) a
+path nobody can walk. :func:`wall_segments` takes every wall of a plan
+apart into straight segments: the outlines of filled walls and the lines
+of stroked ones, curves sampled at :data:`CURVE_STEPS` steps.
+:class:`SegmentIndex` buckets them into a uniform grid, and a query walks
+only the cells an edge passes through, so checking a floor costs about
+one crossing test per wall segment near each edge.
+
+An edge crosses a wall when it and a wall segment cross at a point inside
+both; edges that only touch a wall, like a node placed on a door jamb, do
+not count.
+
+The ``walls`` build stage checks every floor and fails on crossings not
+listed in :data:`KNOWN_FILE`, the reviewed ones the data already had.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .floors import FLOORS, Floor, Graph, load_json
+from .geometry import Point
+from .lod import crosses
+from .report import table
+from .svg import PathError, local_name, sample_path, subpaths, transform_point
+from .svgopt import SHAPES, Document, rendered, shape_segments
+from .transform import load_display_nodes
+
+#: Paint of the walls.
+WALL_COLOUR = "#808080"
+
+#: Steps each curved wall is sampled at.
+CURVE_STEPS = 4
+
+#: Crossings accepted as they are, per floor: ``{"floor": [[node, node], ...]}``.
+KNOWN_FILE = "checks/known_wall_crossings.json"
+
+Segment = Tuple[Point, Point]
+Edge = Tuple[str, str]
+
+
+def wall_segments(text: str) -> List[Segment]:
+    """Straight segments of every wall of the plan ``text``, in its coordinates."""
+    found: List[Segment] = []
+    for visit in rendered(Document(text)):
+        if local_name(visit.element.tag) not in SHAPES:
+            continue
+        filled = visit.style["fill"].strip().upper() == WALL_COLOUR
+        if not filled and visit.style["stroke"].strip().upper() != WALL_COLOUR:
+            continue
+        try:
+            segments = shape_segments(visit.element)
+        except PathError:
+            continue
+        for subpath in subpaths(segments):
+            samples = sample_path(subpath, CURVE_STEPS, lines=False)
+            points = [transform_point(visit.matrix, point) for point in samples]
+            if filled and points:
+                # A fill closes every subpath.
+                points.append(points[0])
+            found.extend((a, b) for a, b in zip(points, points[1:]) if a != b)
+    return found
+
+
+@dataclass
+class SegmentIndex:
+    """Uniform grid over wall segments.
+
+    ``cells`` maps a grid cell to the positions of the segments whose boxes
+    overlap it.
+    """
+
+    segments: List[Segment]
+    origin: Point
+    cell_size: float
+    cells: Dict[Tuple[int, int], List[int]]
+
+    @classmethod
+    def build(
+        cls, segments: Iterable[Segment], cell_size: Optional[float] = None
+    ) -> "SegmentIndex":
+        """Index ``segments``; the default cell holds a few segments on average.
+
+        That is the side of a square of the segments' box shared out equally,
+        but at least the median segment length, so a segment spans few cells.
+        """
+        segments = list(segments)
+        if not segments:
+            return cls([], (0.0, 0.0), 1.0, {})
+        xs = [x for segment in segments for x, _ in segment]
+        ys = [y for segment in segments for _, y in segment]
+        if cell_size is None:
+            lengths = sorted(math.dist(a, b) for a, b in segments)
+            area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+            cell_size = max(lengths[len(lengths) // 2], math.sqrt(area / len(segments)) * 2)
+        index = cls(segments, (min(xs), min(ys)), float(cell_size) or 1.0, {})
+        for position, (a, b) in enumerate(segments):
+            x0, y0 = index.cell(min(a[0], b[0]), min(a[1], b[1]))
+            x1, y1 = index.cell(max(a[0], b[0]), max(a[1], b[1]))
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    index.cells.setdefault((cx, cy), []).append(position)
+        return index
+
+    def cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (
+            math.floor((x - self.origin[0]) / self.cell_size),
+            math.floor((y - self.origin[1]) / self.cell_size),
+        )
+
+    def traverse(self, a: Point, b: Point) -> Iterator[Tuple[int, int]]:
+        """Cells the segment ``a``-``b`` passes through, from ``a`` (Amanatides-Woo)."""
+        cx, cy = self.cell(*a)
+        end = self.cell(*b)
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        step_x, step_y = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+
+        def first(start: float, origin: float, cell: int, delta: float, step: int) -> float:
+            if not step:
+                return math.inf
+            boundary = origin + (cell + (step > 0)) * self.cell_size
+            return (boundary - start) / delta
+
+        t_x = first(a[0], self.origin[0], cx, dx, step_x)
+        t_y = first(a[1], self.origin[1], cy, dy, step_y)
+        delta_x = self.cell_size / abs(dx) if dx else math.inf
+        delta_y = self.cell_size / abs(dy) if dy else math.inf
+        yield cx, cy
+        # A segment passes through at most this many cells.
+        for _ in range(abs(end[0] - cx) + abs(end[1] - cy)):
+            if t_x < t_y:
+                cx, t_x = cx + step_x, t_x + delta_x
+            else:
+                cy, t_y = cy + step_y, t_y + delta_y
+            yield cx, cy
+
+    def crossing(self, a: Point, b: Point) -> Iterator[Segment]:
+        """Segments that cross ``a``-``b``, each once."""
+        seen: Set[int] = set()
+        for key in self.traverse(a, b):
+            for position in self.cells.get(key, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                p, q = self.segments[position]
+                if crosses(a, b, p, q):
+                    yield p, q
+
+
+@dataclass
+class Crossing:
+    """A graph edge that crosses a wall."""
+
+    floor: str
+    edge: Edge
+    start: Point
+    end: Point
+    #: Wall segments crossed, in no particular order.
+    walls: List[Segment]
+
+    def describe(self) -> str:
+        (x0, y0), (x1, y1) = self.start, self.end
+        (p, q) = self.walls[0]
+        more = f" and {len(self.walls) - 1} more" if len(self.walls) > 1 else ""
+        return (
+            f"{self.floor}: {self.edge[0]} ({x0:g}, {y0:g}) - {self.edge[1]} ({x1:g}, {y1:g})"
+            f" crosses wall ({p[0]:.1f}, {p[1]:.1f})-({q[0]:.1f}, {q[1]:.1f}){more}"
+        )
+
+
+def graph_edges(graph: Graph) -> List[Edge]:
+    """Each edge of the adjacency ``graph`` once, ends in sorted order."""
+    return sorted({tuple(sorted((a, b))) for a, neighbours in graph.items() for b in neighbours})
+
+
+def check_edges(
+    floor: str,
+    index: SegmentIndex,
+    positions: Dict[str, Point],
+    edges: Sequence[Edge],
+) -> List[Crossing]:
+    """Edges between known positions that cross a wall of ``index``."""
+    found = []
+    for a, b in edges:
+        if a not in positions or b not in positions:
+            continue
+        walls = list(index.crossing(positions[a], positions[b]))
+        if walls:
+            found.append(Crossing(floor, (a, b), positions[a], positions[b], walls))
+    return found
+
+
+def check_floor(root: Path, floor: Floor) -> Tuple[int, int, List[Crossing]]:
+    """Wall segments, edges and crossings of ``floor``, nodes placed as the page draws them."""
+    index = SegmentIndex.build(wall_segments((root / floor.svg).read_text(encoding="utf-8")))
+    nodes, graph = load_display_nodes(root, floor)
+    positions = {node["id"]: (node["x"], node["y"]) for node in nodes}
+    edges = graph_edges(graph)
+    return len(index.segments), len(edges), check_edges(floor.id, index, positions, edges)
+
+
+def known_crossings(root: Path) -> Dict[str, Set[Edge]]:
+    if not (root / KNOWN_FILE).exists():
+        return {}
+    return {
+        floor: {tuple(sorted(edge)) for edge in edges}
+        for floor, edges in load_json(root, KNOWN_FILE).items()
+    }
+
+
+class WallCrossingError(RuntimeError):
+    """Graph edges cross walls."""
+
+
+@dataclass
+class Result:
+    floor: str
+    walls: int
+    edges: int
+    crossings: List[Crossing]
+    known: int
+
+
+def check_floors(root: Path, floors: Optional[Sequence[Floor]] = None) -> List[Result]:
+    """Check every floor; raises :class:`WallCrossingError` on crossings not known."""
+    known = known_crossings(root)
+    results, new = [], []
+    for floor in floors or FLOORS:
+        walls, edges, crossings = check_floor(root, floor)
+        accepted = known.get(floor.id, set())
+        new += [crossing for crossing in crossings if crossing.edge not in accepted]
+        results.append(
+            Result(
+                floor.id,
+                walls,
+                edges,
+                crossings,
+                sum(crossing.edge in accepted for crossing in crossings),
+            )
+        )
+    if new:
+        raise WallCrossingError(
+            f"{len(new)} graph edge(s) cross walls:\n"
+            + "\n".join(crossing.describe() for crossing in new)
+        )
+    return results
+
+
+def format_report(results: Sequence[Result]) -> str:
+    header = ["floor", "wall segments", "edges", "crossings", "known"]
+    rows = []
+    for result in results:
+        counts = [result.walls, result.edges, len(result.crossings), result.known]
+        rows.append([result.floor] + [str(n) for n in counts])
+    lines = table(header, rows)
+    for result in results:
+        lines += [f"known: {crossing.describe()}" for crossing in result.crossings]
+    lines.append(f"no new wall crossings (accepted ones are listed in {KNOWN_FILE})")
+    return "\n".join(lines)
+
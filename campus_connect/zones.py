@@ -0,0 +1,276 @@
+"""Zone polygons extracted from the floor plans.
+
+Rooms are drawn in the plans as closed paths filled with a colour per kind
+of room (:data:`CATEGORIES`). :func:`extract_zones` turns every such
+subpath into a zone of ``*_zones.json``: its polygon (curves sampled at
+:data:`CURVE_STEPS` steps, in the plan's coordinates), area centroid and
+bounding box. The ``zones`` build stage runs it over every floor in one
+pass, so the page gets classroom outlines from the zone data instead of
+scanning the plan's paths, and floors without hand-made zones get them.
+
+:func:`merge_zones` keeps what was edited by hand: zones without a polygon
+(the first floor's node lists) and ``"manual"`` ones stay as they are, and
+an extracted zone containing the centroid of an earlier ``"path"`` zone of
+its category takes over that zone's id and extra fields (names,
+popularity). Other extracted zones get the next free ``{category}_{n}`` id.
+
+Fills not in :data:`CATEGORIES` are reported, not guessed.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from .floors import FLOORS, Floor, load_zones
+from .geometry import Point, point_in_polygon
+from .lod import ring
+from .report import table
+from .svg import PathError, local_name, sample_path, subpaths, transform_point
+from .svgopt import Document, rendered, shape_segments
+
+#: Room fill colour to zone category.
+CATEGORIES = {
+    "#FFD6D4": "classroom",
+    "#CBF3EE": "lab",
+    "#CFD7F4": "staffroom",
+    "#FAF8CB": "boys washroom",
+    "#E2FFCF": "girls washroom",
+    "#FFDDFC": "store room",
+}
+
+#: Steps each curve is sampled at.
+CURVE_STEPS = 12
+
+#: Smallest area, in square map units, of a subpath that becomes a zone.
+MIN_AREA = 100.0
+
+#: Fields computed from the polygon; everything else of a zone is kept on merge.
+GEOMETRY = (
+    "category",
+    "fill",
+    "points",
+    "centroid_x",
+    "centroid_y",
+    "bbox_min_x",
+    "bbox_min_y",
+    "bbox_max_x",
+    "bbox_max_y",
+    "source_type",
+)
+
+
+def signed_area(points: Sequence[Point]) -> float:
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(points, [*points[1:], points[0]])) / 2
+
+
+def centroid(points: Sequence[Point]) -> Point:
+    """Area centroid of the ring ``points``; the vertex mean if it has no area."""
+    area = signed_area(points)
+    if not area:
+        return sum(x for x, _ in points) / len(points), sum(y for _, y in points) / len(points)
+    cx = cy = 0.0
+    for a, b in zip(points, [*points[1:], points[0]]):
+        cross = a[0] * b[1] - b[0] * a[1]
+        cx += (a[0] + b[0]) * cross
+        cy += (a[1] + b[1]) * cross
+    return cx / (6 * area), cy / (6 * area)
+
+
+def zone_record(category: str, fill: str, points: Sequence[Point]) -> Dict[str, Any]:
+    """A zone in the layout of ``*_zones.json``, without an id."""
+    vertices = [(round(x, 2), round(y, 2)) for x, y in points]
+    cx, cy = centroid(vertices)
+    xs, ys = [x for x, _ in vertices], [y for _, y in vertices]
+    return {
+        "category": category,
+        "fill": fill,
+        "points": [[x, y] for x, y in [*vertices, vertices[0]]],
+        "centroid_x": round(cx, 2),
+        "centroid_y": round(cy, 2),
+        "bbox_min_x": min(xs),
+        "bbox_min_y": min(ys),
+        "bbox_max_x": max(xs),
+        "bbox_max_y": max(ys),
+        "source_type": "path",
+    }
+
+
+@dataclass
+class Extraction:
+    """Zones found in one plan, in document order, and the fills left out."""
+
+    zones: List[Dict[str, Any]] = field(default_factory=list)
+    #: Unknown fill colour of closed paths to how many of them there are.
+    unclassified: Counter = field(default_factory=Counter)
+
+
+def extract_zones(text: str, steps: int = CURVE_STEPS, min_area: float = MIN_AREA) -> Extraction:
+    """Zones of every closed, room-filled subpath of the plan ``text``.
+
+    A subpath inside another of the same path (a hole, such as a pillar cut
+    out of a room) is not a zone of its own.
+    """
+    found = Extraction()
+    for visit in rendered(Document(text)):
+        if local_name(visit.element.tag) != "path":
+            continue
+        fill = visit.style["fill"].strip().upper()
+        if not fill.startswith("#"):
+            continue
+        try:
+            segments = shape_segments(visit.element)
+        except PathError:
+            continue
+        rings = []
+        for subpath in subpaths(segments):
+            samples = sample_path(subpath, steps, lines=False)
+            points = ring(transform_point(visit.matrix, point) for point in samples)
+            if len(points) >= 3 and abs(signed_area(points)) >= min_area:
+                rings.append(points)
+        if not rings:
+            continue
+        category = CATEGORIES.get(fill)
+        if category is None:
+            found.unclassified[fill] += 1
+            continue
+        for points in rings:
+            holes = (
+                other
+                for other in rings
+                if other is not points and abs(signed_area(other)) > abs(signed_area(points))
+            )
+            if any(point_in_polygon(*points[0], other) for other in holes):
+                continue
+            found.zones.append(zone_record(category, fill, points))
+    return found
+
+
+def _slug(category: str) -> str:
+    return category.replace(" ", "_")
+
+
+def _contains(new: Mapping[str, Any], zone: Mapping[str, Any]) -> bool:
+    return new["category"] == zone.get("category") and point_in_polygon(
+        zone["centroid_x"], zone["centroid_y"], new["points"]
+    )
+
+
+def merge_zones(
+    existing: Sequence[Mapping[str, Any]], extracted: Sequence[Mapping[str, Any]]
+) -> List[Dict[str, Any]]:
+    """``existing`` zones with their ``"path"`` ones replaced by ``extracted``.
+
+    Existing entries keep their place; extracted zones matching none of them
+    follow in document order. Several ``"path"`` zones matching one extracted
+    zone are a room split by hand and are kept as they are.
+    """
+    matches: Dict[int, List[Mapping[str, Any]]] = {}
+    for zone in existing:
+        if zone.get("source_type") == "path" and zone.get("points"):
+            for position, new in enumerate(extracted):
+                if _contains(new, zone):
+                    matches.setdefault(position, []).append(zone)
+                    break
+    replaced = {id(zones[0]): extracted[position] for position, zones in matches.items()}
+    split = {id(zone) for zones in matches.values() if len(zones) > 1 for zone in zones}
+    merged: List[Dict[str, Any]] = []
+    for zone in existing:
+        if zone.get("source_type") != "path" or not zone.get("points") or id(zone) in split:
+            merged.append(dict(zone))
+        elif id(zone) in replaced:
+            kept = {key: value for key, value in zone.items() if key not in GEOMETRY}
+            merged.append({"id": zone["id"], **replaced[id(zone)], **kept})
+        # Otherwise the room is gone from the plan.
+    taken = {zone.get("id") for zone in merged}
+    for position, new in enumerate(extracted):
+        if position in matches:
+            continue
+        n = 1
+        while f"{_slug(new['category'])}_{n}" in taken:
+            n += 1
+        name = f"{_slug(new['category'])}_{n}"
+        taken.add(name)
+        merged.append({"id": name, **new})
+    return merged
+
+
+@dataclass
+class Result:
+    floor: str
+    path: str
+    zones: Dict[str, int]
+    kept: int
+    added: int
+    removed: int
+    unclassified: Dict[str, int]
+    changed: bool
+
+
+def encode_zones(zones: Sequence[Mapping[str, Any]]) -> str:
+    """``*_zones.json`` text: one indented object per zone, each value on one line.
+
+    Hand-edited entries stay reviewable and a changed zone is a diff of its
+    own lines, while a polygon does not take a line per coordinate.
+    """
+    entries = [
+        "  {\n"
+        + ",\n".join(f"    {json.dumps(key)}: {json.dumps(value)}" for key, value in zone.items())
+        + "\n  }"
+        for zone in zones
+    ]
+    return "[\n" + ",\n".join(entries) + "\n]\n" if entries else "[]\n"
+
+
+def _read_zones(root: Path, floor: Floor) -> List[Dict[str, Any]]:
+    return load_zones(root, floor) if (root / floor.zones).exists() else []
+
+
+def extract_floors(root: Path, floors: Optional[Sequence[Floor]] = None) -> List[Result]:
+    """Extract every floor's zones and rewrite the ``*_zones.json`` that changed."""
+    results = []
+    for floor in floors or FLOORS:
+        extraction = extract_zones((root / floor.svg).read_text(encoding="utf-8"))
+        existing = _read_zones(root, floor)
+        merged = merge_zones(existing, extraction.zones)
+        before = {zone.get("id") for zone in existing if zone.get("source_type") == "path"}
+        after = {zone["id"] for zone in merged if zone.get("source_type") == "path"}
+        text = encode_zones(merged)
+        target = root / floor.zones
+        changed = not target.exists() or target.read_text(encoding="utf-8") != text
+        if changed:
+            target.write_text(text, encoding="utf-8")
+        results.append(
+            Result(
+                floor.id,
+                floor.zones,
+                dict(Counter(zone["category"] for zone in extraction.zones)),
+                len(before & after),
+                len(after - before),
+                len(before - after),
+                dict(extraction.unclassified),
+                changed,
+            )
+        )
+    return results
+
+
+def format_report(results: Sequence[Result]) -> str:
+    header = ["floor", "zones", "kept", "added", "removed"]
+    rows = []
+    for result in results:
+        counts = [result.kept, result.added, result.removed]
+        rows.append([result.floor, str(sum(result.zones.values()))] + [str(n) for n in counts])
+    lines = table(header, rows)
+    for result in results:
+        counts = ", ".join(f"{n} {category}" for category, n in sorted(result.zones.items()))
+        lines.append(f"{result.floor}: {counts or 'no zones'}")
+        if result.unclassified:
+            fills = ", ".join(f"{fill} x{n}" for fill, n in sorted(result.unclassified.items()))
+            lines.append(f"{result.floor}: unclassified fills {fills}")
+    written = [result.path for result in results if result.changed]
+    lines.append(f"wrote {', '.join(written)}" if written else "zone files up to date")
+    return "\n".join(lines)